@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends
-from typing import List
 
-from app.models.prompt_models import SearchResult, AIActionPlan
+from app.models.prompt_models import ActionPlanInput, AIActionPlan
+from app.core.container import get_gemini_service
 from app.services.gemini_service import GeminiService
 
 router = APIRouter()
 
 @router.post("/ai/action-plan", response_model=AIActionPlan)
-async def generate_action_plan(search_results: List[SearchResult], gemini_service: GeminiService = Depends()):
-    action_plan_dict = gemini_service.generate_action_plan([result.model_dump() for result in search_results])
+async def generate_action_plan(plan_input: ActionPlanInput, gemini_service: GeminiService = Depends(get_gemini_service)):
+    action_plan_dict = await gemini_service.generate_action_plan(
+        [result.model_dump() for result in plan_input.results],
+        plan_input.query,
+        plan_input.structured_query
+    )
     return AIActionPlan(**action_plan_dict)
 
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.config import settings
+from app.services.matchmaking import MatchIndex, matchmaker
+
+router = APIRouter()
+
+
+def _index() -> MatchIndex:
+    if not matchmaker.ready:
+        raise HTTPException(status_code=503, detail="The match index is still loading")
+    return matchmaker.index
+
+
+@router.get("/matches/startups/{startup_id}")
+async def investors_for_startup(startup_id: str, k: int = Query(10, ge=1, le=100)):
+    # Best investors for a startup, at most MATCHMAKING_TOP_K
+    matches = _index().investors_for_startup(startup_id, k)
+    if matches is None:
+        raise HTTPException(status_code=404, detail=f"Unknown startup {startup_id}")
+    return {"startup_id": startup_id, "investors": matches}
+
+
+@router.get("/matches/investors/{investor_id}")
+async def startups_for_investor(investor_id: str, k: int = Query(10, ge=1, le=100)):
+    matches = _index().startups_for_investor(investor_id, k)
+    if matches is None:
+        raise HTTPException(status_code=404, detail=f"Unknown investor {investor_id}")
+    return {"investor_id": investor_id, "startups": matches}
+
+
+@router.post("/matches/refresh")
+async def refresh_matches():
+    """Re-sync the index from Postgres now instead of waiting for MATCHMAKING_REFRESH_INTERVAL."""
+    if not settings.MATCHMAKING_ENABLED:
+        raise HTTPException(status_code=404, detail="Matchmaking is disabled (MATCHMAKING_ENABLED)")
+    await matchmaker.refresh()
+    return matchmaker.metrics()
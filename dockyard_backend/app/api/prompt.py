@@ -1,37 +1,119 @@
-from fastapi import APIRouter, Depends
+import logging
+import traceback
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.models.prompt_models import PromptInput, PromptOutput, StructuredQuery, SearchResult, AIActionPlan
+from app.core.cache import scope_digest
+from app.core.config import settings
+from app.core.container import get_gemini_service, get_search_service
+from app.db.event_log import log_action_plan, log_search
 from app.services.gemini_service import GeminiService
+from app.services.ranking import InvalidCursorError, decode_cursor, encode_cursor
 from app.services.search_service import SearchService
+from app.utils.formatters import SSE_HEADERS, sse_event
 
 router = APIRouter()
 
+
+def _page_offset(prompt_input: PromptInput) -> int:
+    if not prompt_input.cursor:
+        return 0
+    try:
+        return decode_cursor(prompt_input.cursor, scope_digest(prompt_input.prompt))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _paginate(prompt_input: PromptInput, search_results: List[SearchResult], offset: int):
+    """Slice one page out of the ranked results; returns (page, next_cursor, action plan input)."""
+    page_size = prompt_input.page_size or settings.SEARCH_PAGE_SIZE
+    page = search_results[offset:offset + page_size]
+    next_offset = offset + page_size
+    next_cursor = encode_cursor(next_offset, scope_digest(prompt_input.prompt)) if next_offset < len(search_results) else None
+    # The plan always covers the overall top-N, so later pages reuse the cached plan
+    plan_input = [result.model_dump() for result in search_results[:settings.ACTION_PLAN_MAX_RESULTS]]
+    return page, next_cursor, plan_input
+
+
+def _log_prompt(prompt_input: PromptInput, structured_query: StructuredQuery, search_results: List[SearchResult],
+                ai_action_plan: AIActionPlan, offset: int) -> None:
+    """Buffer the search_logs row, and the action_logs rows for the plan (first page only: later pages reuse it)."""
+    log_search(prompt_input.prompt, structured_query.query_type, structured_query.model_dump(), len(search_results))
+    if offset == 0:
+        log_action_plan(prompt_input.prompt, [item.model_dump() for item in ai_action_plan.action_plan])
+
+
 @router.post("/prompt", response_model=PromptOutput)
 async def handle_prompt(
     prompt_input: PromptInput,
-    gemini_service: GeminiService = Depends(),
-    search_service: SearchService = Depends()
+    gemini_service: GeminiService = Depends(get_gemini_service),
+    search_service: SearchService = Depends(get_search_service)
 ):
+    offset = _page_offset(prompt_input)
+
     # 1. AI Rewriting (Intent Extraction)
-    structured_query_dict = gemini_service.extract_intent(prompt_input.prompt)
+    structured_query_dict = await gemini_service.extract_intent(prompt_input.prompt)
     structured_query = StructuredQuery(**structured_query_dict)
 
-    # 2. Database Search (Supabase -> PostgreSQL)
-    search_results = search_service.perform_search(structured_query)
+    # 2. Database Search (Supabase -> PostgreSQL), ranked by relevance
+    search_results = await search_service.perform_search(structured_query)
+    page, next_cursor, plan_input = _paginate(prompt_input, search_results, offset)
 
-    # 3. AI Post-Processing (User-Friendly Output)
-    ai_action_plan_dict = gemini_service.generate_action_plan(
-        [result.model_dump() for result in search_results],
+    # 3. AI Post-Processing (User-Friendly Output), capped to the top results
+    ai_action_plan_dict = await gemini_service.generate_action_plan(
+        plan_input,
         prompt_input.prompt,
         structured_query
     )
     ai_action_plan = AIActionPlan(**ai_action_plan_dict)
+    _log_prompt(prompt_input, structured_query, search_results, ai_action_plan, offset)
 
     # 4. Return Response to Frontend
     return PromptOutput(
         query=prompt_input.prompt,
         structured_query=structured_query,
-        results=search_results,
-        ai_action_plan=ai_action_plan
+        results=page,
+        ai_action_plan=ai_action_plan,
+        total_results=len(search_results),
+        next_cursor=next_cursor
     )
 
+
+@router.post("/prompt/stream")
+async def handle_prompt_stream(
+    prompt_input: PromptInput,
+    gemini_service: GeminiService = Depends(get_gemini_service),
+    search_service: SearchService = Depends(get_search_service)
+):
+    # Same pipeline as /prompt, but each stage's output is sent as soon as it exists:
+    # structured_query -> results -> ai_action_plan -> done
+    offset = _page_offset(prompt_input)
+
+    async def events():
+        try:
+            structured_query_dict = await gemini_service.extract_intent(prompt_input.prompt)
+            structured_query = StructuredQuery(**structured_query_dict)
+            yield sse_event("structured_query", structured_query.model_dump())
+
+            search_results = await search_service.perform_search(structured_query)
+            page, next_cursor, plan_input = _paginate(prompt_input, search_results, offset)
+            yield sse_event("results", {
+                "results": [result.model_dump() for result in page],
+                "total_results": len(search_results),
+                "next_cursor": next_cursor,
+            })
+
+            ai_action_plan_dict = await gemini_service.generate_action_plan(plan_input, prompt_input.prompt, structured_query)
+            ai_action_plan = AIActionPlan(**ai_action_plan_dict)
+            yield sse_event("ai_action_plan", ai_action_plan.model_dump())
+            _log_prompt(prompt_input, structured_query, search_results, ai_action_plan, offset)
+            yield sse_event("done", {})
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
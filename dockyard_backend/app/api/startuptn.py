@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends
-from app.core.startup_tn_kb_utils import StartupTNKnowledgeBase
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from app.core.startup_tn_kb_utils import startup_tn_kb as kb
 
 router = APIRouter()
-kb = StartupTNKnowledgeBase()
+NOT_FOUND = {"error": "I do not have that information in my knowledge base."}
 
 @router.get("/startuptn/program/{program_name}/sections")
 async def get_program_sections(program_name: str):
-    sections_order, sections, urls_hint, submit = kb.get_program_sections(program_name)
-    if not sections_order:
-        return {"error": "I do not have that information in my knowledge base."}
+    program = kb.get_program_sections(program_name)
+    if not program or not program[0]:
+        return NOT_FOUND
+    sections_order, sections, urls_hint, _ = program
     return {
         "sections_order": sections_order,
         "sections": sections,
@@ -17,9 +20,10 @@ async def get_program_sections(program_name: str):
 
 @router.get("/startuptn/program/{program_name}/section/{section_name}")
 async def get_section_fields(program_name: str, section_name: str):
-    required, repeaters, url = kb.get_section_fields(program_name, section_name)
-    if required is None:
-        return {"error": "I do not have that information in my knowledge base."}
+    fields = kb.get_section_fields(program_name, section_name)
+    if fields is None:
+        return NOT_FOUND
+    required, repeaters, url = fields
     return {
         "required": required,
         "repeaters": repeaters,
@@ -30,12 +34,28 @@ async def get_section_fields(program_name: str, section_name: str):
 async def get_submit_info(program_name: str):
     submit = kb.get_submit_info(program_name)
     if not submit:
-        return {"error": "I do not have that information in my knowledge base."}
+        return NOT_FOUND
     return submit
 
 @router.get("/startuptn/ecosystem/{entity_type}")
-async def get_ecosystem(entity_type: str, filter_key: str = None, filter_value: str = None):
-    entities = kb.get_ecosystem(entity_type, filter_key, filter_value)
+async def get_ecosystem(
+    entity_type: str,
+    filter_key: str = None,
+    filter_value: str = None,
+    filter: Optional[List[str]] = Query(None, description="Extra key:value filters, all must match"),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    """
+    Ecosystem entities matching every filter. Matching ignores case; a list field matches one of
+    its items and a text field also matches on a substring ("Chennai" finds "Chennai, Tamil Nadu").
+    """
+    filters = {filter_key: filter_value} if filter_key and filter_value else {}
+    for item in filter or []:
+        key, _, value = item.partition(":")
+        if key and value:
+            filters[key] = value
+    entities = kb.find(entity_type, filters, date_from, date_to)
     if not entities:
-        return {"error": "I do not have that information in my knowledge base."}
+        return NOT_FOUND
     return entities
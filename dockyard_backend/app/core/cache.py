@@ -0,0 +1,316 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.concurrency import SingleFlight
+from app.core.config import settings
+from app.core.content_store import content_store
+from app.services.query_router import query_router
+
+# -------------------------------
+# Query normalization
+# -------------------------------
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "our", "you", "do", "does", "can", "could",
+    "please", "to", "for", "of", "on", "is", "are", "what", "how", "which", "tell",
+    "about", "some", "any", "give", "with", "and",
+}
+# Phrasings that ask the same thing collapse onto one token (retrieval and near-duplicate
+# matching only; exact cache keys keep the words as asked)
+SYNONYMS = {
+    "register": "apply", "registration": "apply", "application": "apply", "applying": "apply",
+    "steps": "apply", "process": "apply", "procedure": "apply", "enroll": "apply", "signup": "apply",
+    "startup": "startups", "investor": "investors", "mentor": "mentors", "scheme": "schemes",
+    "show": "list", "find": "list", "get": "list",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+
+
+def query_tokens(text: str) -> List[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [SYNONYMS.get(t, t) for t in tokens if t not in STOPWORDS]
+
+
+def normalize_query(text: str) -> str:
+    """Exact-match cache key text: the query's words, ignoring case, whitespace and punctuation."""
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+# -------------------------------
+# MinHash for near-duplicate lookup
+# -------------------------------
+_MINHASH_PERMUTATIONS = 64
+_MINHASH_BANDS = 16
+_ROWS_PER_BAND = _MINHASH_PERMUTATIONS // _MINHASH_BANDS
+# Universal hashes (a*h + b) mod p over a 61-bit Mersenne prime, with independent random (a, b)
+# pairs; fixed seed so every process (and a shared Redis store) computes the same signatures
+_MINHASH_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(0x5EED)
+_MINHASH_PARAMS = tuple(
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(0, _MINHASH_PRIME))
+    for _ in range(_MINHASH_PERMUTATIONS)
+)
+# Only answers that do not depend on the question's exact values may be served to a similar
+# question: a database answer about Coimbatore is wrong for Madurai, and intents/action plans
+# carry the question's sector, district and amounts
+NEAR_DUPLICATE_NAMESPACES = {"ask:knowledge"}
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def minhash_signature(tokens: Set[str]) -> Tuple[int, ...]:
+    if not tokens:
+        return ()
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big") % _MINHASH_PRIME for t in tokens]
+    return tuple(min((a * h + b) % _MINHASH_PRIME for h in hashes) for a, b in _MINHASH_PARAMS)
+
+
+def near_duplicate_guard(query: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]:
+    """Sector/district/stage values and numbers in the query; a near hit must have exactly the same."""
+    _, slots, _ = query_router.extract_slots(query)
+    return tuple(sorted(slots.items())), tuple(sorted(_NUMBER_RE.findall(query)))
+
+
+def _estimated_jaccard(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / _MINHASH_PERMUTATIONS
+
+
+# -------------------------------
+# Backends
+# -------------------------------
+class InMemoryBackend:
+    """Per-process TTL + LRU store. Values are stored JSON-encoded so callers never share objects."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared store so every worker benefits from each other's hits. Requires the redis package."""
+
+    def __init__(self, url: str, prefix: str = "dockyard:cache:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0  # redis evicts on its own (maxmemory-policy allkeys-lru)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._redis.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self._redis.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    async def clear(self) -> None:
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+    def size(self) -> int:
+        return -1
+
+
+# -------------------------------
+# Response cache
+# -------------------------------
+class ResponseCache:
+    """
+    Caches LLM-backed responses by normalized query text.
+
+    Keys embed a version built from the knowledge base/schema digest and a data
+    generation counter, so invalidate() or a content change makes old entries
+    unreachable. Exact keys ignore only case, whitespace and punctuation.
+    Near-duplicate matching uses MinHash LSH over query tokens (stopwords
+    dropped, synonyms folded); that index is kept per process even when the
+    value store is shared.
+
+    Misses are single-flight: concurrent requests for the same key share one
+    computation, so a burst of identical questions makes one upstream call.
+    """
+
+    def __init__(self, backend, ttl: float, near_duplicates: bool, near_threshold: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+        self.near_threshold = near_threshold
+        self.content_digest = content_store.version
+        self.generation = 0
+        self._bands: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = {}
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._guards: Dict[str, Tuple] = {}
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "sets": 0, "invalidations": 0}
+        self.flights = SingleFlight()
+
+    @property
+    def version(self) -> str:
+        return f"{self.content_digest}.{self.generation}"
+
+    def _key(self, partition: str, normalized: str) -> str:
+        digest = hashlib.sha1(f"{self.version}|{partition}|{normalized}".encode()).hexdigest()
+        return f"{partition.split(':', 1)[0]}:{digest}"
+
+    def _near_key(self, partition: str, signature: Tuple[int, ...], guard: Tuple) -> Optional[str]:
+        candidates: Set[str] = set()
+        for band in range(_MINHASH_BANDS):
+            rows = signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+            candidates |= self._bands.get((partition, band, rows), set())
+        best_key, best_score = None, self.near_threshold
+        for key in candidates:
+            if self._guards.get(key) != guard:
+                continue
+            score = _estimated_jaccard(signature, self._signatures[key])
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _index(self, partition: str, key: str, signature: Tuple[int, ...], guard: Tuple) -> None:
+        if key in self._signatures:
+            return
+        # Keep the LSH index bounded alongside the value store
+        if len(self._signatures) >= settings.CACHE_MAX_ENTRIES:
+            self._bands.clear()
+            self._signatures.clear()
+            self._guards.clear()
+        self._signatures[key] = signature
+        self._guards[key] = guard
+        for band in range(_MINHASH_BANDS):
+            rows = signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+            self._bands.setdefault((partition, band, rows), set()).add(key)
+
+    async def get(self, namespace: str, query: str, scope: str = "") -> Optional[Any]:
+        partition = f"{namespace}:{scope}"
+        value = await self.backend.get(self._key(partition, normalize_query(query)))
+        if value is not None:
+            self.stats["hits"] += 1
+            return json.loads(value)
+        tokens = query_tokens(query) if self._near_enabled(namespace) else []
+        if tokens:
+            near_key = self._near_key(partition, minhash_signature(set(tokens)), near_duplicate_guard(query))
+            if near_key is not None:
+                value = await self.backend.get(near_key)
+                if value is not None:
+                    self.stats["near_hits"] += 1
+                    return json.loads(value)
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, namespace: str, query: str, value: Any, scope: str = "", ttl: Optional[float] = None) -> None:
+        partition = f"{namespace}:{scope}"
+        key = self._key(partition, normalize_query(query))
+        await self.backend.set(key, json.dumps(value), ttl or self.ttl)
+        self.stats["sets"] += 1
+        tokens = query_tokens(query) if self._near_enabled(namespace) else []
+        if tokens:
+            self._index(partition, key, minhash_signature(set(tokens)), near_duplicate_guard(query))
+
+    def _near_enabled(self, namespace: str) -> bool:
+        return self.near_duplicates and namespace in NEAR_DUPLICATE_NAMESPACES
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        query: str,
+        compute: Callable[[], Awaitable[Any]],
+        scope: str = "",
+        should_cache: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        if not settings.CACHE_ENABLED:
+            return await self.coalesce(namespace, query, compute, scope)
+        try:
+            cached = await self.get(namespace, query, scope)
+        except Exception as e:
+            # A broken shared backend must never take the request down with it
+            logging.warning(f"Response cache lookup failed: {e!r}")
+            cached = None
+        if cached is not None:
+            return cached
+
+        async def compute_and_store():
+            value = await compute()
+            if should_cache(value):
+                try:
+                    await self.set(namespace, query, value, scope)
+                except Exception as e:
+                    logging.warning(f"Response cache store failed: {e!r}")
+            return value
+
+        return await self.coalesce(namespace, query, compute_and_store, scope)
+
+    async def coalesce(self, namespace: str, query: str, compute: Callable[[], Awaitable[Any]], scope: str = "") -> Any:
+        """Run compute, or join the identical call (same normalized query and scope) already in flight."""
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await compute()
+        return await self.flights.do(self._key(f"{namespace}:{scope}", normalize_query(query)), compute)
+
+    async def invalidate(self, content_changed: bool = False) -> None:
+        """Drop every cached response, e.g. after the DB data or knowledge base changed."""
+        if content_changed:
+            self.content_digest = content_store.version
+        self.generation += 1
+        self._bands.clear()
+        self._signatures.clear()
+        self._guards.clear()
+        await self.backend.clear()
+        self.stats["invalidations"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["near_hits"] + self.stats["misses"]
+        hits = self.stats["hits"] + self.stats["near_hits"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": self.backend.size(),
+            "evictions": self.backend.evictions,
+            "version": self.version,
+            "backend": type(self.backend).__name__,
+            "single_flight": self.flights.stats(),
+        }
+
+
+def scope_digest(value: Any) -> str:
+    """Short stable digest of a JSON-able value, for cache scopes such as search results."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _make_backend():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL)
+    return InMemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(
+    _make_backend(),
+    ttl=settings.CACHE_TTL_SECONDS,
+    near_duplicates=settings.CACHE_NEAR_DUPLICATES,
+    near_threshold=settings.CACHE_NEAR_DUP_THRESHOLD,
+)
@@ -0,0 +1,60 @@
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# -------------------------------
+# Upstream client factory
+# -------------------------------
+# The one place SDK clients are built, from Settings. google.generativeai and supabase account
+# for most of the app's import time, so they are imported on first use rather than when
+# app.main loads; ServiceContainer.warmup preloads them off the event loop right after startup.
+
+
+class ClientFactory:
+    def __init__(self):
+        self._genai: Any = None
+        self._models: Dict[str, Any] = {}
+        self._supabase: Any = None
+        # Warmup builds clients in worker threads while requests may ask for them on the loop
+        self._lock = threading.Lock()
+
+    def genai(self) -> Any:
+        """The google.generativeai module, configured with GEMINI_API_KEY once."""
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=settings.GEMINI_API_KEY)
+                    self._genai = genai
+        return self._genai
+
+    def gemini_model(self, name: str) -> Any:
+        """A shared GenerativeModel per model name; they reuse the gRPC channel genai keeps."""
+        model = self._models.get(name)
+        if model is None:
+            model = self._models.setdefault(name, self.genai().GenerativeModel(name))
+        return model
+
+    def supabase(self) -> Any:
+        if self._supabase is None:
+            with self._lock:
+                if self._supabase is None:
+                    from supabase import create_client
+
+                    self._supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        return self._supabase
+
+    def loaded(self) -> Dict[str, bool]:
+        return {"genai": self._genai is not None, "supabase": self._supabase is not None}
+
+    def close(self) -> None:
+        supabase: Optional[Any] = self._supabase
+        self._supabase = None
+        self._models.clear()
+        if supabase is not None:
+            supabase.postgrest.session.close()
+
+
+clients = ClientFactory()
@@ -0,0 +1,157 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class LLMOverloadedError(Exception):
+    """Raised when too many LLM calls are already queued; surfaced as HTTP 503."""
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight calls to an upstream and bounds the queue in front of it.
+    Callers beyond max_waiting, or waiting longer than wait_timeout, are rejected
+    instead of piling up behind a slow upstream.
+    """
+
+    def __init__(self, max_concurrency: int, max_waiting: int, wait_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise LLMOverloadedError("Too many pending LLM requests, try again shortly.")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LLMOverloadedError("Timed out waiting for an LLM slot, try again shortly.")
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class SingleFlight:
+    """
+    Concurrent calls for the same key share one in-flight computation. The first caller
+    starts it; the others wait on the same task and get their own copy of its result.
+    The task is shielded, so one caller disconnecting does not cancel it for the rest.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(task))
+        self.leaders += 1
+        task = asyncio.ensure_future(compute())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller has gone away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class MicroBatcher:
+    """
+    Groups items submitted within `window` seconds (at most max_size) into one
+    handler(items) -> results call; each submitter gets the result at its position.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[List[Any]]], window: float, max_size: int):
+        self.handler = handler
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.submitted = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.submitted += 1
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "saved_calls": self.submitted - self.batches - len(self._pending),
+            "largest_batch": self.largest_batch,
+            "pending": len(self._pending),
+        }
+
+
+# Shared by every Gemini call in the process (GeminiService and ai_db_utils)
+gemini_limiter = ConcurrencyLimiter(
+    settings.GEMINI_MAX_CONCURRENCY,
+    settings.GEMINI_MAX_QUEUE,
+    settings.GEMINI_QUEUE_TIMEOUT,
+)
@@ -1,15 +1,132 @@
+from typing import List
+
 from pydantic_settings import BaseSettings
 
+# Needed to serve requests; the app starts without them but /health/ready reports them missing
+REQUIRED_SETTINGS = ("SUPABASE_DB_URL", "SUPABASE_URL", "SUPABASE_KEY", "GEMINI_API_KEY")
+
 
 class Settings(BaseSettings):
-    SUPABASE_DB_URL: str
-    SUPABASE_URL: str
-    SUPABASE_KEY: str
-    GEMINI_API_KEY: str
+    SUPABASE_DB_URL: str = ""
+    SUPABASE_URL: str = ""
+    SUPABASE_KEY: str = ""
+    GEMINI_API_KEY: str = ""
+
+    # Gemini models: GEMINI_MODEL for SQL/knowledge answers, GEMINI_PROMPT_MODEL for GeminiService
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+    GEMINI_PROMPT_MODEL: str = "gemini-2.0-flash"
+
+    # asyncpg pool used by run_sql
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT: float = 2.0
+    DB_QUERY_TIMEOUT: float = 15.0
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300.0
+
+    # Sandbox for Gemini-generated SQL: row cap, per-statement timeout, EXPLAIN cost ceiling (0 = off)
+    SQL_MAX_ROWS: int = 200
+    SQL_STATEMENT_TIMEOUT_MS: int = 5000
+    SQL_MAX_PLAN_COST: float = 1_000_000
+    # Question-shape -> parameterized SQL templates learned from Gemini's answers (LRU)
+    SQL_PLAN_CACHE_ENABLED: bool = True
+    SQL_PLAN_CACHE_MAX_ENTRIES: int = 512
+    # Write-behind logging of /ask and /api/prompt into search_logs / action_logs (see app/db/event_log.py)
+    EVENT_LOG_ENABLED: bool = True
+    EVENT_LOG_BATCH_SIZE: int = 200
+    EVENT_LOG_FLUSH_INTERVAL: float = 2.0
+    EVENT_LOG_MAX_PENDING: int = 10000
+    EVENT_LOG_SHUTDOWN_TIMEOUT: float = 5.0
+    # In-memory investor-startup match index (see app/services/matchmaking.py); re-synced from
+    # Postgres every MATCHMAKING_REFRESH_INTERVAL seconds, 0 = loaded once after startup
+    MATCHMAKING_ENABLED: bool = True
+    MATCHMAKING_TOP_K: int = 50
+    MATCHMAKING_REFRESH_INTERVAL: float = 600
+    # Embedding index over bios, descriptions and expertise (see app/services/semantic_index.py).
+    # SEMANTIC_INDEX_PATH: directory written by `python -m app.services.semantic_index`, opened
+    # at startup instead of re-embedding; empty = built in memory from Postgres
+    SEMANTIC_INDEX_ENABLED: bool = True
+    SEMANTIC_INDEX_PATH: str = ""
+    SEMANTIC_INDEX_REFRESH_INTERVAL: float = 600
+    SEMANTIC_MIN_SCORE: float = 0.2
+    # Directory entries added to knowledge-mode prompts, 0 = off
+    SEMANTIC_KNOWLEDGE_TOP_K: int = 5
+
+    # Gemini concurrency limiter / backpressure
+    GEMINI_MAX_CONCURRENCY: int = 256
+    GEMINI_MAX_QUEUE: int = 1024
+    GEMINI_QUEUE_TIMEOUT: float = 10.0
+
+    # Concurrent identical LLM-backed requests share one upstream call (see ResponseCache.coalesce)
+    SINGLE_FLIGHT_ENABLED: bool = True
+    # Micro-batching of extract_intent: prompts arriving within the window go to Gemini as one call
+    INTENT_BATCH_ENABLED: bool = False
+    INTENT_BATCH_WINDOW_MS: float = 15
+    INTENT_BATCH_MAX_SIZE: int = 8
+
+    # Open upstream connections in the background after startup (see ServiceContainer.warmup)
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT: float = 5.0
+    # Hold /health/ready at 503 until the pool, SDK clients and warm-up are done
+    READY_AFTER_WARMUP: bool = False
+
+    # Response cache in front of Gemini (see app/core/cache.py)
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "memory"  # "memory" or "redis"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL_SECONDS: float = 3600.0
+    CACHE_MAX_ENTRIES: int = 5000
+    # Serve a cached knowledge answer to a reworded question (same sector/district/stage and numbers)
+    CACHE_NEAR_DUPLICATES: bool = False
+    CACHE_NEAR_DUP_THRESHOLD: float = 0.85
+
+    # Knowledge-mode retrieval (see app/core/kb_retriever.py)
+    KB_RETRIEVAL_ENABLED: bool = True
+    KB_RETRIEVAL_TOP_K: int = 8
+
+    # Database-mode schema slicing (see app/core/schema_slicer.py)
+    SCHEMA_SLICE_ENABLED: bool = True
+    SCHEMA_SLICE_MAX_TABLES: int = 4
+    SCHEMA_SLICE_MIN_RATIO: float = 0.5
+    SCHEMA_SLICE_MAX_NEIGHBOURS: int = 2
+
+    # Deterministic /ask fast path (see app/services/query_router.py)
+    FAST_PATH_ENABLED: bool = True
+    FAST_PATH_ROW_LIMIT: int = 50
+
+    # Search candidate limits, ranking and pagination for /api/prompt
+    SERVICES_SEARCH_LIMIT: int = 50
+    FUNDING_SEARCH_LIMIT: int = 25
+    SEARCH_PAGE_SIZE: int = 10
+    ACTION_PLAN_MAX_RESULTS: int = 5
+
+    # Knowledge base / db_schema files (JSON, or YAML with PyYAML installed); empty = bundled copies.
+    # The watcher polls their mtime every CONTENT_RELOAD_INTERVAL seconds, 0 disables it.
+    KB_PATH: str = ""
+    DB_SCHEMA_PATH: str = ""
+    CONTENT_RELOAD_INTERVAL: float = 5
+
+    # Gemini context caching of the full KB/schema prompt prefix (only used when retrieval/slicing is off)
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = False
+    GEMINI_CONTEXT_CACHE_TTL: int = 3600
+    # Roughly the API's minimum cacheable prompt size, at ~4 characters per token
+    GEMINI_CONTEXT_CACHE_MIN_CHARS: int = 4096
+
+    # /metrics (Prometheus text format); event-loop lag is sampled every LOOP_LAG_INTERVAL seconds (0 = off)
+    METRICS_ENABLED: bool = True
+    LOOP_LAG_INTERVAL: float = 0.5
+    # Sampling profiler: this share of requests (0 = none) has the event loop's stack sampled every
+    # PROFILE_INTERVAL_MS; GET /debug/profile serves the folded stacks when PROFILE_ENDPOINT_ENABLED
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5
+    PROFILE_MAX_STACKS: int = 5000
+    PROFILE_ENDPOINT_ENABLED: bool = False
 
     class Config:
         env_file = ".env"
 
+    def missing_required(self) -> List[str]:
+        return [name for name in REQUIRED_SETTINGS if not getattr(self, name)]
 
-settings = Settings()
 
+settings = Settings()
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.content_store import content_store
+from app.core.metrics import watch_loop_lag
+from app.db import event_log, pool
+from app.db.supabase_client import get_supabase_client
+from app.services.gemini_service import GeminiService
+from app.services.matchmaking import matchmaker
+from app.services.query_router import query_router
+from app.services.search_service import SearchService
+from app.services.semantic_index import semantic_search
+
+
+class ServiceContainer:
+    """
+    App-scoped clients, built once in the lifespan hook and shared by every request.
+    Each upstream gets one long-lived connection pool: asyncpg for Postgres, the
+    supabase client's HTTP/2 keep-alive session for PostgREST and the genai gRPC
+    channel behind the single GeminiService model.
+
+    startup() does no network I/O and imports no SDK, so the worker serves (and is live)
+    right away; pool creation, SDK imports and connection warm-up run in the background
+    warmup task, which /health/ready reports on.
+    """
+
+    def __init__(self):
+        self.gemini_service: Optional[GeminiService] = None
+        self.search_service: Optional[SearchService] = None
+        self.content_watcher: Optional[asyncio.Task] = None
+        self.loop_lag_watcher: Optional[asyncio.Task] = None
+        self.event_log_writer: Optional[asyncio.Task] = None
+        self.matchmaking_watcher: Optional[asyncio.Task] = None
+        self.semantic_index_watcher: Optional[asyncio.Task] = None
+        self.warmup_task: Optional[asyncio.Task] = None
+        self.warmup_failures: Dict[str, str] = {}
+        self.started = False
+        self.startup_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+
+    @property
+    def supabase(self):
+        return get_supabase_client()
+
+    async def startup(self) -> None:
+        started = time.perf_counter()
+        self.gemini_service = GeminiService()
+        self.search_service = SearchService()
+        if settings.CONTENT_RELOAD_INTERVAL > 0:
+            self.content_watcher = asyncio.create_task(content_store.watch(settings.CONTENT_RELOAD_INTERVAL))
+        if settings.METRICS_ENABLED and settings.LOOP_LAG_INTERVAL > 0:
+            self.loop_lag_watcher = asyncio.create_task(watch_loop_lag(settings.LOOP_LAG_INTERVAL))
+        if settings.EVENT_LOG_ENABLED:
+            self.event_log_writer = asyncio.create_task(event_log.run_writers())
+        self.warmup_task = asyncio.create_task(self.warmup())
+        self.started = True
+        self.startup_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _prepare(self) -> None:
+        # The asyncpg pool, and the SDK imports in worker threads so they never block the loop
+        async def _pool():
+            try:
+                await pool.init_pool()
+            except Exception:
+                # run_sql falls back to dedicated connections while the pool is down
+                logging.error(f"Could not create asyncpg pool:\n{traceback.format_exc()}")
+
+        async def _sdk(name, build):
+            try:
+                await asyncio.to_thread(build)
+            except Exception as e:
+                self.warmup_failures[name] = repr(e)
+                logging.warning(f"Could not load the {name} client: {e!r}")
+
+        await asyncio.gather(
+            _pool(),
+            _sdk("genai", lambda: clients.gemini_model(settings.GEMINI_MODEL)),
+            _sdk("supabase", clients.supabase),
+        )
+
+    async def warmup(self) -> None:
+        # Open every upstream connection now so the first user request does not pay for it.
+        # Failures are logged only; the app still serves and connects lazily.
+        started = time.perf_counter()
+        try:
+            await self._prepare()
+            if settings.MATCHMAKING_ENABLED:
+                # Needs the pool; builds the match index in a worker thread off the loop
+                self.matchmaking_watcher = asyncio.create_task(matchmaker.watch(settings.MATCHMAKING_REFRESH_INTERVAL))
+            if settings.SEMANTIC_INDEX_ENABLED:
+                self.semantic_index_watcher = asyncio.create_task(semantic_search.watch(settings.SEMANTIC_INDEX_REFRESH_INTERVAL))
+            if settings.WARMUP_ENABLED:
+                await self._warm_connections()
+        finally:
+            self.warmup_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _warm_connections(self) -> None:
+        async def _postgres():
+            await pool.fetch("SELECT 1")
+
+        async def _postgrest():
+            await asyncio.to_thread(
+                lambda: self.supabase.table("services_marketplace").select("service_id").limit(1).execute()
+            )
+
+        async def _gemini():
+            await self.gemini_service.model.count_tokens_async("warmup")
+
+        async def _gazetteer():
+            await query_router.refresh_gazetteer()
+
+        names = ("postgres", "postgrest", "gemini", "gazetteer")
+        steps = (_postgres, _postgrest, _gemini, _gazetteer)
+        tasks = [asyncio.wait_for(step(), settings.WARMUP_TIMEOUT) for step in steps]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                self.warmup_failures[name] = repr(result)
+                logging.warning(f"Warm-up of {name} failed: {result!r}")
+
+    def readiness(self) -> Dict[str, Any]:
+        missing = settings.missing_required()
+        warming = self.warmup_task is not None and not self.warmup_task.done()
+        return {
+            "ready": self.started and not missing and not (warming and settings.READY_AFTER_WARMUP),
+            "missing_settings": missing,
+            "warming_up": warming,
+            "startup_ms": self.startup_ms,
+            "warmup_ms": self.warmup_ms,
+            "warmup_failures": self.warmup_failures,
+            "clients": clients.loaded(),
+        }
+
+    async def _stop_event_log(self) -> None:
+        # Stop the periodic writer, then write out what is still buffered while the pool is open
+        if self.event_log_writer is not None:
+            self.event_log_writer.cancel()
+            try:
+                await self.event_log_writer
+            except asyncio.CancelledError:
+                pass
+            self.event_log_writer = None
+        try:
+            await asyncio.wait_for(event_log.flush_all(), settings.EVENT_LOG_SHUTDOWN_TIMEOUT)
+        except Exception as e:
+            logging.warning(f"Event log not flushed at shutdown: {e!r}")
+
+    async def shutdown(self) -> None:
+        for task in (self.warmup_task, self.content_watcher, self.loop_lag_watcher, self.matchmaking_watcher,
+                     self.semantic_index_watcher):
+            if task is not None:
+                task.cancel()
+        self.warmup_task = None
+        self.content_watcher = None
+        self.loop_lag_watcher = None
+        self.matchmaking_watcher = None
+        self.semantic_index_watcher = None
+        self.started = False
+        await self._stop_event_log()
+        await pool.close_pool()
+        clients.close()
+        self.gemini_service = None
+        self.search_service = None
+
+
+def get_container(request: Request) -> ServiceContainer:
+    return request.app.state.container
+
+
+# FastAPI dependencies; override these in app.dependency_overrides for tests
+def get_gemini_service(request: Request) -> GeminiService:
+    return get_container(request).gemini_service
+
+
+def get_search_service(request: Request) -> SearchService:
+    return get_container(request).search_service
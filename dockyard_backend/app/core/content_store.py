@@ -0,0 +1,171 @@
+# Hot-reloadable store for the knowledge base and db_schema.
+# Both are read from files at startup and re-read whenever their mtime changes, so a
+# content edit no longer needs a redeploy. Every reload is validated before it is swapped
+# in; a bad file is logged and the previous version keeps serving.
+import asyncio
+import hashlib
+import json
+import logging
+import pathlib
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
+
+from app.core.config import settings
+from app.core.db_schema import DB_SCHEMA_PATH
+from app.core.startup_tn_knowledge_base import KNOWLEDGE_BASE_PATH
+
+Listener = Callable[[], Union[None, Awaitable[None]]]
+
+
+class InvalidContentError(ValueError):
+    pass
+
+
+def _read(path: pathlib.Path) -> Dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise InvalidContentError(f"{path} is YAML but PyYAML is not installed")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def validate_kb(kb: Any) -> None:
+    if not isinstance(kb, dict):
+        raise InvalidContentError("knowledge base must be an object")
+    if not isinstance(kb.get("programs"), dict) or not isinstance(kb.get("ecosystem"), dict):
+        raise InvalidContentError("knowledge base needs 'programs' and 'ecosystem' objects")
+    for entity_type, entities in kb["ecosystem"].items():
+        if not isinstance(entities, list) or not all(isinstance(e, dict) for e in entities):
+            raise InvalidContentError(f"ecosystem.{entity_type} must be a list of objects")
+
+
+def validate_schema(schema: Any) -> None:
+    if not isinstance(schema, dict) or not isinstance(schema.get("tables"), dict) or not schema["tables"]:
+        raise InvalidContentError("db_schema needs a non-empty 'tables' object")
+    for name, spec in schema["tables"].items():
+        if not isinstance(spec, dict) or not isinstance(spec.get("columns"), list) or not spec["columns"]:
+            raise InvalidContentError(f"db_schema table {name} needs a non-empty 'columns' list")
+
+
+def _digest(content: Dict[str, Any]) -> str:
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ContentStore:
+    """
+    Current knowledge base and db_schema plus a version stamp over both.
+
+    Content, digests and version are swapped together in one assignment, so a reader
+    always sees a consistent pair. Derived artifacts (retriever, slicer, caches) register
+    listeners for the parts they depend on and are rebuilt only when those change.
+    """
+
+    VALIDATORS = {"kb": validate_kb, "schema": validate_schema}
+
+    def __init__(self, kb_path: pathlib.Path, schema_path: pathlib.Path):
+        self.paths = {"kb": kb_path, "schema": schema_path}
+        self._mtimes: Dict[str, Tuple[float, int]] = {}
+        self._listeners: List[Tuple[Tuple[str, ...], Listener]] = []
+        self._lock = asyncio.Lock()
+        self.stats = {"reloads": 0, "failed_reloads": 0, "loaded_at": 0.0, "last_error": None}
+        content = {}
+        for name, path in self.paths.items():
+            content[name] = self._load(name, path)
+            self._mtimes[name] = self._stat(path)
+        self._swap(content)
+
+    @property
+    def kb(self) -> Dict[str, Any]:
+        return self._state[0]["kb"]
+
+    @property
+    def schema(self) -> Dict[str, Any]:
+        return self._state[0]["schema"]
+
+    @property
+    def version(self) -> str:
+        return self._state[2]
+
+    def _load(self, name: str, path: pathlib.Path) -> Dict[str, Any]:
+        content = _read(path)
+        self.VALIDATORS[name](content)
+        return content
+
+    @staticmethod
+    def _stat(path: pathlib.Path) -> Tuple[float, int]:
+        stat = path.stat()
+        return stat.st_mtime, stat.st_size
+
+    def _swap(self, content: Dict[str, Dict[str, Any]]) -> None:
+        digests = {name: _digest(value) for name, value in content.items()}
+        version = hashlib.sha1(f"{digests['kb']}|{digests['schema']}".encode()).hexdigest()[:12]
+        self._state = (content, digests, version)
+        self.stats["loaded_at"] = time.time()
+
+    def subscribe(self, names: Tuple[str, ...], listener: Listener) -> None:
+        """Call listener (sync or async, no arguments) after a reload that changed any of names."""
+        self._listeners.append((names, listener))
+
+    async def reload(self, force: bool = False) -> List[str]:
+        """Re-read changed files; returns the names whose content actually changed."""
+        async with self._lock:
+            content, digests, _ = self._state
+            updated = dict(content)
+            changed = []
+            for name, path in self.paths.items():
+                try:
+                    mtime = await asyncio.to_thread(self._stat, path)
+                    if not force and mtime == self._mtimes.get(name):
+                        continue
+                    self._mtimes[name] = mtime
+                    value = await asyncio.to_thread(self._load, name, path)
+                except Exception as e:
+                    # Keep serving the last good version; try again on the next change
+                    self.stats["failed_reloads"] += 1
+                    self.stats["last_error"] = f"{name}: {e!r}"
+                    logging.error(f"Reload of {name} from {path} failed, keeping version {self.version}: {e!r}")
+                    continue
+                if _digest(value) != digests[name]:
+                    updated[name] = value
+                    changed.append(name)
+            if not changed:
+                return []
+            self._swap(updated)
+            self.stats["reloads"] += 1
+            logging.info(f"Reloaded {', '.join(changed)}; content version {self.version}")
+            for names, listener in self._listeners:
+                if not set(names) & set(changed):
+                    continue
+                try:
+                    if asyncio.iscoroutinefunction(listener):
+                        await listener()
+                    else:
+                        # Index rebuilds are CPU-bound; each one swaps its own state in when done
+                        await asyncio.to_thread(listener)
+                except Exception as e:
+                    logging.error(f"Rebuild after content reload failed: {e!r}")
+            return changed
+
+    async def watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload()
+
+    def status(self) -> Dict[str, Any]:
+        _, digests, version = self._state
+        return {
+            "version": version,
+            "paths": {name: str(path) for name, path in self.paths.items()},
+            "digests": {name: digest[:12] for name, digest in digests.items()},
+            **self.stats,
+        }
+
+
+content_store = ContentStore(
+    pathlib.Path(settings.KB_PATH or KNOWLEDGE_BASE_PATH),
+    pathlib.Path(settings.DB_SCHEMA_PATH or DB_SCHEMA_PATH),
+)
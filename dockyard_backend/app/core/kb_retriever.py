@@ -0,0 +1,133 @@
+# Retrieval over the StartupTN knowledge base so knowledge-mode prompts only carry
+# the parts of the KB that are relevant to the question.
+import math
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.cache import query_tokens
+from app.core.config import settings
+from app.core.content_store import content_store
+
+Path = Tuple[Any, ...]
+
+
+class Chunk:
+    __slots__ = ("path", "value", "tokens")
+
+    def __init__(self, path: Path, value: Any, text: str):
+        self.path = path
+        self.value = value
+        self.tokens = query_tokens(text)
+
+
+def _flatten_text(value: Any) -> str:
+    # Keys matter as much as values here ("documents_upload", "focus_sector")
+    if isinstance(value, dict):
+        return " ".join(f"{k} {_flatten_text(v)}" for k, v in value.items())
+    if isinstance(value, list):
+        return " ".join(_flatten_text(v) for v in value)
+    return str(value)
+
+
+def chunk_knowledge_base(kb: Dict[str, Any]) -> List[Chunk]:
+    """One chunk per program overview, per wizard section and per ecosystem entry."""
+    chunks: List[Chunk] = []
+    for name, program in kb.get("programs", {}).items():
+        wizard = program.get("wizard", {})
+        overview = {k: v for k, v in program.items() if k != "wizard"}
+        overview["wizard"] = {k: v for k, v in wizard.items() if k != "sections"}
+        chunks.append(Chunk(("programs", name), overview, f"{name} program {_flatten_text(overview)}"))
+        for section, fields in wizard.get("sections", {}).items():
+            chunks.append(Chunk(
+                ("programs", name, "wizard", "sections", section),
+                fields,
+                f"{name} {section} {wizard.get('urls_hint', {}).get(section, '')} {_flatten_text(fields)}",
+            ))
+    for entity_type, entities in kb.get("ecosystem", {}).items():
+        for position, entity in enumerate(entities):
+            chunks.append(Chunk(("ecosystem", entity_type, position), entity, f"{entity_type} {_flatten_text(entity)}"))
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(chunk.tokens) for chunk in chunks]
+        self.lengths = [len(chunk.tokens) for chunk in chunks]
+        self.avg_length = (sum(self.lengths) / len(chunks)) if chunks else 0.0
+        self.postings: Dict[str, List[int]] = {}
+        for i, tf in enumerate(self.term_freqs):
+            for term in tf:
+                self.postings.setdefault(term, []).append(i)
+        n = len(chunks)
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[float, int]]:
+        scores: Dict[int, float] = {}
+        for term in set(query_tokens(query)):
+            for i in self.postings.get(term, ()):
+                tf = self.term_freqs[i][term]
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                scores[i] = scores.get(i, 0.0) + self.idf[term] * tf * (self.k1 + 1) / norm
+        return sorted(((s, i) for i, s in scores.items()), reverse=True)[:k]
+
+
+class KnowledgeRetriever:
+    def __init__(self, kb: Dict[str, Any]):
+        self.rebuild(kb)
+
+    def rebuild(self, kb: Dict[str, Any]) -> None:
+        index = BM25Index(chunk_knowledge_base(kb))
+        program_names = {name.lower(): name for name in kb.get("programs", {})}
+        # Swap both at once so a concurrent prune() never sees a half-built state
+        self._state = (kb, index, program_names)
+
+    def prune(self, question: str, k: Optional[int] = None) -> Dict[str, Any]:
+        """Return a KB-shaped dict holding only the top-k chunks for the question."""
+        kb, index, program_names = self._state
+        k = k or settings.KB_RETRIEVAL_TOP_K
+        hits = [index.chunks[i] for _, i in index.search(question, k)]
+
+        pruned: Dict[str, Any] = {}
+        # Naming a program ("register for TNSSGF") pulls in its whole wizard:
+        # the answer is the full list of steps, not the best-matching few.
+        named = {program_names[t] for t in query_tokens(question) if t in program_names}
+        for name in named:
+            pruned.setdefault("programs", {})[name] = kb["programs"][name]
+        for chunk in hits:
+            if chunk.path[0] == "programs" and chunk.path[1] in named:
+                continue
+            _insert(pruned, kb, chunk)
+        if not pruned:
+            # Nothing matched: give the model the program overviews to orient itself
+            for chunk in index.chunks:
+                if len(chunk.path) == 2 and chunk.path[0] == "programs":
+                    _insert(pruned, kb, chunk)
+        return pruned
+
+
+def _insert(pruned: Dict[str, Any], kb: Dict[str, Any], chunk: Chunk) -> None:
+    if chunk.path[0] == "ecosystem":
+        _, entity_type, _ = chunk.path
+        pruned.setdefault("ecosystem", {}).setdefault(entity_type, []).append(chunk.value)
+        return
+    name = chunk.path[1]
+    program = pruned.setdefault("programs", {}).setdefault(name, {})
+    if len(chunk.path) == 2:
+        wizard = program.get("wizard", {})
+        program.update(chunk.value)
+        program["wizard"] = {**chunk.value.get("wizard", {}), **wizard}
+        return
+    # A lone section still needs its program's ordering and URL hints to be useful
+    overview_wizard = {k: v for k, v in kb["programs"][name].get("wizard", {}).items() if k != "sections"}
+    wizard = program.setdefault("wizard", dict(overview_wizard))
+    wizard.setdefault("sections", {})[chunk.path[-1]] = chunk.value
+
+
+knowledge_retriever = KnowledgeRetriever(content_store.kb)
+content_store.subscribe(("kb",), lambda: knowledge_retriever.rebuild(content_store.kb))
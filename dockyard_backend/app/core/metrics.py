@@ -0,0 +1,241 @@
+import asyncio
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.timing import LatencyHistogram, stage_observers
+
+# -------------------------------
+# Metrics registry
+# -------------------------------
+# Everything /metrics serves: per-route request latency, per-stage durations (StageTimer),
+# Gemini latency and token counts, DB round trips and rows, event-loop lag, plus gauges read
+# from the existing stats (pool, limiter, caches) at scrape time. Rendered in the Prometheus
+# text format without a client library.
+
+PREFIX = "dockyard_"
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 100000)
+LAG_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms: Dict[str, Dict[Labels, LatencyHistogram]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+
+    def observe(self, name: str, value: float, buckets: Optional[Tuple[float, ...]] = None, **labels: Any) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted((k, _escape(v)) for k, v in labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = LatencyHistogram(buckets)
+        histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted((k, _escape(v)) for k, v in labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Register a value read at scrape time."""
+        self.gauges[name] = read
+
+    def render(self) -> str:
+        lines = []
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, n in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += n
+                    le = f'le="{bound}"'
+                    lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le)} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {histogram.total_ms:.3f}")
+                lines.append(f"{PREFIX}{name}_count{_labels(labels)} {histogram.count}")
+        for name, series in sorted(self.counters.items()):
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for labels, value in series.items():
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {value:g}")
+        for name, read in sorted(self.gauges.items()):
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.append(f"# TYPE {PREFIX}{name} gauge")
+            lines.append(f"{PREFIX}{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+# -------------------------------
+# Request-scoped recording
+# -------------------------------
+@dataclass
+class RequestMetrics:
+    db_round_trips: int = 0
+    # (stage, ms) pairs, labelled with the route once routing has resolved it
+    stages: List[Tuple[str, float]] = field(default_factory=list)
+
+
+_current: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar("request_metrics", default=None)
+
+
+def begin_request() -> Tuple[RequestMetrics, contextvars.Token]:
+    request = RequestMetrics()
+    return request, _current.set(request)
+
+
+def end_request(request: RequestMetrics, token: contextvars.Token, route: str, method: str, status: int, started: float) -> None:
+    _current.reset(token)
+    # Streaming responses are measured up to the response head, not the end of the stream
+    metrics.observe("http_request_duration_ms", (time.perf_counter() - started) * 1000, route=route, method=method, status=status)
+    metrics.observe("http_request_db_round_trips", request.db_round_trips, ROUND_TRIP_BUCKETS, route=route)
+    for stage, ms in request.stages:
+        metrics.observe("stage_duration_ms", ms, route=route, stage=stage)
+
+
+def _observe_stage(stage: str, ms: float) -> None:
+    request = _current.get()
+    if request is not None:
+        request.stages.append((stage, ms))
+    else:
+        metrics.observe("stage_duration_ms", ms, route="background", stage=stage)
+
+
+stage_observers.append(_observe_stage)
+
+
+def record_llm(call: str, started: float, response: Any = None) -> None:
+    """Latency of one Gemini call, plus its token counts when the response carries usage metadata."""
+    metrics.observe("llm_duration_ms", (time.perf_counter() - started) * 1000, call=call)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        metrics.observe("llm_input_tokens", getattr(usage, "prompt_token_count", 0) or 0, COUNT_BUCKETS, call=call)
+        metrics.observe("llm_output_tokens", getattr(usage, "candidates_token_count", 0) or 0, COUNT_BUCKETS, call=call)
+
+
+def record_db(kind: str, started: float, rows: int) -> None:
+    """One database round trip ("postgres" via asyncpg, "sandbox" for generated SQL, "postgrest" via supabase)."""
+    request = _current.get()
+    if request is not None:
+        request.db_round_trips += 1
+    metrics.observe("db_duration_ms", (time.perf_counter() - started) * 1000, kind=kind)
+    metrics.observe("db_rows", rows, COUNT_BUCKETS, kind=kind)
+    metrics.inc("db_round_trips_total", kind=kind)
+
+
+async def watch_loop_lag(interval: float) -> None:
+    """How late a sleep(interval) wakes up: time the event loop could not run anything else."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        metrics.observe("event_loop_lag_ms", max(0.0, time.perf_counter() - start - interval) * 1000, LAG_BUCKETS)
+
+
+# -------------------------------
+# Sampling profiler
+# -------------------------------
+class SamplingProfiler:
+    """
+    While at least one profiled request is in flight, a thread samples the event-loop
+    thread's stack every interval_ms and counts stacks in the folded format that
+    flamegraph.pl and speedscope read. The loop interleaves requests, so a sample shows
+    whatever the loop was doing at that moment, not only the profiled request.
+    """
+
+    def __init__(self, interval_ms: float, max_stacks: int):
+        self.interval = interval_ms / 1000
+        self.max_stacks = max_stacks
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._active = 0
+        self._target: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    def begin(self) -> None:
+        # Called on the event-loop thread, which is the one sampled
+        with self._lock:
+            self._target = threading.get_ident()
+            self._active += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def end(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._active <= 0:
+                    self._thread = None
+                    return
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        key = ";".join(reversed(stack))
+        if key not in self.stacks and len(self.stacks) >= self.max_stacks:
+            key = "[other stacks]"
+        self.stacks[key] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def reset(self) -> None:
+        self.stacks.clear()
+        self.samples = 0
+
+    async def capture(self, seconds: float) -> str:
+        """Profile everything the loop does for the next `seconds`, separately from the sampled requests."""
+        profiler = SamplingProfiler(self.interval * 1000, self.max_stacks)
+        profiler.begin()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.end()
+        return profiler.folded()
+
+
+profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS, settings.PROFILE_MAX_STACKS)
@@ -0,0 +1,236 @@
+# Prompt templates for the Gemini calls.
+# Static text (instructions, output formats, the full KB/schema) is built once; the KB and
+# schema are serialized in compact JSON once per content version. Per-request assembly only
+# adds the question and whatever per-request context there is.
+import asyncio
+import datetime
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.content_store import content_store
+
+
+def compact_json(value: Any) -> str:
+    # No indentation or padding: whitespace is billed as input tokens too
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+# -------------------------------
+# Templates
+# -------------------------------
+class PromptTemplate:
+    """Fixed instruction parts, then a labelled context part and the labelled user question.
+
+    A per-question supplement (e.g. directory matches) goes in its own part next to the question,
+    so the instructions and context stay a fixed, cacheable prefix.
+    """
+
+    def __init__(self, name: str, instructions: Tuple[str, ...], context_label: str, question_label: str = "USER_QUESTION",
+                 supplement_label: str = "SUPPLEMENT"):
+        self.name = name
+        self.instructions = instructions
+        self.context_label = f"{context_label}:\n"
+        self.question_label = f"{question_label}:\n"
+        self.supplement_label = f"{supplement_label}:\n"
+        self._instruction_parts = tuple({"text": text} for text in instructions)
+
+    def prefix_texts(self, context_text: str) -> List[str]:
+        """Everything before the question, e.g. to upload as a Gemini cached context."""
+        return [*self.instructions, self.context_label + context_text]
+
+    def message(self, context_text: str, question: str, supplement: str = "") -> Dict[str, Any]:
+        return {
+            "role": "user",
+            "parts": [
+                *self._instruction_parts,
+                {"text": self.context_label + context_text},
+                *self._question_parts(question, supplement),
+            ],
+        }
+
+    def question_message(self, question: str, supplement: str = "") -> Dict[str, Any]:
+        # For use with a cached prefix, which already holds the instructions and context
+        return {"role": "user", "parts": self._question_parts(question, supplement)}
+
+    def _question_parts(self, question: str, supplement: str) -> List[Dict[str, str]]:
+        parts = [{"text": self.supplement_label + supplement}] if supplement else []
+        parts.append({"text": self.question_label + question})
+        return parts
+
+
+SQL_INSTRUCTIONS = (
+    "You are a SQL query generator for a PostgreSQL database. "
+    "Always generate a valid SQL query using ONLY the tables and columns provided in the SCHEMA_JSON. "
+    "Use ILIKE for text/varchar search and ::text ILIKE for JSONB search. "
+    "Return ONLY the SQL query, nothing else. "
+    "If you cannot answer, return a SQL SELECT statement that would be valid for the schema."
+)
+
+KNOWLEDGE_INSTRUCTIONS = (
+    "You are StartupTN Assistant specialized in knowledge retrieval.\n"
+    "Rules:\n"
+    "1. Always use the provided KNOWLEDGE_BASE JSON.\n"
+    "2. For registration/application queries, check 'programs -> TANFUND -> wizard'.\n"
+    "3. List required fields step by step with relevant URLs from 'urls_hint'.\n"
+    "4. For ecosystem queries, use 'ecosystem' section.\n"
+    "5. Always answer clearly with actionable steps.\n"
+    "6. Include all relevant URLs from JSON.\n"
+    "7. Never refuse to answer.\n"
+)
+
+SQL_TEMPLATE = PromptTemplate("sql", (SQL_INSTRUCTIONS,), "SCHEMA_JSON")
+KNOWLEDGE_TEMPLATE = PromptTemplate(
+    "knowledge", (KNOWLEDGE_INSTRUCTIONS, "CONTEXT_VERSION: 2.5"), "KNOWLEDGE_BASE", supplement_label="DIRECTORY_MATCHES"
+)
+
+INTENT_INSTRUCTIONS = """Extract the following from the user query: sector, stage, geography, query_type (funding, mentorship, compliance, corporate partnership, export, etc.). Rewrite the query in a structured JSON format for database search. If a field is not present, use null. Example Output:
+
+{
+  "query_type": "compliance",
+  "sector": null,
+  "stage": "growth",
+  "geography": "Coimbatore",
+  "keywords": ["compliance support", "legal", "GST filing"]
+}
+"""
+
+INTENT_PROMPT = INTENT_INSTRUCTIONS + "\nUser query: "
+
+# Several queries in one call (GeminiService micro-batching); each query is a JSON string so
+# its text cannot run into the next one
+INTENT_BATCH_PROMPT = INTENT_INSTRUCTIONS + """
+Do this for each numbered user query below, independently. Answer with {"results": [...]}: one
+object per query, with "index" set to the query's number.
+
+User queries:
+"""
+
+ACTION_PLAN_HEAD = """You are an AI that generates structured JSON action plans.
+
+### Rules:
+- Respond ONLY with valid JSON.
+- Do not include explanations, Markdown, or text outside the JSON.
+- If no relevant results are found, return:
+  {"action_plan": [], "message": "No relevant results found for your query."}
+
+### Input:
+- User Query: """
+
+ACTION_PLAN_TAIL = """
+### Output JSON Format:
+{"action_plan": [{"entity_name": "string", "entity_type": "string", "reason_relevant": "string", "next_steps": ["string", "..."]}], "message": "string (optional)"}
+"""
+
+
+def intent_prompt(query: str) -> str:
+    return INTENT_PROMPT + query
+
+
+def intent_batch_prompt(queries: List[str]) -> str:
+    return INTENT_BATCH_PROMPT + "\n".join(f"{i}. {compact_json(query)}" for i, query in enumerate(queries, 1))
+
+
+def action_plan_prompt(original_query: str, structured_query: Dict[str, Any], search_results: List[Dict[str, Any]]) -> str:
+    return "".join((
+        ACTION_PLAN_HEAD, original_query,
+        "\n- Structured Query: ", compact_json(structured_query),
+        "\n- Search Results: ", compact_json(search_results), "\n",
+        ACTION_PLAN_TAIL,
+    ))
+
+
+# -------------------------------
+# Static context
+# -------------------------------
+class StaticContext:
+    """Compact text of the full KB and schema, serialized once per content version."""
+
+    def __init__(self):
+        self._texts: Dict[str, Tuple[str, str]] = {}
+
+    def text(self, name: str) -> str:
+        version = content_store.version
+        cached = self._texts.get(name)
+        if cached is None or cached[0] != version:
+            value = content_store.kb if name == "kb" else content_store.schema
+            cached = (version, compact_json(value))
+            self._texts[name] = cached
+        return cached[1]
+
+    def serialize(self, context: Union[Dict[str, Any], str]) -> Tuple[str, Optional[str]]:
+        """Context text, plus "kb"/"schema" when it is the full current content (cacheable upstream)."""
+        if isinstance(context, str):
+            return context, None
+        for name, value in (("kb", content_store.kb), ("schema", content_store.schema)):
+            if context is value:
+                return self.text(name), name
+        return compact_json(context), None
+
+
+static_context = StaticContext()
+
+
+# -------------------------------
+# Gemini context caching
+# -------------------------------
+class GeminiContextCache:
+    """
+    Uploads large static prompt prefixes (instructions plus the full KB or schema) as Gemini
+    cached content, once per content version, so requests only send the question. Anything
+    that goes wrong falls back to sending the prefix inline.
+    """
+
+    # Seconds before expiry at which a cached prefix is recreated, and after a failed create.
+    # Superseded caches are left to expire: in-flight requests may still reference them.
+    RENEW_MARGIN = 60
+    RETRY_AFTER = 300
+
+    def __init__(self):
+        # key -> (content version, renew at, model or None after a failure)
+        self._entries: Dict[str, Tuple[str, float, Optional[Any]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"created": 0, "hits": 0, "failures": 0}
+
+    async def model_for(self, key: str, model_name: str, prefix_texts: List[str]) -> Optional[Any]:
+        if not settings.GEMINI_CONTEXT_CACHE_ENABLED:
+            return None
+        # Below the API's minimum cacheable size the create call would just fail
+        if sum(len(text) for text in prefix_texts) < settings.GEMINI_CONTEXT_CACHE_MIN_CHARS:
+            return None
+        version = content_store.version
+        entry = self._entries.get(key)
+        if entry and entry[0] == version and entry[1] > time.time():
+            if entry[2] is not None:
+                self.stats["hits"] += 1
+            return entry[2]
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and entry[1] > time.time():
+                return entry[2]
+            ttl = settings.GEMINI_CONTEXT_CACHE_TTL
+            try:
+                genai = clients.genai()
+                cached = await asyncio.to_thread(
+                    genai.caching.CachedContent.create,
+                    model=f"models/{model_name}",
+                    display_name=f"dockyard-{key}-{version}",
+                    contents=[{"role": "user", "parts": [{"text": text} for text in prefix_texts]}],
+                    ttl=datetime.timedelta(seconds=ttl),
+                )
+                model = genai.GenerativeModel.from_cached_content(cached)
+            except Exception as e:
+                self.stats["failures"] += 1
+                logging.warning(f"Gemini context cache for {key} unavailable, sending the prefix inline: {e!r}")
+                self._entries[key] = (version, time.time() + self.RETRY_AFTER, None)
+                return None
+            self._entries[key] = (version, time.time() + ttl - self.RENEW_MARGIN, model)
+            self.stats["created"] += 1
+            return model
+
+
+context_cache = GeminiContextCache()
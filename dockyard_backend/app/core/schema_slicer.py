@@ -0,0 +1,123 @@
+# Picks the db_schema tables relevant to a question so database-mode prompts
+# carry a small schema slice instead of all 30+ tables.
+import json
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Set, Tuple
+
+from app.core.cache import query_tokens
+from app.core.config import settings
+from app.core.content_store import content_store
+
+# Where a term hits a table matters: its name beats its columns beats its usage notes
+NAME_WEIGHT = 3.0
+COLUMN_WEIGHT = 2.0
+USAGE_WEIGHT = 1.0
+# Tables sent when nothing in the question matches
+DEFAULT_TABLES = ("startups", "investors", "schemes", "mentors", "services_marketplace")
+# Bookkeeping columns and filler words from the usage notes; they say nothing about relevance
+_IGNORED_TOKENS = {
+    "id", "created", "updated", "deleted", "at", "search", "return", "by", "or", "in",
+    "from", "all", "if", "using", "field", "exist", "associated", "keyword", "like",
+}
+_SUFFIXES = ("ations", "ation", "ators", "ator", "ated", "ing", "ers", "er", "ed", "s")
+
+
+def _stem(token: str) -> str:
+    # Just enough to meet "founded"/"founders" or "startups"/"startup_id" halfway
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def _tokens(text: str) -> Set[str]:
+    return {_stem(t) for t in query_tokens(text)} - _IGNORED_TOKENS
+
+
+def foreign_keys(tables: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """For each table, the tables its `<x>_id` columns point at (matched on the other table's first column)."""
+    owners = {spec["columns"][0]: name for name, spec in tables.items() if spec.get("columns")}
+    references: Dict[str, Set[str]] = {name: set() for name in tables}
+    for name, spec in tables.items():
+        for column in spec.get("columns", [])[1:]:
+            owner = owners.get(column)
+            if owner and owner != name:
+                references[name].add(owner)
+    return references
+
+
+class SchemaSlicer:
+    def __init__(self, schema: Dict[str, Any]):
+        self.rebuild(schema)
+
+    def rebuild(self, schema: Dict[str, Any]) -> None:
+        tables = schema.get("tables", {})
+        fields = {
+            name: (
+                # Each word of a compound name ("startup_mentor_matchmaking") only carries part of it
+                {t: 1.0 / len(_tokens(name)) for t in _tokens(name)},
+                _tokens(" ".join(spec.get("columns", []))),
+                _tokens(spec.get("usage", "")),
+            )
+            for name, spec in tables.items()
+        }
+        df: Dict[str, int] = {}
+        for name_tokens, column_tokens, usage_tokens in fields.values():
+            for term in set(name_tokens) | column_tokens | usage_tokens:
+                df[term] = df.get(term, 0) + 1
+        n = len(tables)
+        idf = {term: math.log(1 + n / count) for term, count in df.items()}
+        self._state = (tables, fields, idf, foreign_keys(tables))
+        self._serialize.cache_clear()
+
+    def rank(self, question: str) -> List[Tuple[float, str]]:
+        tables, fields, idf, _ = self._state
+        terms = _tokens(question)
+        ranked = []
+        for name, (name_tokens, column_tokens, usage_tokens) in fields.items():
+            score = sum(
+                idf.get(term, 0.0) * (
+                    NAME_WEIGHT * name_tokens.get(term, 0.0)
+                    + COLUMN_WEIGHT * (term in column_tokens)
+                    + USAGE_WEIGHT * (term in usage_tokens)
+                )
+                for term in terms
+            )
+            if score > 0:
+                ranked.append((score, name))
+        ranked.sort(reverse=True)
+        return ranked
+
+    def select(self, question: str) -> Tuple[str, ...]:
+        tables, _, _, references = self._state
+        ranked = self.rank(question)
+        if not ranked:
+            return tuple(t for t in DEFAULT_TABLES if t in tables)
+        top_score = ranked[0][0]
+        # Keep tables scoring within SCHEMA_SLICE_MIN_RATIO of the best one
+        chosen = [
+            name for score, name in ranked[:settings.SCHEMA_SLICE_MAX_TABLES]
+            if score >= top_score * settings.SCHEMA_SLICE_MIN_RATIO
+        ]
+        # Tables the chosen ones point at (financials.startup_id -> startups) so the model can
+        # write the JOIN, as long as the question touches them at all
+        scores = {name: score for score, name in ranked}
+        neighbours: List[str] = []
+        for name in chosen:
+            for other in sorted(references[name], key=lambda t: -scores.get(t, 0.0)):
+                if other in scores and other not in chosen and other not in neighbours:
+                    neighbours.append(other)
+        return tuple(sorted(chosen + neighbours[:settings.SCHEMA_SLICE_MAX_NEIGHBOURS]))
+
+    def slice_text(self, question: str) -> str:
+        return self._serialize(self.select(question))
+
+    @lru_cache(maxsize=512)
+    def _serialize(self, table_names: Tuple[str, ...]) -> str:
+        tables = self._state[0]
+        return json.dumps({"tables": {name: tables[name] for name in table_names}}, separators=(",", ":"))
+
+
+schema_slicer = SchemaSlicer(content_store.schema)
+content_store.subscribe(("schema",), lambda: schema_slicer.rebuild(content_store.schema))
@@ -1,19 +1,136 @@
 # This module provides functions to answer queries using the StartupTN unified JSON knowledge base.
-from .startup_tn_knowledge_base import startup_tn_knowledge_base
+import bisect
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+from .content_store import content_store
+
+# Ecosystem field holding ISO (YYYY-MM-DD) dates; these also get a sorted index for range queries
+DATE_FIELD = "date"
+
+
+def _norm(value: Any) -> Optional[str]:
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return str(value).strip().casefold()
+    return None
+
+
+def _freeze(index: Dict[str, Dict[str, List[int]]]) -> Dict[str, Dict[str, Tuple[int, ...]]]:
+    return {field: {key: tuple(positions) for key, positions in values.items()} for field, values in index.items()}
+
+
+class KBSnapshot:
+    """
+    Immutable, pre-indexed view of one knowledge base version. Built once at load time;
+    readers hold a reference to a snapshot, so swapping in a new one never disturbs them.
+    Entities are shared with callers and must be treated as read-only.
+    """
+
+    def __init__(self, kb: Dict[str, Any]):
+        self.kb = copy.deepcopy(kb)
+        # program -> (sections_order, sections, urls_hint, submit)
+        self.programs: Dict[str, Tuple[list, dict, dict, dict]] = {}
+        # casefolded program name -> name as written in the KB
+        self.program_names: Dict[str, str] = {}
+        for name, program in self.kb.get("programs", {}).items():
+            wizard = program.get("wizard", {})
+            self.programs[name] = (
+                wizard.get("sections_order", []), wizard.get("sections", {}),
+                wizard.get("urls_hint", {}), wizard.get("submit", {}),
+            )
+            self.program_names.setdefault(_norm(name), name)
+
+        self.ecosystem: Dict[str, list] = self.kb.get("ecosystem", {})
+        # entity_type -> field -> casefolded value -> entity positions (ascending)
+        self.indexes: Dict[str, Dict[str, Dict[str, Tuple[int, ...]]]] = {}
+        # The same, for plain text fields only: their distinct values are scanned for substrings
+        self.text_indexes: Dict[str, Dict[str, Dict[str, Tuple[int, ...]]]] = {}
+        # entity_type -> (sorted dates, positions in the same order)
+        self.dates: Dict[str, Tuple[List[str], List[int]]] = {}
+        for entity_type, entities in self.ecosystem.items():
+            if not isinstance(entities, list):
+                continue
+            index: Dict[str, Dict[str, List[int]]] = {}
+            text_index: Dict[str, Dict[str, List[int]]] = {}
+            dated = []
+            for pos, entity in enumerate(entities):
+                for field, value in entity.items():
+                    values = value if isinstance(value, list) else [value]
+                    for key in {_norm(v) for v in values} - {None}:
+                        index.setdefault(field, {}).setdefault(key, []).append(pos)
+                    if isinstance(value, str):
+                        text_index.setdefault(field, {}).setdefault(_norm(value), []).append(pos)
+                if isinstance(entity.get(DATE_FIELD), str):
+                    dated.append((entity[DATE_FIELD], pos))
+            self.indexes[entity_type] = _freeze(index)
+            self.text_indexes[entity_type] = _freeze(text_index)
+            dated.sort()
+            self.dates[entity_type] = ([d for d, _ in dated], [p for _, p in dated])
+
+    def program(self, name: str) -> Optional[Tuple[list, dict, dict, dict]]:
+        """A program by name, case-insensitively (an exact spelling wins)."""
+        program = self.programs.get(name)
+        if program is None:
+            program = self.programs.get(self.program_names.get(_norm(name)))
+        return program
+
+    def lookup(self, entity_type: str, filters: Dict[str, Any]) -> Optional[set]:
+        """
+        Positions matching every field=value filter, or None when unfiltered. Case-insensitive; a
+        list field matches one of its items, a text field also matches on a substring
+        ("Chennai" finds "Chennai, Tamil Nadu").
+        """
+        matched: Optional[set] = None
+        # Smallest posting list first keeps the intersection cheap
+        postings = sorted((self._postings(entity_type, field, value) for field, value in filters.items()), key=len)
+        for positions in postings:
+            matched = set(positions) if matched is None else matched.intersection(positions)
+            if not matched:
+                return set()
+        return matched
+
+    def _postings(self, entity_type: str, field: str, value: Any) -> Tuple[int, ...]:
+        key = _norm(value)
+        exact = self.indexes.get(entity_type, {}).get(field, {}).get(key, ())
+        if not isinstance(key, str) or not key:
+            return exact
+        # Distinct text values are few next to the entities, so scanning them stays cheap
+        partial = [
+            positions for text, positions in self.text_indexes.get(entity_type, {}).get(field, {}).items()
+            if key in text and text != key
+        ]
+        if not partial:
+            return exact
+        return tuple(sorted(set(exact).union(*partial)))
+
+    def date_range(self, entity_type: str, date_from: Optional[str], date_to: Optional[str]) -> set:
+        dates, positions = self.dates.get(entity_type, ([], []))
+        lo = bisect.bisect_left(dates, date_from) if date_from else 0
+        # Inclusive upper bound on the date prefix, so "2025-11" covers the whole month
+        hi = bisect.bisect_right(dates, date_to + "\uffff") if date_to else len(dates)
+        return set(positions[lo:hi])
+
 
 class StartupTNKnowledgeBase:
-    def __init__(self):
-        self.kb = startup_tn_knowledge_base
+    def __init__(self, kb: Optional[Dict[str, Any]] = None):
+        self.snapshot = KBSnapshot(kb if kb is not None else content_store.kb)
+
+    @property
+    def kb(self) -> Dict[str, Any]:
+        return self.snapshot.kb
+
+    def load(self, kb: Dict[str, Any]) -> None:
+        """Build the indexes for a new KB off to the side, then swap the snapshot in one assignment."""
+        self.snapshot = KBSnapshot(kb)
 
     def get_program_sections(self, program_name):
-        program = self.kb["programs"].get(program_name)
-        if not program:
-            return None
-        wizard = program.get("wizard", {})
-        return wizard.get("sections_order", []), wizard.get("sections", {}), wizard.get("urls_hint", {}), wizard.get("submit", {})
+        return self.snapshot.program(program_name)
 
     def get_section_fields(self, program_name, section_name):
-        _, sections, urls_hint, _ = self.get_program_sections(program_name)
+        program = self.snapshot.program(program_name)
+        if not program:
+            return None
+        _, sections, urls_hint, _ = program
         section = sections.get(section_name)
         if not section:
             return None
@@ -23,14 +140,29 @@ class StartupTNKnowledgeBase:
         return required, repeaters, url
 
     def get_submit_info(self, program_name):
-        _, _, _, submit = self.get_program_sections(program_name)
-        return submit
+        program = self.snapshot.program(program_name)
+        if not program:
+            return None
+        return program[3]
+
+    def find(self, entity_type, filters=None, date_from=None, date_to=None):
+        """Entities matching all filters and the (inclusive) date range, in KB order."""
+        snapshot = self.snapshot
+        entities = snapshot.ecosystem.get(entity_type, [])
+        matched = snapshot.lookup(entity_type, filters or {})
+        if date_from or date_to:
+            in_range = snapshot.date_range(entity_type, date_from, date_to)
+            matched = in_range if matched is None else matched & in_range
+        if matched is None:
+            return entities
+        return [entities[pos] for pos in sorted(matched)]
 
     def get_ecosystem(self, entity_type=None, filter_key=None, filter_value=None):
-        eco = self.kb["ecosystem"]
         if entity_type:
-            entities = eco.get(entity_type, [])
-            if filter_key and filter_value:
-                return [e for e in entities if filter_value in e.get(filter_key, []) or filter_value == e.get(filter_key)]
-            return entities
-        return eco
+            filters = {filter_key: filter_value} if filter_key and filter_value else None
+            return self.find(entity_type, filters)
+        return self.snapshot.ecosystem
+
+
+startup_tn_kb = StartupTNKnowledgeBase()
+content_store.subscribe(("kb",), lambda: startup_tn_kb.load(content_store.kb))
@@ -0,0 +1,66 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("app.timing")
+
+# Called with (stage, ms) whenever a StageTimer stage ends; app/core/metrics.py feeds its histograms from here
+stage_observers: List[Callable[[str, float], None]] = []
+
+
+class StageTimer:
+    """Collects wall-clock durations (ms) for the named stages of one request."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + ms
+            for observer in stage_observers:
+                observer(name, ms)
+
+    def server_timing(self) -> str:
+        # https://www.w3.org/TR/server-timing/ - shows up in browser devtools
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.stages.items())
+
+    def log(self, endpoint: str) -> None:
+        logger.info("%s %s", endpoint, " ".join(f"{name}={ms:.1f}ms" for name, ms in self.stages.items()))
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram (ms) with fixed buckets, Prometheus-style. Other buckets suit other values (tokens, rows)."""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, buckets: Optional[Iterable[float]] = None):
+        self.buckets = tuple(buckets) if buckets else self.BUCKETS_MS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        cumulative, buckets = 0, {}
+        for bound, n in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += n
+            buckets[f"le_{bound}"] = cumulative
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "buckets": buckets,
+        }
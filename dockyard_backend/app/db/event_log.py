@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import record_db
+from app.core.prompts import compact_json
+from app.db import pool
+
+# -------------------------------
+# Write-behind event logging
+# -------------------------------
+# Requests append search/action events to an in-memory buffer and return; a background task
+# (started by ServiceContainer) writes them to search_logs / action_logs with one COPY per
+# batch, when EVENT_LOG_BATCH_SIZE rows are waiting or every EVENT_LOG_FLUSH_INTERVAL
+# seconds. The buffer is bounded: past EVENT_LOG_MAX_PENDING rows new events are dropped and
+# counted. Whatever is still buffered is flushed on graceful shutdown.
+
+
+class WriteBehindLog:
+    def __init__(self, table: str, columns: Tuple[str, ...]):
+        self.table = table
+        self.columns = columns
+        self._pending: Deque[tuple] = deque()
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0}
+        self.last_flush_ms: Optional[float] = None
+
+    def record(self, *values: Any) -> None:
+        """Buffer one row; never waits on the database."""
+        if not settings.EVENT_LOG_ENABLED or not settings.SUPABASE_DB_URL:
+            return
+        if len(self._pending) >= settings.EVENT_LOG_MAX_PENDING:
+            self.stats["dropped"] += 1
+            return
+        self._pending.append(values)
+        self.stats["recorded"] += 1
+        if len(self._pending) >= settings.EVENT_LOG_BATCH_SIZE:
+            self._wake.set()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.EVENT_LOG_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            while self._pending:
+                size = min(settings.EVENT_LOG_BATCH_SIZE, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(size)]
+                started = time.perf_counter()
+                try:
+                    async with pool.acquire() as conn:
+                        await conn.copy_records_to_table(
+                            self.table, records=batch, columns=self.columns, timeout=settings.DB_QUERY_TIMEOUT
+                        )
+                except asyncio.CancelledError:
+                    # Stopped mid-write (shutdown): keep the batch for the final flush
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                except Exception as e:
+                    # The rows are not retried: a database that is down would only make the buffer grow.
+                    # Later rows stay buffered for the next flush.
+                    self.stats["failed"] += len(batch)
+                    logging.warning(f"Could not write {len(batch)} rows to {self.table}: {e!r}")
+                    return
+                record_db("postgres", started, len(batch))
+                self.stats["written"] += len(batch)
+                self.stats["flushes"] += 1
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._pending), "last_flush_ms": self.last_flush_ms}
+
+
+search_log = WriteBehindLog("search_logs", ("query", "intent", "parsed_filters", "results_count"))
+action_log = WriteBehindLog("action_logs", ("action_type", "entity_table", "entity_id", "metadata"))
+EVENT_LOGS = (search_log, action_log)
+
+
+def log_search(query: str, intent: Optional[str], parsed_filters: Optional[Dict[str, Any]], results_count: int) -> None:
+    filters = compact_json(parsed_filters) if parsed_filters is not None else None
+    search_log.record(query, intent, filters, results_count)
+
+
+def log_action_plan(query: str, action_plan: List[Dict[str, Any]]) -> None:
+    """One action_logs row per recommended entity of an /api/prompt action plan."""
+    for item in action_plan:
+        metadata = {"query": query, "entity_name": item.get("entity_name"), "reason_relevant": item.get("reason_relevant")}
+        action_log.record("action_plan", item.get("entity_type"), None, compact_json(metadata))
+
+
+async def run_writers() -> None:
+    await asyncio.gather(*(log.run() for log in EVENT_LOGS))
+
+
+async def flush_all() -> None:
+    await asyncio.gather(*(log.flush() for log in EVENT_LOGS))
+
+
+def event_log_stats() -> Dict[str, Any]:
+    return {log.table: log.metrics() for log in EVENT_LOGS}
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.metrics import record_db
+
+# -------------------------------
+# Shared asyncpg pool
+# -------------------------------
+# Created once, in the background right after startup (ServiceContainer.warmup). Set
+# DB_STATEMENT_CACHE_SIZE=0 when SUPABASE_DB_URL points at the pgbouncer
+# transaction pooler, which does not support prepared statements.
+
+_pool: Optional[asyncpg.Pool] = None
+_stats = {
+    "queries": 0,
+    "fallback_connections": 0,
+    "acquire_timeouts": 0,
+    "query_timeouts": 0,
+}
+
+
+async def init_pool() -> Optional[asyncpg.Pool]:
+    global _pool
+    if _pool is None:
+        if not settings.SUPABASE_DB_URL:
+            logging.warning("SUPABASE_DB_URL is not set; the asyncpg pool is not created")
+            return None
+        _pool = await asyncpg.create_pool(
+            settings.SUPABASE_DB_URL,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            command_timeout=settings.DB_QUERY_TIMEOUT,
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+            max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+        )
+    return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+def get_pool() -> Optional[asyncpg.Pool]:
+    return _pool
+
+
+def pool_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_stats)
+    if _pool is None:
+        stats["status"] = "closed"
+        return stats
+    stats.update(
+        status="open",
+        size=_pool.get_size(),
+        idle=_pool.get_idle_size(),
+        min_size=_pool.get_min_size(),
+        max_size=_pool.get_max_size(),
+    )
+    stats["in_use"] = stats["size"] - stats["idle"]
+    return stats
+
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
+    """A pooled connection, or a dedicated one when there is no pool (scripts, startup failures) or it is saturated."""
+    conn = None
+    if _pool is not None:
+        try:
+            conn = await _pool.acquire(timeout=settings.DB_POOL_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            _stats["acquire_timeouts"] += 1
+            logging.warning("asyncpg pool saturated, running query on a dedicated connection")
+    if conn is not None:
+        try:
+            yield conn
+        finally:
+            await _pool.release(conn)
+        return
+    _stats["fallback_connections"] += 1
+    conn = await asyncpg.connect(settings.SUPABASE_DB_URL, statement_cache_size=0)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+async def fetch(query: str, *args, timeout: Optional[float] = None) -> List[asyncpg.Record]:
+    timeout = timeout or settings.DB_QUERY_TIMEOUT
+    _stats["queries"] += 1
+    started = time.perf_counter()
+    try:
+        async with acquire() as conn:
+            rows = await conn.fetch(query, *args, timeout=timeout)
+        record_db("postgres", started, len(rows))
+        return rows
+    except asyncio.TimeoutError:
+        _stats["query_timeouts"] += 1
+        raise
@@ -1,16 +1,52 @@
-from supabase import Client
-from typing import List, Dict, Any
+import asyncio
+import time
+
+from typing import TYPE_CHECKING, List, Dict, Any
 import json
 
-def search_services(supabase: Client, keywords: list[str]) -> list[dict]:
-    query = supabase.table("services_marketplace").select("service_name, description, access_link")
-    for kw in keywords:
-        query = query.or_(f"category.ilike.%{{kw}}%,description.ilike.%{{kw}}%,service_name.ilike.%{{kw}}%")
-    return query.execute().data
+from app.core.config import settings
+from app.core.metrics import record_db
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+def _execute(query) -> list[dict]:
+    # One PostgREST round trip; runs in a worker thread
+    started = time.perf_counter()
+    data = query.execute().data
+    record_db("postgrest", started, len(data))
+    return data
+
+
+def search_services(supabase: "Client", keywords: list[str]) -> list[dict]:
+    # Ranked full-text/trigram search, see migrations/001_services_marketplace_search.sql
+    unique_keywords = list(dict.fromkeys(kw.strip().lower() for kw in keywords if kw and kw.strip()))
+    if not unique_keywords:
+        return []
+    query = supabase.rpc(
+        "search_services_ranked",
+        {"keywords": unique_keywords, "max_results": settings.SERVICES_SEARCH_LIMIT},
+    ).select("service_name, description, access_link, category, updated_at")
+    return _execute(query)
+
 
-def search_funding_entities(supabase: Client, sector: str | None, geography: str | None, min_revenue: float | None) -> List[Dict[str, Any]]:
-    query_investors = supabase.table("investors").select("investor_name, email, linkedin_profile_url, investment_focus_sectors, investment_focus_stages, geographical_focus, average_ticket_size")
-    query_startups = supabase.table("startups").select("startup_name, website_url, short_description, sector, stage")
+INVESTOR_COLUMNS = ("investor_name", "email", "linkedin_profile_url", "investment_focus_sectors", "investment_focus_stages", "geographical_focus", "average_ticket_size")
+
+
+async def search_funding_entities(supabase: "Client", sector: str | None, geography: str | None, min_revenue: float | None,
+                                  with_investors: bool = True) -> List[Dict[str, Any]]:
+    """Investors and startups for a funding query; with_investors=False when the caller ranks investors itself (matchmaking)."""
+    query_investors = supabase.table("investors").select(", ".join(INVESTOR_COLUMNS))
+    startup_columns = "startup_name, website_url, short_description, sector, stage"
+
+    if min_revenue is not None:
+        # Inner-join financials so the revenue filter runs inside the same PostgREST request
+        # instead of shipping every matching startup_id back and forth
+        query_startups = supabase.table("startups").select(f"{startup_columns}, financials!inner(revenue_last_fy)")
+        query_startups = query_startups.gte("financials.revenue_last_fy", min_revenue)
+    else:
+        query_startups = supabase.table("startups").select(startup_columns)
 
     if sector:
         # Ensure the JSON array for containment is passed as a quoted JSON string literal
@@ -20,27 +56,24 @@ def search_funding_entities(supabase: Client, sector: str | None, geography: str
     if geography:
         query_investors = query_investors.ilike("geographical_focus", f"%{geography}%")
         query_startups = query_startups.ilike("district", f"%{geography}%")
-    
-    if min_revenue is not None:
-        # Correct usage of gte and in_ for subquery
-        revenue_filtered_startup_ids = supabase.table("financials").select("startup_id").gte("revenue_last_fy", min_revenue).execute().data
-        startup_ids_list = [item["startup_id"] for item in revenue_filtered_startup_ids]
-        if startup_ids_list:
-            query_startups = query_startups.in_("startup_id", startup_ids_list)
-        else:
-            # If no startups match the revenue criteria, ensure no startups are returned
-            query_startups = query_startups.in_("startup_id", [-1]) # Use a non-existent ID to return empty
-
-    investors_data = query_investors.limit(5).execute().data
-    startups_data = query_startups.limit(5).execute().data
+
+    # The supabase client is synchronous; run both lookups side by side off the event loop
+    if with_investors:
+        investors_data, startups_data = await asyncio.gather(
+            asyncio.to_thread(_execute, query_investors.limit(settings.FUNDING_SEARCH_LIMIT)),
+            asyncio.to_thread(_execute, query_startups.limit(settings.FUNDING_SEARCH_LIMIT)),
+        )
+    else:
+        investors_data = []
+        startups_data = await asyncio.to_thread(_execute, query_startups.limit(settings.FUNDING_SEARCH_LIMIT))
 
     results = []
     for item in investors_data:
         item["type"] = "investor"
         results.append(item)
     for item in startups_data:
+        item.pop("financials", None)
         item["type"] = "startup"
         results.append(item)
         
     return results
-
@@ -0,0 +1,259 @@
+import json
+import logging
+import re
+import time
+from typing import Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.content_store import content_store
+from app.core.metrics import record_db
+from app.db import pool
+
+# -------------------------------
+# Sandbox for Gemini-generated SQL
+# -------------------------------
+# Generated SQL is untrusted input. Before it reaches Postgres it must be a single
+# SELECT/WITH statement over tables listed in db_schema; it then runs in a read-only
+# transaction with a statement_timeout, behind an EXPLAIN cost check, with a row cap
+# enforced both by an outer LIMIT and by reading through a cursor.
+
+
+class UnsafeQueryError(ValueError):
+    pass
+
+
+class QueryTooExpensiveError(UnsafeQueryError):
+    pass
+
+
+class Token(NamedTuple):
+    kind: str  # "word", "quoted", "string", "number", "param", "punct"
+    value: str
+    end: int  # offset just past the token in the original text
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<space>\s+|--[^\n]*|/\*.*?\*/)
+    | (?P<string>[eE]?'(?:[^']|'')*')
+    | (?P<dollar>\$(?P<tag>[A-Za-z_]*)\$.*?\$(?P=tag)\$)
+    | (?P<quoted>"(?:[^"]|"")*")
+    | (?P<param>\$\d+)
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<punct>::|<=|>=|<>|!=|\|\||[^\s])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Statements and clauses that write, lock, change session state or reach outside the query
+FORBIDDEN_WORDS = {
+    "insert", "update", "delete", "merge", "upsert", "drop", "alter", "create", "truncate",
+    "grant", "revoke", "copy", "call", "do", "execute", "prepare", "deallocate", "lock",
+    "vacuum", "analyze", "cluster", "reindex", "refresh", "set", "reset", "listen", "notify",
+    "unlisten", "into", "begin", "commit", "rollback", "savepoint", "discard", "load", "declare",
+}
+# Functions with side effects or access to server internals (pg_sleep, pg_read_file, dblink, ...)
+FORBIDDEN_FUNCTION_PREFIXES = ("pg_", "lo_", "dblink", "set_config", "current_setting", "txid_", "query_to_xml")
+ALLOWED_SCHEMAS = {"public"}
+
+# Words that end a FROM list or cannot be a table alias
+_CLAUSE_WORDS = {
+    "where", "group", "order", "having", "limit", "offset", "union", "intersect", "except",
+    "join", "inner", "left", "right", "full", "cross", "natural", "on", "using", "window",
+    "fetch", "for", "lateral", "returning", "select", "from", "with", "as", "and", "or", "not",
+}
+_JOIN_WORDS = {"from", "join"}
+# First word inside parentheses that hold a subquery
+_SUBQUERY_WORDS = {"select", "with", "values"}
+
+
+def tokenize(sql: str) -> List[Token]:
+    tokens, pos = [], 0
+    while pos < len(sql):
+        match = _TOKEN_RE.match(sql, pos)
+        if not match:
+            raise UnsafeQueryError(f"Unreadable SQL near: {sql[pos:pos + 20]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        value = match.group(kind)
+        if kind == "dollar":
+            kind = "string"
+        tokens.append(Token(kind, value.lower() if kind == "word" else value, pos))
+    return tokens
+
+
+def _name(token: Token) -> str:
+    return token.value.strip('"').replace('""', '"').lower() if token.kind == "quoted" else token.value
+
+
+def _skip_parens(tokens: List[Token], i: int) -> int:
+    """Index just past the parenthesised group starting at tokens[i] == "("."""
+    depth = 0
+    while i < len(tokens):
+        if tokens[i].value == "(":
+            depth += 1
+        elif tokens[i].value == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise UnsafeQueryError("Unbalanced parentheses")
+
+
+def _cte_names(tokens: List[Token]) -> Set[str]:
+    # name AS ( ... ) and name (col, ...) AS ( ... )
+    names = set()
+    for i, token in enumerate(tokens):
+        if token.kind not in ("word", "quoted"):
+            continue
+        j = i + 1
+        if j < len(tokens) and tokens[j].value == "(" and i > 0 and tokens[i - 1].value in ("with", "recursive", ","):
+            j = _skip_parens(tokens, j)
+        if j + 1 < len(tokens) and tokens[j].value == "as" and tokens[j + 1].value == "(":
+            names.add(_name(token))
+    return names
+
+
+def _argument_froms(tokens: List[Token]) -> Set[int]:
+    """
+    Positions of FROM keywords that belong to a function's arguments, as in EXTRACT(YEAR FROM d),
+    TRIM(BOTH FROM s) or SUBSTRING(s FROM 2): their innermost parentheses hold an expression, not
+    a subquery (which starts with SELECT, WITH or VALUES).
+    """
+    positions, groups = set(), []
+    for i, token in enumerate(tokens):
+        if token.value == "(":
+            groups.append(i + 1 < len(tokens) and tokens[i + 1].value not in _SUBQUERY_WORDS)
+        elif token.value == ")":
+            if groups:
+                groups.pop()
+        elif token.value == "from" and groups and groups[-1]:
+            positions.add(i)
+    return positions
+
+
+def _table_refs(tokens: List[Token]) -> List[Tuple[Optional[str], str]]:
+    """(schema, table) for every relation named after FROM/JOIN, including comma lists."""
+    refs = []
+    argument_froms = _argument_froms(tokens)
+    i = 0
+    while i < len(tokens):
+        if tokens[i].value not in _JOIN_WORDS or i in argument_froms:
+            i += 1
+            continue
+        i += 1
+        while i < len(tokens):
+            if tokens[i].value in ("lateral", "only"):
+                i += 1
+                continue
+            if tokens[i].value == "(":
+                if i + 1 < len(tokens) and tokens[i + 1].value not in _SUBQUERY_WORDS:
+                    # Parenthesised join, FROM (a JOIN b): its first relation follows the "(";
+                    # the JOINed ones are picked up by the outer scan
+                    i += 1
+                    continue
+                # Subquery; its own FROMs are picked up by the outer scan
+                break
+            if tokens[i].kind not in ("word", "quoted"):
+                break
+            parts = [_name(tokens[i])]
+            i += 1
+            while i + 1 < len(tokens) and tokens[i].value == "." and tokens[i + 1].kind in ("word", "quoted"):
+                parts.append(_name(tokens[i + 1]))
+                i += 2
+            if i < len(tokens) and tokens[i].value == "(":
+                # Set-returning function such as jsonb_array_elements(...), not a relation
+                break
+            refs.append((parts[-2] if len(parts) > 1 else None, parts[-1]))
+            # Optional alias, with or without AS
+            if i < len(tokens) and tokens[i].value == "as":
+                i += 1
+            if i < len(tokens) and tokens[i].kind in ("word", "quoted") and tokens[i].value not in _CLAUSE_WORDS:
+                i += 1
+                if i < len(tokens) and tokens[i].value == "(":
+                    i = _skip_parens(tokens, i)
+            if i < len(tokens) and tokens[i].value == ",":
+                i += 1
+                continue
+            break
+    return refs
+
+
+def validate(sql: str, allowed_tables: Iterable[str]) -> str:
+    """Return the statement (without trailing semicolons) if it is a safe read-only query, else raise."""
+    tokens = tokenize(sql)
+    while tokens and tokens[-1].value == ";":
+        tokens.pop()
+    if not tokens:
+        raise UnsafeQueryError("Empty query")
+    if any(t.value == ";" for t in tokens):
+        raise UnsafeQueryError("Only a single statement is allowed")
+    first = next((t.value for t in tokens if t.value != "("), "")
+    if first not in ("select", "with"):
+        raise UnsafeQueryError("Only SELECT and WITH queries are allowed")
+
+    for i, token in enumerate(tokens):
+        if token.kind != "word":
+            continue
+        # A preceding "." makes it a column (s.update), not a keyword
+        if token.value in FORBIDDEN_WORDS and not (i > 0 and tokens[i - 1].value == "."):
+            raise UnsafeQueryError(f"{token.value.upper()} is not allowed")
+        if i + 1 < len(tokens) and tokens[i + 1].value == "(" and token.value.startswith(FORBIDDEN_FUNCTION_PREFIXES):
+            raise UnsafeQueryError(f"Function {token.value} is not allowed")
+
+    allowed = {t.lower() for t in allowed_tables} | _cte_names(tokens)
+    for schema, table in _table_refs(tokens):
+        if schema is not None and schema not in ALLOWED_SCHEMAS:
+            raise UnsafeQueryError(f"Schema {schema} is not allowed")
+        if table not in allowed:
+            raise UnsafeQueryError(f"Table {table} is not in the schema")
+
+    # Up to the last real token: drops trailing semicolons and any comment after them
+    return sql[:tokens[-1].end].strip()
+
+
+def _plan_cost(plan: Any) -> float:
+    # EXPLAIN (FORMAT JSON) comes back as json text: [{"Plan": {"Total Cost": ...}}]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return float(plan[0]["Plan"]["Total Cost"])
+
+
+async def run_readonly(
+    sql: str,
+    *args: Any,
+    max_rows: Optional[int] = None,
+    statement_timeout_ms: Optional[int] = None,
+    max_cost: Optional[float] = None,
+) -> List[asyncpg.Record]:
+    """Validate and run generated SQL with every guard on; raises UnsafeQueryError when refused."""
+    max_rows = max_rows or settings.SQL_MAX_ROWS
+    statement_timeout_ms = statement_timeout_ms or settings.SQL_STATEMENT_TIMEOUT_MS
+    max_cost = settings.SQL_MAX_PLAN_COST if max_cost is None else max_cost
+    query = validate(sql, content_store.schema.get("tables", {}))
+    # Wrapping keeps any LIMIT/ORDER BY of the model's own and caps it from outside
+    limited = f"SELECT * FROM ({query}\n) AS generated_query LIMIT {int(max_rows)}"
+
+    started = time.perf_counter()
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            await conn.execute(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}")
+            if max_cost:
+                # Cost of the unlimited query: a LIMIT hides how much a filter has to scan
+                cost = _plan_cost(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args))
+                if cost > max_cost:
+                    logging.warning(f"Rejected generated SQL with plan cost {cost:.0f}: {query}")
+                    raise QueryTooExpensiveError(f"Query is too expensive to run (estimated cost {cost:.0f})")
+            rows = []
+            # A cursor keeps at most `prefetch` rows in flight instead of the whole result. With
+            # $n parameters the same text is reused, so asyncpg's statement cache prepares it once
+            # per pooled connection.
+            async for row in conn.cursor(limited, *args, prefetch=min(max_rows, 100)):
+                rows.append(row)
+    record_db("sandbox", started, len(rows))
+    return rows
@@ -1,8 +1,11 @@
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
 
-from app.core.config import settings
+from app.core.clients import clients
 
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_supabase_client() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
+def get_supabase_client() -> "Client":
+    # One shared client (and HTTP session) per process, created on first use
+    return clients.supabase()
@@ -1,18 +1,113 @@
 import json
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from app.api import prompt
-from app.utils.ai_db_utils import gemini_call, run_sql
+from app.api import ai, matchmaking, nlp, prompt, startuptn
+from app.utils.ai_db_utils import gemini_call, gemini_stream, generate_sql, run_sql
+from app.utils.formatters import SSE_HEADERS, sse_event
+import logging
+import time
 import traceback
-from app.core.startup_tn_knowledge_base import startup_tn_knowledge_base
-from app.core.db_schema import db_schema
+from app.core.content_store import content_store
+from app.core.metrics import begin_request, end_request, metrics, profiler
+from app.core.prompts import context_cache
+from app.db import pool
+from app.db.event_log import EVENT_LOGS, event_log_stats, log_search
+from app.core.container import ServiceContainer
+from app.core.timing import StageTimer
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.kb_retriever import knowledge_retriever
+from app.core.schema_slicer import schema_slicer
+from app.services.matchmaking import matchmaker
+from app.services.semantic_index import semantic_search
+from app.services.query_router import query_router
+from app.services.sql_plan_cache import sql_plan_cache
+from app.core.concurrency import LLMOverloadedError, gemini_limiter
 class QueryRequest(BaseModel):
 	query: str
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	container = ServiceContainer()
+	# No I/O here; the pool, SDK clients and warm-up follow in the background (see /health/ready)
+	await container.startup()
+	app.state.container = container
+	yield
+	await container.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(prompt.router, prefix="/api")
+app.include_router(nlp.router, prefix="/api")
+app.include_router(ai.router, prefix="/api")
+app.include_router(matchmaking.router, prefix="/api")
+app.include_router(startuptn.router)
+
+
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded_handler(request: Request, exc: LLMOverloadedError):
+	return JSONResponse({"error": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+
+@app.middleware("http")
+async def content_version_header(request: Request, call_next):
+	# Lets clients and shared caches tell answers from different KB/schema versions apart
+	response = await call_next(request)
+	response.headers["X-Content-Version"] = content_store.version
+	return response
+
+
+def _route_label(scope) -> str:
+	# Route template (/startuptn/program/{program_name}/sections), never the raw path with its values.
+	# Rebuilt from path_params because included routers' route objects do not carry the prefix.
+	if "route" not in scope:
+		return "unmatched"
+	names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+	return "/".join(f"{{{names[part]}}}" if part in names else part for part in scope["path"].split("/"))
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+	request_stats, token = begin_request()
+	sampled = profiler.should_sample()
+	if sampled:
+		profiler.begin()
+	started = time.perf_counter()
+	status = 500
+	try:
+		response = await call_next(request)
+		status = response.status_code
+		return response
+	finally:
+		if sampled:
+			profiler.end()
+		end_request(request_stats, token, _route_label(request.scope), request.method, status, started)
+
+
+# Read at scrape time from the stats the other endpoints already serve
+metrics.gauge("db_pool_in_use", lambda: pool.pool_stats().get("in_use", 0))
+metrics.gauge("db_pool_size", lambda: pool.pool_stats().get("size", 0))
+metrics.gauge("llm_in_flight", lambda: gemini_limiter.in_flight)
+metrics.gauge("llm_waiting", lambda: gemini_limiter.waiting)
+metrics.gauge("llm_rejected_total", lambda: gemini_limiter.rejected)
+metrics.gauge("llm_coalesced_total", lambda: response_cache.flights.coalesced)
+metrics.gauge("cache_hits_total", lambda: response_cache.stats["hits"] + response_cache.stats["near_hits"])
+metrics.gauge("cache_misses_total", lambda: response_cache.stats["misses"])
+metrics.gauge("sql_plan_cache_hits_total", lambda: sql_plan_cache.stats["hits"])
+metrics.gauge("event_log_pending", lambda: sum(log.pending() for log in EVENT_LOGS))
+metrics.gauge("event_log_dropped_total", lambda: sum(log.stats["dropped"] for log in EVENT_LOGS))
+
+
+async def _drop_cached_answers():
+	await response_cache.invalidate(content_changed=True)
+
+# Subscribed after the retriever/slicer/router imports, so indexes are rebuilt before the cache is dropped
+content_store.subscribe(("kb", "schema"), _drop_cached_answers)
 
 # Keywords for mode detection
 DB_KEYWORDS = ["revenue", "sector", "list", "show", "funding", "startups"]
@@ -27,25 +122,274 @@ def detect_mode(query: str) -> str:
 	return "knowledge"  # default to knowledge
 
 
+def _log_search(user_query: str, mode: str, route, results: list) -> None:
+	# Buffered for search_logs; parsed_filters are the slots the router recognised in the question
+	if route:
+		filters = {"entity": route.entity, **route.slots}
+	else:
+		filters = query_router.extract_slots(user_query)[1] if mode == "database" else None
+	log_search(user_query, mode, filters, len(results))
+
+
+@app.get("/health/live")
+async def liveness():
+	# The process is up and the event loop answers; nothing upstream is checked
+	return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness(request: Request):
+	status = request.app.state.container.readiness()
+	return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/health/db")
+async def db_health():
+	return pool.pool_stats()
+
+
+@app.get("/health/llm")
+async def llm_health(request: Request):
+	gemini_service = request.app.state.container.gemini_service
+	return {
+		**gemini_limiter.stats(),
+		"context_cache": context_cache.stats,
+		# Upstream calls saved by joining identical in-flight requests and by batching intents
+		"single_flight": response_cache.flights.stats(),
+		"intent_batching": gemini_service.batching_stats() if gemini_service else None,
+	}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+	return response_cache.metrics()
+
+
+@app.post("/cache/invalidate")
+async def cache_invalidate():
+	# Call after bulk DB updates so cached answers are not served stale
+	await response_cache.invalidate()
+	return response_cache.metrics()
+
+
+@app.get("/content/status")
+async def content_status():
+	return content_store.status()
+
+
+@app.post("/content/reload")
+async def content_reload():
+	# Same as the watcher's periodic check, but re-reads the files even if their mtime is unchanged
+	changed = await content_store.reload(force=True)
+	return {"changed": changed, **content_store.status()}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+	return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/profile")
+async def debug_profile(seconds: float = 0, reset: bool = False):
+	# Folded stacks (flamegraph.pl / speedscope). seconds > 0 profiles the next N seconds of
+	# everything; otherwise returns what the PROFILE_SAMPLE_RATE-sampled requests collected
+	if not settings.PROFILE_ENDPOINT_ENABLED:
+		return JSONResponse({"error": "Profiling is disabled (PROFILE_ENDPOINT_ENABLED)"}, status_code=404)
+	text = await profiler.capture(min(seconds, 60)) if seconds > 0 else profiler.folded()
+	if reset:
+		profiler.reset()
+	return PlainTextResponse(text)
+
+
+@app.get("/stats/router")
+async def router_stats():
+	return query_router.metrics()
+
+
+@app.get("/stats/sql-plans")
+async def sql_plan_stats():
+	return sql_plan_cache.metrics()
+
+
+@app.get("/stats/event-log")
+async def event_log_metrics():
+	# Buffered, written, dropped (buffer full) and failed (write error) search/action log rows
+	return event_log_stats()
+
+
+@app.get("/stats/matchmaking")
+async def matchmaking_stats():
+	return matchmaker.metrics()
+
+
+@app.get("/stats/semantic-index")
+async def semantic_index_stats():
+	return semantic_search.metrics()
+
+
+def _knowledge_context(user_query: str) -> dict:
+	# Only the KB chunks relevant to the question go into the prompt; the full KB is passed as
+	# content_store.kb itself so Gemini's context cache recognises it
+	return knowledge_retriever.prune(user_query) if settings.KB_RETRIEVAL_ENABLED else content_store.kb
+
+
+def _directory_matches(user_query: str) -> list:
+	# Mentors, investors, startups and services whose descriptions are closest to the question,
+	# sent next to the question rather than inside the KB context
+	return jsonable_encoder(semantic_search.search(user_query, settings.SEMANTIC_KNOWLEDGE_TOP_K))
+
+
+def _cacheable_rows(payload: dict) -> bool:
+	# run_sql reports failures as a single {"error": ...} row
+	return not any(isinstance(row, dict) and "error" in row for row in payload["results"])
+
+
+async def _answer_from_template(user_query: str, timer: StageTimer):
+	# Same question shape as an earlier one: reuse its SQL with this question's values, no LLM call
+	hit = sql_plan_cache.lookup(user_query)
+	if hit is None:
+		return None
+	template, params = hit
+	with timer.stage("db"):
+		# Still cost-checked: other slot values can give the same template a much costlier plan
+		results = await run_sql(template.sql, *params)
+	payload = jsonable_encoder({"results": results, "sql": template.sql, "params": params})
+	if not _cacheable_rows(payload):
+		sql_plan_cache.forget(template)
+		return None
+	return payload
+
+
 @app.post("/ask")
 async def ask(body: QueryRequest):
     try:
+        timer = StageTimer()
+        started = time.perf_counter()
         user_query = body.query
-        mode = detect_mode(user_query)
-        if mode == "database":
-            response = await gemini_call(user_query, db_schema, mode="database")
-            sql = response.get("explanation", "")
-            # Log or return the generated SQL for debugging
-            print(f"Generated SQL: {sql}")
-            results = await run_sql(sql) if sql else []
-            return {"results": results, "sql": sql}
+        with timer.stage("route"):
+            route = query_router.route(user_query)
+            mode = "fast_path" if route else detect_mode(user_query)
+        if route:
+            # Unambiguous question: run the prepared query, no LLM round trip
+            with timer.stage("db"):
+                results = await query_router.execute(route)
+            payload = {"results": results, "sql": route.sql, "params": route.params}
+        elif mode == "database":
+            # Generation and execution are separate stages so the SQL runs exactly once
+            async def answer_from_database():
+                payload = await _answer_from_template(user_query, timer)
+                if payload is not None:
+                    return payload
+                with timer.stage("schema"):
+                    # Only the tables relevant to the question go into the prompt
+                    schema_context = schema_slicer.slice_text(user_query) if settings.SCHEMA_SLICE_ENABLED else content_store.schema
+                with timer.stage("llm"):
+                    sql = await generate_sql(user_query, schema_context)
+                logging.info(f"Generated SQL: {sql}")
+                with timer.stage("db"):
+                    results = await run_sql(sql) if sql else []
+                payload = jsonable_encoder({"results": results, "sql": sql})
+                if sql and _cacheable_rows(payload):
+                    sql_plan_cache.learn(user_query, sql)
+                return payload
+
+            payload = await response_cache.get_or_compute(
+                "ask:database", user_query, answer_from_database, should_cache=_cacheable_rows
+            )
         else:
-            response = await gemini_call(user_query, startup_tn_knowledge_base, mode="knowledge")
-            results = response.get("results", [])
-            explanation = response.get("explanation", "")
-            return {"results": results}
+            async def answer_from_knowledge_base():
+                with timer.stage("retrieve"):
+                    knowledge_context = _knowledge_context(user_query)
+                    directory = _directory_matches(user_query)
+                with timer.stage("llm"):
+                    response = await gemini_call(user_query, knowledge_context, mode="knowledge", directory_matches=directory)
+                return {"results": response.get("results", []), "error": response.get("error")}
+
+            response = await response_cache.get_or_compute(
+                "ask:knowledge", user_query, answer_from_knowledge_base,
+                should_cache=lambda r: bool(r["results"]) and not r["error"],
+            )
+            payload = {"results": response["results"]}
+        _log_search(user_query, mode, route, payload["results"])
+        with timer.stage("serialize"):
+            json_response = JSONResponse(jsonable_encoder(payload))
+        query_router.record(mode if mode == "fast_path" else f"llm_{mode}", (time.perf_counter() - started) * 1000)
+        json_response.headers["Server-Timing"] = timer.server_timing()
+        json_response.headers["X-Route"] = mode
+        if mode != "fast_path":
+            json_response.headers["X-Cache"] = "miss" if "llm" in timer.stages else "hit"
+        timer.log("/ask")
+        return json_response
+    except LLMOverloadedError:
+        raise
     except Exception as e:
-        import logging
         logging.error(traceback.format_exc())
         return JSONResponse({"error": str(e)}, status_code=500)
 
+
+@app.post("/ask/stream")
+async def ask_stream(body: QueryRequest):
+    """
+    Server-Sent Events variant of /ask. Emits `meta` first, then `sql`/`results` (database
+    and fast-path modes) or `token` chunks of the answer (knowledge mode), then `done`.
+    Failures arrive as an `error` event since the status line has already been sent.
+    """
+    user_query = body.query
+
+    async def events():
+        started = time.perf_counter()
+        route = query_router.route(user_query)
+        mode = "fast_path" if route else detect_mode(user_query)
+        yield sse_event("meta", {"mode": mode, "content_version": content_store.version})
+        try:
+            results = []
+            if route:
+                yield sse_event("sql", {"sql": route.sql, "params": route.params})
+                results = await query_router.execute(route)
+                yield sse_event("results", results)
+            elif mode == "database":
+                cached = await response_cache.get("ask:database", user_query) if settings.CACHE_ENABLED else None
+                if cached is None:
+                    cached = await _answer_from_template(user_query, StageTimer())
+                if cached is not None:
+                    yield sse_event("sql", {"sql": cached["sql"], "params": cached.get("params", [])})
+                    results = cached["results"]
+                    yield sse_event("results", results)
+                else:
+                    schema_context = schema_slicer.slice_text(user_query) if settings.SCHEMA_SLICE_ENABLED else content_store.schema
+                    sql = await response_cache.coalesce(
+                        "sql", user_query, lambda: generate_sql(user_query, schema_context)
+                    )
+                    yield sse_event("sql", {"sql": sql})
+                    payload = jsonable_encoder({"results": await run_sql(sql) if sql else [], "sql": sql})
+                    results = payload["results"]
+                    yield sse_event("results", results)
+                    if sql and _cacheable_rows(payload):
+                        sql_plan_cache.learn(user_query, sql)
+                        if settings.CACHE_ENABLED:
+                            await response_cache.set("ask:database", user_query, payload)
+            else:
+                cached = await response_cache.get("ask:knowledge", user_query) if settings.CACHE_ENABLED else None
+                if cached is not None:
+                    results = cached["results"]
+                    for text in results:
+                        yield sse_event("token", {"text": text})
+                else:
+                    knowledge_context = _knowledge_context(user_query)
+                    directory = _directory_matches(user_query)
+                    answer = []
+                    async for text in gemini_stream(user_query, knowledge_context, directory):
+                        answer.append(text)
+                        yield sse_event("token", {"text": text})
+                    results = ["".join(answer).strip()] if answer else []
+                    if settings.CACHE_ENABLED and results:
+                        await response_cache.set("ask:knowledge", user_query, {"results": results, "error": None})
+            _log_search(user_query, mode, route, results)
+            yield sse_event("done", {})
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            yield sse_event("error", {"error": str(e)})
+        finally:
+            query_router.record(mode if mode == "fast_path" else f"llm_{mode}", (time.perf_counter() - started) * 1000)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -1,9 +1,12 @@
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PromptInput(BaseModel):
     prompt: str
+    # Opaque next_cursor from a previous response; omit for the first page
+    cursor: Optional[str] = None
+    page_size: Optional[int] = Field(default=None, ge=1, le=50)
 
 
 class StructuredQuery(BaseModel):
@@ -14,6 +17,15 @@ class StructuredQuery(BaseModel):
     keywords: List[str] = []
 
 
+class IndexedStructuredQuery(StructuredQuery):
+    # 1-based position of the query in a batched intent prompt
+    index: int
+
+
+class StructuredQueryBatch(BaseModel):
+    results: List[IndexedStructuredQuery]
+
+
 class SearchResult(BaseModel):
     model_config = ConfigDict(extra='allow')
     # Fields below can be made Optional if they are not always present, 
@@ -35,9 +47,18 @@ class AIActionPlan(BaseModel):
     message: Optional[str] = None
 
 
+class ActionPlanInput(BaseModel):
+    # The plan is written for the original question and its intent, not the results alone
+    query: str
+    structured_query: StructuredQuery
+    results: List[SearchResult]
+
+
 class PromptOutput(BaseModel):
     query: str
     structured_query: StructuredQuery
     results: List[SearchResult]
     ai_action_plan: AIActionPlan
+    total_results: Optional[int] = None
+    next_cursor: Optional[str] = None
 
@@ -1,84 +1,127 @@
-import google.generativeai as genai
-import json
+import asyncio
 import logging
+import time
 
-from app.models.prompt_models import StructuredQuery
+from app.models.prompt_models import (
+    ActionPlanItem, AIActionPlan, IndexedStructuredQuery, StructuredQuery, StructuredQueryBatch,
+)
 
+from app.core.clients import clients
 from app.core.config import settings
+from app.core.concurrency import MicroBatcher, gemini_limiter
+from app.core.metrics import record_llm
+from app.core.cache import query_tokens, response_cache, scope_digest
+from app.core.prompts import action_plan_prompt, intent_batch_prompt, intent_prompt
+from app.utils.parsers import ParseError, json_generation_config, parse_model, response_text, salvage_items
 
 # Configure logging to a file
 # logging.basicConfig(filename='gemini_response_debug.log', level=logging.DEBUG,
 #                     format='%(asctime)s - %(levelname)s - %(message)s')
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+EMPTY_PLAN_MESSAGE = "Gemini returned an empty action plan."
+INVALID_PLAN_MESSAGE = "AI response was not valid JSON"
+PARTIAL_PLAN_MESSAGE = "Some action plan entries could not be read and were left out."
+# Plans carrying these messages are failures (or partly so) and must not be cached
+FALLBACK_PLAN_MESSAGES = (EMPTY_PLAN_MESSAGE, INVALID_PLAN_MESSAGE, PARTIAL_PLAN_MESSAGE)
+# Intent used when Gemini's answer cannot be parsed: a plain keyword search, not cached
+FALLBACK_QUERY_TYPE = "general"
 
 class GeminiService:
     def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-
-    def extract_intent(self, prompt: str) -> dict:
-        system_prompt = """Extract the following from the user query: sector, stage, geography, query_type (funding, mentorship, compliance, corporate partnership, export, etc.). Rewrite the query in a structured JSON format for database search. If a field is not present, use null. Example Output:
-
-{
-  "query_type": "compliance",
-  "sector": null,
-  "stage": "growth",
-  "geography": "Coimbatore",
-  "keywords": ["compliance support", "legal", "GST filing"]
-}
-"""
-        response = self.model.generate_content(f"{system_prompt}\nUser query: {prompt}")
-        # logging.debug(f"Raw Gemini response (extract_intent): {response.text!r}") # Debug logging removed
-        # Clean the response to remove markdown and extra newlines
-        clean_response_text = response.text.replace('```json', '').replace('```', '').strip()
-        return json.loads(clean_response_text)
-
-    def generate_action_plan(self, search_results: list[dict], original_query: str, structured_query: StructuredQuery) -> dict:
-        system_prompt = f"""You are an AI that generates structured JSON action plans.
-
-### Rules:
-- Respond ONLY with valid JSON.
-- Do not include explanations, Markdown, or text outside the JSON.
-- If no relevant results are found, return:
-  {{
-    "action_plan": [],
-    "message": "No relevant results found for your query."
-  }}
-
-### Input:
-- User Query: {original_query}
-- Structured Query:
-```json
-{json.dumps(structured_query.model_dump(), indent=2)}
-```
-- Search Results:
-```json
-{json.dumps(search_results, indent=2)}
-```
-
-### Output JSON Format:
-{{
-  "action_plan": [
-    {{
-      "entity_name": "string",
-      "entity_type": "string",
-      "reason_relevant": "string",
-      "next_steps": [ "string", "string", "..." ]
-    }}
-  ],
-  "message": "string"  # Optional message, if needed
-}}
-"""
-        response = self.model.generate_content(system_prompt)
-        # logging.debug(f"Raw Gemini response (generate_action_plan): {response.text!r}") # Debug logging removed
-        # Clean the response to remove markdown and extra newlines
-        clean_response_text = response.text.replace('```json', '').replace('```', '').strip()
-        if not clean_response_text:
-            logging.warning("Gemini generate_action_plan returned empty response after cleaning. Returning empty action plan.")
-            return {"action_plan": [], "message": "Gemini returned an empty action plan."} # Updated message to reflect empty action plan
+        # Built on first use (GEMINI_PROMPT_MODEL), so constructing the service stays cheap
+        self._model = None
+        # Distinct intent prompts arriving close together share one Gemini call (INTENT_BATCH_ENABLED);
+        # identical ones are already coalesced by response_cache
+        self.intent_batcher = MicroBatcher(
+            self._extract_intents, settings.INTENT_BATCH_WINDOW_MS / 1000, settings.INTENT_BATCH_MAX_SIZE
+        )
+        self.batch_retries = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = clients.gemini_model(settings.GEMINI_PROMPT_MODEL)
+        return self._model
+
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
+
+    async def _generate(self, prompt: str, response_model=None):
+        # Async gRPC call so a slow model response never blocks the event loop.
+        # With a response_model Gemini is constrained to JSON matching that model's schema.
+        generation_config = json_generation_config(response_model) if response_model else None
+        async with gemini_limiter:
+            started = time.perf_counter()
+            response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        record_llm(response_model.__name__ if response_model else "text", started, response)
+        return response
+
+    async def extract_intent(self, prompt: str) -> dict:
+        return await response_cache.get_or_compute(
+            "intent", prompt, lambda: self._extract_intent(prompt),
+            should_cache=lambda intent: intent["query_type"] != FALLBACK_QUERY_TYPE,
+        )
+
+    async def _extract_intent(self, prompt: str) -> dict:
+        if settings.INTENT_BATCH_ENABLED:
+            return await self.intent_batcher.submit(prompt)
+        return await self._extract_one_intent(prompt)
+
+    async def _extract_one_intent(self, prompt: str) -> dict:
+        response = await self._generate(intent_prompt(prompt), StructuredQuery)
+        text = response_text(response)
+        try:
+            return parse_model(text, StructuredQuery).model_dump()
+        except ParseError as e:
+            # Searching on the user's own words beats failing the request or asking Gemini again
+            logging.warning(f"Could not parse intent ({e}), falling back to keyword search: {text!r}")
+            return StructuredQuery(query_type=FALLBACK_QUERY_TYPE, keywords=query_tokens(prompt)).model_dump()
+
+    async def _extract_intents(self, prompts: list[str]) -> list[dict]:
+        if len(prompts) == 1:
+            return [await self._extract_one_intent(prompts[0])]
+        response = await self._generate(intent_batch_prompt(prompts), StructuredQueryBatch)
+        intents = {}
+        for item in salvage_items(response_text(response), "results", IndexedStructuredQuery):
+            if 1 <= item.index <= len(prompts):
+                intents.setdefault(item.index - 1, item.model_dump(exclude={"index"}))
+        missing = [i for i in range(len(prompts)) if i not in intents]
+        if missing:
+            # Queries the batched answer left out or garbled get their own call
+            logging.warning(f"Batched intent response covered {len(intents)} of {len(prompts)} queries")
+            self.batch_retries += len(missing)
+            retried = await asyncio.gather(*(self._extract_one_intent(prompts[i]) for i in missing))
+            intents.update(zip(missing, retried))
+        return [intents[i] for i in range(len(prompts))]
+
+    def batching_stats(self) -> dict:
+        return {**self.intent_batcher.stats(), "retried_singly": self.batch_retries}
+
+    async def generate_action_plan(self, search_results: list[dict], original_query: str, structured_query: StructuredQuery) -> dict:
+        # The same question only reuses a plan when it was built from the same results
+        return await response_cache.get_or_compute(
+            "action_plan",
+            original_query,
+            lambda: self._generate_action_plan(search_results, original_query, structured_query),
+            scope=scope_digest([search_results, structured_query.model_dump()]),
+            should_cache=lambda plan: plan.get("message") not in FALLBACK_PLAN_MESSAGES,
+        )
+
+    async def _generate_action_plan(self, search_results: list[dict], original_query: str, structured_query: StructuredQuery) -> dict:
+        prompt = action_plan_prompt(original_query, structured_query.model_dump(), search_results)
+        response = await self._generate(prompt, AIActionPlan)
+        text = response_text(response).strip()
+        if not text:
+            logging.warning("Gemini generate_action_plan returned an empty response. Returning empty action plan.")
+            return {"action_plan": [], "message": EMPTY_PLAN_MESSAGE}
         try:
-            return json.loads(clean_response_text)
-        except json.JSONDecodeError:
-            logging.error(f"AI returned invalid JSON: {clean_response_text!r}")
-            return {"action_plan": [], "message": "AI response was not valid JSON"}
+            return parse_model(text, AIActionPlan).model_dump()
+        except ParseError as e:
+            logging.error(f"AI returned an invalid action plan ({e}): {text!r}")
+        # Keep whichever entries are well-formed rather than discarding the whole plan
+        items = salvage_items(text, "action_plan", ActionPlanItem)
+        if not items:
+            return {"action_plan": [], "message": INVALID_PLAN_MESSAGE}
+        return AIActionPlan(action_plan=items, message=PARTIAL_PLAN_MESSAGE).model_dump()
 
@@ -0,0 +1,592 @@
+import asyncio
+import copy
+import functools
+import json
+import logging
+import math
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.db import pool
+from app.services.ranking import GEOGRAPHY_WEIGHT, SECTOR_WEIGHT, STAGE_WEIGHT
+
+# -------------------------------
+# Investor-startup matchmaking
+# -------------------------------
+# Investors are held as weighted feature tables with one row per sector, stage, district and
+# ticket-size bucket and one column per investor: row s of the sector table holds
+# SECTOR_WEIGHT for every investor focused on sector s. A startup's score against every
+# investor is then four row lookups added together. Startups with the same sector, stage,
+# district and ticket bucket (a "profile") score identically, so the top-k investors are
+# computed once per profile, a block of profiles per numpy pass, and shared by its startups.
+# Re-syncs only re-score the profiles a changed row can affect.
+
+TICKET_WEIGHT = 1.0
+# Ticket sizes are compared in log10 rupees: startups fall in half-decade buckets, and the fit
+# drops linearly to 0 at TICKET_TOLERANCE_DECADES from the investor's average ticket
+TICKET_BUCKETS_PER_DECADE = 2
+TICKET_TOLERANCE_DECADES = 1.5
+# Geographical focus values that cover every district
+ANY_GEOGRAPHY = {"tamilnadu", "tn", "india", "panindia", "global", "any", "all", "anywhere"}
+# Profiles scored per numpy pass; bounds the (profiles x investors) block held in memory
+BLOCK_ROWS = 512
+# Above this many changed investors a full re-score is cheaper than finding the affected profiles
+MAX_INCREMENTAL_INVESTORS = 256
+# Row 0 of every vocabulary: value missing or not recognised; it scores 0 (ticket: neutral)
+UNKNOWN = 0
+
+INVESTORS_SQL = """
+SELECT investor_id, investor_name, email, linkedin_profile_url, investment_focus_sectors,
+       investment_focus_stages, geographical_focus, average_ticket_size, is_actively_investing
+FROM investors
+"""
+# Latest live financials row per startup, if any
+STARTUPS_SQL = """
+SELECT DISTINCT ON (s.startup_id) s.startup_id, s.startup_name, s.sector, s.stage, s.district,
+       f.total_funding_raised, f.revenue_last_fy
+FROM startups s
+LEFT JOIN financials f ON f.startup_id = s.startup_id AND f.deleted_at IS NULL
+ORDER BY s.startup_id, f.updated_at DESC NULLS LAST
+"""
+_JSON_COLUMNS = ("investment_focus_sectors", "investment_focus_stages")
+
+_AMOUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(crores?|cr|lakhs?|lacs?|l|k|mn|m|million)?\b", re.IGNORECASE)
+_NON_KEY_RE = re.compile(r"[^a-z0-9]")
+_UNITS = {"crore": 1e7, "cr": 1e7, "lakh": 1e5, "lac": 1e5, "l": 1e5, "k": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6}
+
+
+# Tables repeat a few hundred distinct sector/stage/district spellings across every row
+@functools.lru_cache(maxsize=4096)
+def _key(text: Any) -> str:
+    return _NON_KEY_RE.sub("", str(text).lower())
+
+
+def _json_list(value: Any) -> Any:
+    """A JSONB list column as a list when asyncpg returned it as JSON text."""
+    if isinstance(value, str) and value.lstrip()[:1] in ("[", '"'):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _keys(value: Any) -> List[str]:
+    """Normalized keys of a JSONB list (parsed or as JSON text) or of comma-separated text."""
+    value = _json_list(value)
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return [key for key in map(_key, value) if key]
+
+
+def _log_amount(value: Any) -> float:
+    """log10 of a rupee amount given as a number or as text like "50 Lakh"; nan when unknown."""
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        match = _AMOUNT_RE.search(value.replace(",", ""))
+        if not match:
+            return math.nan
+        unit = (match.group(2) or "").lower().rstrip("s")
+        amount = float(match.group(1)) * _UNITS.get(unit, 1)
+    else:
+        amount = float(value)
+    return math.log10(amount) if amount > 0 else math.nan
+
+
+class _Vocab:
+    def __init__(self):
+        self.index: Dict[str, int] = {"": UNKNOWN}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, key: str) -> int:
+        return self.index.get(key, UNKNOWN)
+
+    def add(self, key: str) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = self.index[key] = len(self.index)
+        return row
+
+
+class MatchIndex:
+    """
+    Feature tables, startup profiles and per-profile top-k investors. Updated off the event loop
+    on a copy (see Matchmaker), so lookups always read a consistent index.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.sectors, self.stages, self.districts, self.tickets = _Vocab(), _Vocab(), _Vocab(), _Vocab()
+        # log10 amount at the centre of each ticket bucket row; nan for UNKNOWN
+        self.bucket_values = np.full(1, np.nan, np.float32)
+
+        # Investors, one column each. Removed investors keep their column with penalty -inf.
+        self.investor_ids: List[str] = []
+        self.investor_slot: Dict[str, int] = {}
+        self.investor_rows: List[Optional[Dict[str, Any]]] = []
+        self.investor_signature: Dict[str, tuple] = {}
+        self.any_geography = np.zeros(0, bool)
+        self.investor_ticket = np.zeros(0, np.float32)
+        self.penalty = np.zeros(0, np.float32)
+        self.sector_w = np.zeros((1, 0), np.float32)
+        self.stage_w = np.zeros((1, 0), np.float32)
+        self.geo_w = np.zeros((1, 0), np.float32)
+        self.ticket_w = np.zeros((1, 0), np.float32)
+
+        # Startups; removed ones keep their slot with profile -1
+        self.startup_ids: List[str] = []
+        self.startup_slot: Dict[str, int] = {}
+        self.startup_names: List[Optional[str]] = []
+        self.startup_signature: Dict[str, tuple] = {}
+        self.startup_profile = np.zeros(0, np.int32)
+
+        # Profiles: (sector, stage, district, ticket) vocabulary rows, and their top-k investors
+        self.profile_index: Dict[Tuple[int, int, int, int], int] = {}
+        self.profile_features = np.zeros((0, 4), np.int32)
+        self.top_investors = np.zeros((0, top_k), np.int32)
+        self.top_scores = np.zeros((0, top_k), np.float32)
+        # Live startups grouped by profile: slots in profile order, and each profile's start offset
+        self.members = np.zeros(0, np.int64)
+        self.member_starts = np.zeros(1, np.int64)
+
+    def copy(self) -> "MatchIndex":
+        clone = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, (np.ndarray, list, dict)):
+                setattr(clone, name, value.copy())
+            elif isinstance(value, _Vocab):
+                vocab = _Vocab()
+                vocab.index = dict(value.index)
+                setattr(clone, name, vocab)
+        return clone
+
+    # -------------------------------
+    # Updates
+    # -------------------------------
+    def sync(self, investors: List[Dict[str, Any]], startups: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Make the index match these full table snapshots; returns (investors, startups) changed."""
+        investor_rows = {str(row["investor_id"]): row for row in investors}
+        startup_rows = {str(row["startup_id"]): row for row in startups}
+        changed_investors = [
+            row for key, row in investor_rows.items() if self.investor_signature.get(key) != tuple(row.values())
+        ]
+        changed_startups = [
+            row for key, row in startup_rows.items() if self.startup_signature.get(key) != tuple(row.values())
+        ]
+        gone_investors = [key for key in self.investor_signature if key not in investor_rows]
+        gone_startups = [key for key in self.startup_signature if key not in startup_rows]
+        # Startups first: new profiles are scored against the investors as they were, and the
+        # investor changes below re-score whatever they affect
+        self.upsert_startups(changed_startups)
+        self.remove_startups(gone_startups)
+        self.upsert_investors(changed_investors)
+        self.remove_investors(gone_investors)
+        return len(changed_investors) + len(gone_investors), len(changed_startups) + len(gone_startups)
+
+    def upsert_investors(self, rows: Iterable[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+        new = [row for row in rows if str(row["investor_id"]) not in self.investor_slot]
+        if new:
+            self._add_investor_columns(len(new))
+        for row in new:
+            key = str(row["investor_id"])
+            self.investor_slot[key] = len(self.investor_ids)
+            self.investor_ids.append(key)
+            self.investor_rows.append(None)
+        slots, cells = [], ([], [], [])
+        for row in rows:
+            slot, features = self._set_investor(row)
+            slots.append(slot)
+            for rows_of, feature_rows in zip(cells, features):
+                rows_of.append((feature_rows, slot))
+        self._grow_rows()
+        slots = np.asarray(slots, np.int64)
+        # Rewrite the changed columns in one pass per table
+        anywhere = self.any_geography[slots]
+        self.sector_w[:, slots] = 0
+        self.stage_w[:, slots] = 0
+        self.geo_w[:, slots] = np.where(anywhere, GEOGRAPHY_WEIGHT, 0).astype(np.float32)
+        for table, weight, rows_of in zip((self.sector_w, self.stage_w, self.geo_w), (SECTOR_WEIGHT, STAGE_WEIGHT, GEOGRAPHY_WEIGHT), cells):
+            table_rows = [r for feature_rows, _ in rows_of for r in feature_rows]
+            table_cols = [slot for feature_rows, slot in rows_of for _ in feature_rows]
+            table[table_rows, table_cols] = weight
+        self.ticket_w[:, slots] = _ticket_fit(self.investor_ticket[slots][None, :], self.bucket_values[:, None])
+        self._rescore_for(slots)
+
+    def remove_investors(self, keys: Iterable[str]) -> None:
+        slots = []
+        for key in keys:
+            slot = self.investor_slot.pop(key, None)
+            if slot is None:
+                continue
+            self.investor_signature.pop(key, None)
+            self.investor_rows[slot] = None
+            self.penalty[slot] = -np.inf
+            slots.append(slot)
+        self._rescore_for(np.asarray(slots, np.int64))
+
+    def upsert_startups(self, rows: Iterable[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+        profiles_before = len(self.profile_index)
+        slots, profiles = [], []
+        for row in rows:
+            key = str(row["startup_id"])
+            slot = self.startup_slot.get(key)
+            if slot is None:
+                slot = self.startup_slot[key] = len(self.startup_ids)
+                self.startup_ids.append(key)
+                self.startup_names.append(None)
+            self.startup_names[slot] = row.get("startup_name")
+            self.startup_signature[key] = tuple(row.values())
+            slots.append(slot)
+            profiles.append(self._profile_for(row))
+        self._grow_rows()
+        if len(self.startup_profile) < len(self.startup_ids):
+            grown = np.full(len(self.startup_ids), -1, np.int32)
+            grown[:len(self.startup_profile)] = self.startup_profile
+            self.startup_profile = grown
+        self.startup_profile[slots] = profiles
+        added = len(self.profile_index) - profiles_before
+        if added:
+            new_features = np.asarray(list(self.profile_index)[profiles_before:], np.int32)
+            self.profile_features = np.concatenate([self.profile_features, new_features])
+            self.top_investors = np.concatenate([self.top_investors, np.full((added, self.top_k), -1, np.int32)])
+            self.top_scores = np.concatenate([self.top_scores, np.full((added, self.top_k), -np.inf, np.float32)])
+            self._score_profiles(np.arange(profiles_before, len(self.profile_index)))
+        self._group_members()
+
+    def remove_startups(self, keys: Iterable[str]) -> None:
+        removed = False
+        for key in keys:
+            slot = self.startup_slot.pop(key, None)
+            if slot is None:
+                continue
+            self.startup_signature.pop(key, None)
+            self.startup_profile[slot] = -1
+            self.startup_names[slot] = None
+            removed = True
+        if removed:
+            self._group_members()
+
+    def _add_investor_columns(self, count: int) -> None:
+        def grow(table: np.ndarray) -> np.ndarray:
+            return np.concatenate([table, np.zeros((table.shape[0], count), np.float32)], axis=1)
+
+        self.sector_w, self.stage_w = grow(self.sector_w), grow(self.stage_w)
+        self.geo_w, self.ticket_w = grow(self.geo_w), grow(self.ticket_w)
+        self.any_geography = np.concatenate([self.any_geography, np.zeros(count, bool)])
+        self.investor_ticket = np.concatenate([self.investor_ticket, np.full(count, np.nan, np.float32)])
+        self.penalty = np.concatenate([self.penalty, np.zeros(count, np.float32)])
+
+    def _grow_rows(self) -> None:
+        """Add table rows for vocabulary entries first seen since the last call."""
+        columns = len(self.investor_ids)
+        for table_name, vocab in (("sector_w", self.sectors), ("stage_w", self.stages)):
+            table = getattr(self, table_name)
+            if table.shape[0] < len(vocab):
+                extra = np.zeros((len(vocab) - table.shape[0], columns), np.float32)
+                setattr(self, table_name, np.concatenate([table, extra]))
+        if self.geo_w.shape[0] < len(self.districts):
+            # A new district is covered by every investor whose focus is "anywhere"
+            extra = np.tile(GEOGRAPHY_WEIGHT * self.any_geography.astype(np.float32), (len(self.districts) - self.geo_w.shape[0], 1))
+            self.geo_w = np.concatenate([self.geo_w, extra])
+        if self.ticket_w.shape[0] < len(self.tickets):
+            values = np.full(len(self.tickets), np.nan, np.float32)
+            for key, row in self.tickets.index.items():
+                if key:
+                    values[row] = int(key) / TICKET_BUCKETS_PER_DECADE
+            first_new = self.ticket_w.shape[0]
+            self.bucket_values = values
+            extra = _ticket_fit(self.investor_ticket[None, :], values[first_new:, None])
+            self.ticket_w = np.concatenate([self.ticket_w, extra])
+
+    def _set_investor(self, row: Dict[str, Any]) -> Tuple[int, Tuple[List[int], List[int], List[int]]]:
+        """Record an investor's scalars and display row; returns its slot and sector, stage and district rows."""
+        key = str(row["investor_id"])
+        slot = self.investor_slot[key]
+        display = dict(row)
+        for column in _JSON_COLUMNS:
+            display[column] = _json_list(display.get(column))
+        sectors = [self.sectors.add(k) for k in _keys(display.get("investment_focus_sectors"))]
+        stages = [self.stages.add(k) for k in _keys(display.get("investment_focus_stages"))]
+        focus = _keys(row.get("geographical_focus"))
+        anywhere = not focus or any(k in ANY_GEOGRAPHY for k in focus)
+        districts = [self.districts.add(k) for k in focus if k not in ANY_GEOGRAPHY]
+        self.any_geography[slot] = anywhere
+        self.investor_ticket[slot] = _log_amount(row.get("average_ticket_size"))
+        # Investors marked as not investing never appear in matches
+        self.penalty[slot] = -np.inf if row.get("is_actively_investing") is False else 0
+
+        display["investor_id"] = key
+        self.investor_rows[slot] = display
+        self.investor_signature[key] = tuple(row.values())
+        return slot, (sectors, stages, districts)
+
+    def _profile_for(self, row: Dict[str, Any]) -> int:
+        # A startup's likely next ticket scales with what it has raised or earns so far
+        amounts = [_log_amount(row.get("total_funding_raised")), _log_amount(row.get("revenue_last_fy"))]
+        amounts = [amount for amount in amounts if not math.isnan(amount)]
+        bucket = self.tickets.add(str(round(max(amounts) * TICKET_BUCKETS_PER_DECADE))) if amounts else UNKNOWN
+        features = (
+            self.sectors.add(_key(row["sector"])) if row.get("sector") else UNKNOWN,
+            self.stages.add(_key(row["stage"])) if row.get("stage") else UNKNOWN,
+            self.districts.add(_key(row["district"])) if row.get("district") else UNKNOWN,
+            bucket,
+        )
+        profile = self.profile_index.get(features)
+        if profile is None:
+            # Its features row is appended by upsert_startups, once per batch
+            profile = self.profile_index[features] = len(self.profile_index)
+        return profile
+
+    def _group_members(self) -> None:
+        live = np.flatnonzero(self.startup_profile >= 0)
+        self.members = live[np.argsort(self.startup_profile[live], kind="stable")]
+        self.member_starts = np.searchsorted(self.startup_profile[self.members], np.arange(len(self.profile_index) + 1))
+
+    # -------------------------------
+    # Scoring
+    # -------------------------------
+    def _score_profiles(self, profiles: np.ndarray) -> None:
+        """
+        Recompute the top-k investors of these profiles (unordered; lookups sort the few they
+        return). Profiles sharing sector, stage and district differ only in the ticket term,
+        which is at most TICKET_WEIGHT: an investor whose score without it is more than
+        TICKET_WEIGHT below the k-th best such score cannot reach the top k. So the rest of the
+        score is computed once per (sector, stage, district) for a block of them, and only the
+        remaining candidates are scored per ticket bucket.
+        """
+        columns = len(self.investor_ids)
+        k = min(self.top_k, columns)
+        if k == 0 or len(profiles) == 0:
+            return
+        features = self.profile_features[profiles].astype(np.int64)
+        # One integer per (sector, stage, district); sorting on it groups profiles by triple,
+        # and triples by (sector, stage)
+        pair_keys = features[:, 0] * len(self.stages) + features[:, 1]
+        triple_keys = pair_keys * len(self.districts) + features[:, 2]
+        triples, triple_of = np.unique(triple_keys, return_inverse=True)
+        grouped = np.argsort(triple_of, kind="stable")
+        by_triple, triple_of = profiles[grouped], triple_of.ravel()[grouped]
+        starts = np.searchsorted(triple_of, np.arange(len(triples) + 1))
+        triple_pairs, triple_districts = np.divmod(triples, len(self.districts))
+        for start in range(0, len(triples), BLOCK_ROWS):
+            pairs, pair_of = np.unique(triple_pairs[start:start + BLOCK_ROWS], return_inverse=True)
+            pair_base = self.sector_w[pairs // len(self.stages)]
+            pair_base += self.stage_w[pairs % len(self.stages)]
+            pair_base += self.penalty
+            base = pair_base[pair_of.ravel()]
+            base += self.geo_w[triple_districts[start:start + BLOCK_ROWS]]
+
+            # Candidates of each triple, left-aligned in a (triples x widest) matrix padded with -inf
+            flat = np.flatnonzero(base >= (_kth_levels(base, k) - TICKET_WEIGHT)[:, None])
+            rows, cols = np.divmod(flat, columns)
+            counts = np.bincount(rows, minlength=base.shape[0])
+            width = int(counts.max())
+            position = np.arange(len(rows)) - (np.cumsum(counts) - counts)[rows]
+            candidates = np.zeros((base.shape[0], width), np.int32)
+            candidates[rows, position] = cols
+            candidate_base = np.full((base.shape[0], width), -np.inf, np.float32)
+            candidate_base[rows, position] = base.ravel()[flat]
+
+            members = by_triple[starts[start]:starts[start + base.shape[0]]]
+            local = triple_of[starts[start]:starts[start + base.shape[0]]] - start
+            member_candidates = candidates[local]
+            # ticket_w is row-major, so (bucket, investor) is bucket * columns + investor
+            ticket_cells = member_candidates + (self.profile_features[members, 3] * columns)[:, None]
+            scores = candidate_base[local] + self.ticket_w.ravel()[ticket_cells]
+            top = np.argpartition(scores, width - k, axis=1)[:, width - k:]
+            self.top_investors[members, :k] = np.take_along_axis(member_candidates, top, axis=1)
+            self.top_scores[members, :k] = np.take_along_axis(scores, top, axis=1)
+
+    def _rescore_for(self, slots: np.ndarray) -> None:
+        """Re-score the profiles whose top-k these investor columns were in, or could now enter."""
+        if len(slots) == 0 or len(self.profile_index) == 0:
+            return
+        if len(slots) > MAX_INCREMENTAL_INVESTORS:
+            self._score_profiles(np.arange(len(self.profile_index)))
+            return
+        features = self.profile_features
+        columns = slots[None, :]
+        scores = (
+            self.sector_w[features[:, 0, None], columns] + self.stage_w[features[:, 1, None], columns]
+            + self.geo_w[features[:, 2, None], columns] + self.ticket_w[features[:, 3, None], columns]
+            + self.penalty[columns]
+        )
+        threshold = self.top_scores.min(axis=1)
+        affected = np.isin(self.top_investors, slots).any(axis=1) | (scores > threshold[:, None]).any(axis=1)
+        self._score_profiles(np.flatnonzero(affected))
+
+    # -------------------------------
+    # Lookups
+    # -------------------------------
+    def _investor_result(self, slot: int, score: float) -> Dict[str, Any]:
+        return {**self.investor_rows[slot], "match_score": round(float(score), 3)}
+
+    def investors_for_startup(self, startup_id: str, k: int) -> Optional[List[Dict[str, Any]]]:
+        slot = self.startup_slot.get(startup_id)
+        if slot is None:
+            return None
+        profile = self.startup_profile[slot]
+        order = np.argsort(-self.top_scores[profile], kind="stable")[:k]
+        slots, scores = self.top_investors[profile, order], self.top_scores[profile, order]
+        return [self._investor_result(s, score) for s, score in zip(slots, scores) if s >= 0 and np.isfinite(score)]
+
+    def startups_for_investor(self, investor_id: str, k: int) -> Optional[List[Dict[str, Any]]]:
+        slot = self.investor_slot.get(investor_id)
+        if slot is None:
+            return None
+        features = self.profile_features
+        scores = (
+            self.sector_w[features[:, 0], slot] + self.stage_w[features[:, 1], slot]
+            + self.geo_w[features[:, 2], slot] + self.ticket_w[features[:, 3], slot]
+        )
+        scores[np.diff(self.member_starts) == 0] = -np.inf
+        take = min(k, len(scores))
+        if take == 0:
+            return []
+        top = np.argpartition(scores, len(scores) - take)[len(scores) - take:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results: List[Dict[str, Any]] = []
+        for profile in top:
+            if len(results) >= k or not np.isfinite(scores[profile]):
+                break
+            for member in self.members[self.member_starts[profile]:self.member_starts[profile + 1]][:k - len(results)]:
+                results.append({
+                    "startup_id": self.startup_ids[member],
+                    "startup_name": self.startup_names[member],
+                    "match_score": round(float(scores[profile]), 3),
+                })
+        return results
+
+    def investors_for(self, sector: Optional[str], stage: Optional[str], geography: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Investors ranked for a described startup; sector and geography, when given, must match."""
+        scores = self.ticket_w[UNKNOWN] + self.penalty
+        keep = np.isfinite(scores)
+        if sector:
+            row = self.sectors.get(_key(sector))
+            if row == UNKNOWN:
+                return []
+            scores = scores + self.sector_w[row]
+            keep &= self.sector_w[row] > 0
+        if stage:
+            scores = scores + self.stage_w[self.stages.get(_key(stage))]
+        geography_key = _key(geography) if geography else ""
+        if geography_key and geography_key not in ANY_GEOGRAPHY:
+            row = self.districts.get(geography_key)
+            geo = self.geo_w[row] if row != UNKNOWN else GEOGRAPHY_WEIGHT * self.any_geography.astype(np.float32)
+            scores = scores + geo
+            keep &= geo > 0
+        candidates = np.flatnonzero(keep)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [self._investor_result(slot, scores[slot]) for slot in candidates]
+
+    def size(self) -> Dict[str, int]:
+        return {
+            "investors": len(self.investor_slot),
+            "startups": len(self.startup_slot),
+            "profiles": len(self.profile_index),
+            "sectors": len(self.sectors) - 1,
+            "stages": len(self.stages) - 1,
+            "districts": len(self.districts) - 1,
+        }
+
+
+# Every value a base score (sector + stage + district terms) can take for an active investor,
+# summed in the same order and precision as MatchIndex._score_profiles, best first
+BASE_LEVELS = sorted({
+    float(np.float32(sector) + np.float32(stage) + np.float32(geography))
+    for sector in (0, SECTOR_WEIGHT) for stage in (0, STAGE_WEIGHT) for geography in (0, GEOGRAPHY_WEIGHT)
+}, reverse=True)
+
+
+def _kth_levels(base: np.ndarray, k: int) -> np.ndarray:
+    """Per row, the k-th best base score: the highest level that at least k investors reach."""
+    kth = np.full(base.shape[0], -np.inf, np.float32)
+    unresolved = np.ones(base.shape[0], bool)
+    for level in BASE_LEVELS:
+        reached = unresolved & (np.count_nonzero(base >= level, axis=1) >= k)
+        kth[reached] = level
+        unresolved &= ~reached
+        if not unresolved.any():
+            break
+    return kth
+
+
+def _ticket_fit(investor_ticket: Any, bucket_value: Any) -> np.ndarray:
+    """TICKET_WEIGHT scaled by log-distance; half of it when either side is unknown."""
+    distance = np.abs(np.asarray(investor_ticket, np.float32) - np.asarray(bucket_value, np.float32))
+    fit = TICKET_WEIGHT * np.clip(1 - distance / TICKET_TOLERANCE_DECADES, 0, 1)
+    return np.where(np.isnan(distance), TICKET_WEIGHT / 2, fit).astype(np.float32)
+
+
+class Matchmaker:
+    """The current MatchIndex, loaded from Postgres and re-synced in the background."""
+
+    def __init__(self):
+        self.index: Optional[MatchIndex] = None
+        self._lock = asyncio.Lock()
+        self.stats = {"refreshes": 0, "failures": 0, "investors_changed": 0, "startups_changed": 0}
+        self.last_refresh_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    async def refresh(self) -> None:
+        """Re-read investors and startups; only rows that changed since the last sync are re-scored."""
+        async with self._lock:
+            started = time.perf_counter()
+            try:
+                investors = [dict(row) for row in await pool.fetch(INVESTORS_SQL)]
+                startups = [dict(row) for row in await pool.fetch(STARTUPS_SQL)]
+            except Exception as e:
+                self.stats["failures"] += 1
+                logging.warning(f"Matchmaking refresh failed, keeping the previous index: {e!r}")
+                return
+            index, (investors_changed, startups_changed) = await asyncio.to_thread(self._synced, investors, startups)
+            self.index = index
+            self.stats["refreshes"] += 1
+            self.stats["investors_changed"] += investors_changed
+            self.stats["startups_changed"] += startups_changed
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def _synced(self, investors: List[Dict[str, Any]], startups: List[Dict[str, Any]]) -> Tuple[MatchIndex, Tuple[int, int]]:
+        # Built on a copy so requests keep reading the current index until it is swapped in
+        index = self.index.copy() if self.index is not None else MatchIndex(settings.MATCHMAKING_TOP_K)
+        return index, index.sync(investors, startups)
+
+    async def watch(self, interval: float) -> None:
+        while True:
+            await self.refresh()
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "ready": self.ready,
+            "last_refresh_ms": self.last_refresh_ms,
+            **(self.index.size() if self.index is not None else {}),
+        }
+
+
+matchmaker = Matchmaker()
@@ -0,0 +1,199 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.content_store import content_store
+from app.core.timing import LatencyHistogram
+from app.db import pool
+
+# -------------------------------
+# Deterministic fast path for /ask
+# -------------------------------
+# Questions like "list AgriTech startups in Coimbatore" map straight onto a parameterized
+# query. The router recognises the entity and slot values (sector, district, stage) from a
+# gazetteer of DB distinct values, and only answers when every word in the question is
+# accounted for; anything else goes to Gemini as before.
+
+# Seed values, used until (or if) the DB gazetteer load succeeds
+DEFAULT_DISTRICTS = [
+    "Chennai", "Coimbatore", "Madurai", "Tiruchirappalli", "Trichy", "Salem", "Tirunelveli",
+    "Erode", "Vellore", "Thoothukudi", "Thanjavur", "Tiruppur", "Hosur", "Kanchipuram",
+]
+DEFAULT_STAGES = ["Ideation", "Idea", "Validation", "Early Traction", "Prototype", "MVP", "Seed", "Growth", "Scaling", "Series A"]
+DEFAULT_SECTORS = [
+    "AgriTech", "FinTech", "HealthTech", "MedTech", "EdTech", "CleanTech", "DeepTech", "AI", "IoT",
+    "SaaS", "E-commerce", "Logistics", "SpaceTech", "BioTech", "FoodTech", "Manufacturing",
+]
+
+# Words that carry no constraint once the entity and slots are known
+FILLER_WORDS = {
+    "list", "show", "find", "get", "give", "me", "all", "the", "a", "an", "of", "in", "at", "from",
+    "based", "located", "which", "what", "are", "is", "there", "any", "some", "please", "who",
+    "sector", "district", "stage", "startup", "startups", "investor", "investors", "mentor", "mentors",
+    "focused", "focusing", "on", "for", "with", "and", "working", "invest", "investing", "that",
+    "companies", "company", "expertise", "experts", "expert", "tamil", "nadu", "tn",
+}
+
+ENTITY_WORDS = {
+    "startup": "startups", "startups": "startups", "companies": "startups", "company": "startups",
+    "investor": "investors", "investors": "investors",
+    "mentor": "mentors", "mentors": "mentors", "experts": "mentors", "expert": "mentors",
+}
+
+# entity -> (select list, {slot: predicate with a {} placeholder for the parameter})
+TEMPLATES: Dict[str, Tuple[str, Dict[str, str]]] = {
+    "startups": (
+        "SELECT startup_name, sector, stage, district, website_url, short_description FROM startups",
+        {
+            "sector": "sector ILIKE '%' || {} || '%'",
+            "district": "district ILIKE '%' || {} || '%'",
+            "stage": "stage ILIKE '%' || {} || '%'",
+        },
+    ),
+    "investors": (
+        "SELECT investor_name, investor_type, email, website_url, investment_focus_sectors, "
+        "investment_focus_stages, geographical_focus FROM investors",
+        {
+            "sector": "investment_focus_sectors::text ILIKE '%' || {} || '%'",
+            "district": "geographical_focus ILIKE '%' || {} || '%'",
+            "stage": "investment_focus_stages::text ILIKE '%' || {} || '%'",
+        },
+    ),
+    "mentors": (
+        "SELECT mentor_name, areas_of_expertise, industry_specialization, email, linkedin_profile_url FROM mentors",
+        {
+            "sector": "(areas_of_expertise::text ILIKE '%' || {} || '%' OR industry_specialization::text ILIKE '%' || {} || '%')",
+        },
+    ),
+}
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9&+\-]*")
+
+
+def _key(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+@dataclass
+class Route:
+    entity: str
+    slots: Dict[str, str]
+    sql: str
+    params: List[str] = field(default_factory=list)
+
+
+class QueryRouter:
+    MAX_NGRAM = 3
+
+    def __init__(self):
+        self.gazetteer: Dict[str, Dict[str, str]] = {}
+        # Last DB distinct values (sectors, districts, stages), reused when a refresh fails
+        self.db_values: Tuple[List[str], List[str], List[str]] = ([], [], [])
+        self.load_gazetteer(DEFAULT_SECTORS + _kb_sectors(), DEFAULT_DISTRICTS + _kb_venues(), DEFAULT_STAGES)
+        self.stats: Dict[str, int] = {"fast_path": 0, "llm_database": 0, "llm_knowledge": 0}
+        self.latency: Dict[str, LatencyHistogram] = {path: LatencyHistogram() for path in self.stats}
+
+    def load_gazetteer(self, sectors: Iterable[str], districts: Iterable[str], stages: Iterable[str]) -> None:
+        gazetteer = {}
+        for slot, values in (("sector", sectors), ("district", districts), ("stage", stages)):
+            gazetteer[slot] = {_key(v): v.strip() for v in values if v and _key(v)}
+        self.gazetteer = gazetteer
+
+    async def refresh_gazetteer(self) -> None:
+        """Reload slot values from DB distinct values and the KB, keeping the seeds for anything missing."""
+        try:
+            sectors = await pool.fetch("SELECT DISTINCT sector FROM startups WHERE sector IS NOT NULL")
+            districts = await pool.fetch("SELECT DISTINCT district FROM startups WHERE district IS NOT NULL")
+            stages = await pool.fetch("SELECT DISTINCT stage FROM startups WHERE stage IS NOT NULL")
+            self.db_values = (
+                [r["sector"] for r in sectors], [r["district"] for r in districts], [r["stage"] for r in stages],
+            )
+        except Exception as e:
+            logging.warning(f"Query router gazetteer refresh failed, keeping previous DB values: {e!r}")
+        db_sectors, db_districts, db_stages = self.db_values
+        self.load_gazetteer(
+            DEFAULT_SECTORS + _kb_sectors() + db_sectors,
+            DEFAULT_DISTRICTS + _kb_venues() + db_districts,
+            DEFAULT_STAGES + db_stages,
+        )
+
+    def extract_slots(self, question: str) -> Tuple[List[str], Dict[str, str], List[Optional[str]]]:
+        """Lowercased words of the question, the slot values found in it and the slot (if any) each word filled."""
+        words = _WORD_RE.findall(question.lower())
+        slots, consumed = self._match_slots(words)
+        return words, slots, consumed
+
+    def _match_slots(self, words: List[str]) -> Tuple[Dict[str, str], List[Optional[str]]]:
+        slots: Dict[str, str] = {}
+        consumed: List[Optional[str]] = [None] * len(words)
+        # Longest n-grams first so "early traction" wins over "early"
+        for n in range(self.MAX_NGRAM, 0, -1):
+            for start in range(len(words) - n + 1):
+                if any(consumed[start:start + n]):
+                    continue
+                key = _key("".join(words[start:start + n]))
+                for slot, values in self.gazetteer.items():
+                    if slot not in slots and key in values:
+                        slots[slot] = values[key]
+                        consumed[start:start + n] = [slot] * n
+                        break
+        return slots, consumed
+
+    def route(self, question: str) -> Optional[Route]:
+        """Return a prepared route when the question is unambiguous, else None (use Gemini)."""
+        if not settings.FAST_PATH_ENABLED:
+            return None
+        words = _WORD_RE.findall(question.lower())
+        entities = {ENTITY_WORDS[w] for w in words if w in ENTITY_WORDS}
+        if len(entities) != 1:
+            return None
+        entity = entities.pop()
+        slots, consumed = self._match_slots(words)
+        select, predicates = TEMPLATES[entity]
+        if not slots or any(slot not in predicates for slot in slots):
+            return None
+        # Any word we cannot account for may be a constraint we would silently drop
+        leftovers = [w for w, used in zip(words, consumed) if not used and w not in FILLER_WORDS]
+        if leftovers:
+            return None
+
+        clauses, params = [], []
+        for slot in sorted(slots):
+            params.append(slots[slot])
+            clauses.append(predicates[slot].replace("{}", f"${len(params)}"))
+        sql = f"{select} WHERE {' AND '.join(clauses)} LIMIT {settings.FAST_PATH_ROW_LIMIT}"
+        return Route(entity=entity, slots=slots, sql=sql, params=params)
+
+    async def execute(self, route: Route) -> List[Dict[str, Any]]:
+        rows = await pool.fetch(route.sql, *route.params)
+        return [dict(row) for row in rows]
+
+    def record(self, path: str, ms: float) -> None:
+        self.stats[path] += 1
+        self.latency[path].observe(ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        total = sum(self.stats.values())
+        return {
+            "routes": dict(self.stats),
+            "fast_path_ratio": round(self.stats["fast_path"] / total, 4) if total else 0.0,
+            "latency": {path: h.snapshot() for path, h in self.latency.items()},
+            "gazetteer_sizes": {slot: len(values) for slot, values in self.gazetteer.items()},
+        }
+
+
+def _kb_sectors() -> List[str]:
+    incubators = content_store.kb.get("ecosystem", {}).get("incubators", [])
+    return [sector for incubator in incubators for sector in incubator.get("focus_sector", [])]
+
+
+def _kb_venues() -> List[str]:
+    events = content_store.kb.get("ecosystem", {}).get("events", [])
+    return [event["venue"] for event in events if event.get("venue")]
+
+
+query_router = QueryRouter()
+# KB sectors and venues are gazetteer entries too
+content_store.subscribe(("kb",), query_router.refresh_gazetteer)
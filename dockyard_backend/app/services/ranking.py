@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+import math
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.prompt_models import StructuredQuery
+
+# Relative weight of each relevance signal
+KEYWORD_WEIGHT = 1.0
+SECTOR_WEIGHT = 2.0
+STAGE_WEIGHT = 1.5
+GEOGRAPHY_WEIGHT = 1.5
+RECENCY_WEIGHT = 0.5
+# Half-life of the recency boost, in days
+RECENCY_HALF_LIFE_DAYS = 180
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TEXT_FIELDS = ("service_name", "description", "short_description", "startup_name", "investor_name", "bio")
+_SECTOR_FIELDS = ("sector", "investment_focus_sectors", "category")
+_STAGE_FIELDS = ("stage", "investment_focus_stages")
+_GEOGRAPHY_FIELDS = ("district", "geographical_focus", "description")
+_DATE_FIELDS = ("updated_at", "created_at")
+
+
+def _words(value: Any) -> set:
+    if value is None:
+        return set()
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return set(_WORD_RE.findall(value.lower()))
+
+
+def _matches(result: Dict[str, Any], fields: Tuple[str, ...], wanted: Optional[str]) -> bool:
+    if not wanted:
+        return False
+    wanted_words = _words(wanted)
+    return any(wanted_words and wanted_words <= _words(result.get(field)) for field in fields)
+
+
+def _recency(result: Dict[str, Any], now: datetime) -> float:
+    for field in _DATE_FIELDS:
+        value = result.get(field)
+        if not value:
+            continue
+        try:
+            stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        age_days = max((now - stamp).total_seconds() / 86400, 0.0)
+        return math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+    return 0.0
+
+
+def score_result(result: Dict[str, Any], structured_query: StructuredQuery, now: Optional[datetime] = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    text = set()
+    for field in _TEXT_FIELDS:
+        text |= _words(result.get(field))
+    keyword_hits = 0.0
+    for keyword in structured_query.keywords:
+        words = _words(keyword)
+        if words:
+            # Partial credit for multi-word keywords ("GST filing" vs a row mentioning only GST)
+            keyword_hits += len(words & text) / len(words)
+    return (
+        KEYWORD_WEIGHT * keyword_hits
+        + SECTOR_WEIGHT * _matches(result, _SECTOR_FIELDS, structured_query.sector)
+        + STAGE_WEIGHT * _matches(result, _STAGE_FIELDS, structured_query.stage)
+        + GEOGRAPHY_WEIGHT * _matches(result, _GEOGRAPHY_FIELDS, structured_query.geography)
+        + RECENCY_WEIGHT * _recency(result, now)
+    )
+
+
+def rank_results(results: List[Dict[str, Any]], structured_query: StructuredQuery) -> List[Dict[str, Any]]:
+    """Sort by descending score; ties keep the database order so pages stay stable."""
+    now = datetime.now(timezone.utc)
+    scored = [(score_result(r, structured_query, now), i, r) for i, r in enumerate(results)]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [r for _, _, r in scored]
+
+
+# -------------------------------
+# Cursors
+# -------------------------------
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(offset: int, query_digest: str) -> str:
+    payload = json.dumps({"o": offset, "q": query_digest}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, query_digest: str) -> int:
+    """Offset stored in the cursor; rejects cursors minted for a different query."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset, digest = int(payload["o"]), payload["q"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+    if digest != query_digest or offset < 0:
+        raise InvalidCursorError("Cursor does not belong to this query")
+    return offset
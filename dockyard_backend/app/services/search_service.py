@@ -1,16 +1,31 @@
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+import asyncio
 import re
 
-from app.db.queries import search_services, search_funding_entities
+from app.core.config import settings
+from app.db.queries import INVESTOR_COLUMNS, search_services, search_funding_entities
 from app.db.supabase_client import get_supabase_client
 from app.models.prompt_models import StructuredQuery, SearchResult
+from app.services.matchmaking import matchmaker
+from app.services.ranking import rank_results
+from app.services.semantic_index import semantic_search
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 class SearchService:
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    def __init__(self, supabase: Optional["Client"] = None):
+        self._supabase = supabase
+
+    @property
+    def supabase(self) -> "Client":
+        # The shared client, created on first search unless one was passed in
+        if self._supabase is None:
+            self._supabase = get_supabase_client()
+        return self._supabase
 
-    def perform_search(self, structured_query: StructuredQuery) -> List[SearchResult]:
+    async def perform_search(self, structured_query: StructuredQuery) -> List[SearchResult]:
         query_type = structured_query.query_type
         results_data: List[Dict[str, Any]] = []
 
@@ -30,27 +45,71 @@ class SearchService:
                             min_revenue = value * 100000    # 1 Lakh = 100,000
                         else:
                             min_revenue = value # Assume it's already in the correct unit if no unit specified
-            results_data = search_funding_entities(
+            # With the match index loaded, investors come from it: only those focused on the sector
+            # and district, best matches first, with no PostgREST round trip
+            use_matches = matchmaker.ready
+            results_data = await search_funding_entities(
                 self.supabase,
                 structured_query.sector,
                 structured_query.geography,
-                min_revenue
+                min_revenue,
+                with_investors=not use_matches
             )
+            if use_matches:
+                results_data = self._matched_investors(structured_query) + results_data
+            # Startups described in other words than the sector filter ("healthcare" vs "MedTech").
+            # The index holds no revenue, so with a revenue floor only the filtered DB rows are used.
+            if min_revenue is None:
+                semantic_text = " ".join(filter(None, [structured_query.sector, *structured_query.keywords]))
+                hits = semantic_search.search(semantic_text, settings.FUNDING_SEARCH_LIMIT, ("startups",))
+                results_data = _merge(results_data, _in_district(hits, structured_query.geography), "startup_name")
         elif query_type == "compliance": # Default to services_marketplace for compliance and others
-            keywords = structured_query.keywords
+            keywords = list(structured_query.keywords)
             if structured_query.query_type:
                 keywords.append(structured_query.query_type)
             if structured_query.geography:
                 keywords.append(structured_query.geography)
-            results_data = search_services(self.supabase, keywords)
+            results_data = await asyncio.to_thread(search_services, self.supabase, keywords)
+            results_data = self._with_semantic_services(results_data, keywords)
         else:
             # Handle other query types or default search
-            keywords = structured_query.keywords
+            keywords = list(structured_query.keywords)
             if structured_query.query_type:
                 keywords.append(structured_query.query_type)
             if structured_query.geography:
                 keywords.append(structured_query.geography)
-            results_data = search_services(self.supabase, keywords)
+            results_data = await asyncio.to_thread(search_services, self.supabase, keywords)
+            results_data = self._with_semantic_services(results_data, keywords)
+
+        return [SearchResult(**data) for data in rank_results(results_data, structured_query)]
+
+    @staticmethod
+    def _with_semantic_services(results_data: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, Any]]:
+        # Services whose descriptions match the keywords' meaning, not only their spelling
+        hits = semantic_search.search(" ".join(keywords), settings.SERVICES_SEARCH_LIMIT, ("services_marketplace",))
+        return _merge(results_data, hits, "service_name")
+
+    @staticmethod
+    def _matched_investors(structured_query: StructuredQuery) -> List[Dict[str, Any]]:
+        matches = matchmaker.index.investors_for(
+            structured_query.sector, structured_query.stage, structured_query.geography, settings.FUNDING_SEARCH_LIMIT
+        )
+        # Same fields as the PostgREST investor rows, plus the match score
+        return [
+            {**{column: match.get(column) for column in INVESTOR_COLUMNS}, "match_score": match["match_score"], "type": "investor"}
+            for match in matches
+        ]
+
+
+def _merge(results_data: List[Dict[str, Any]], hits: List[Dict[str, Any]], name_field: str) -> List[Dict[str, Any]]:
+    """Append semantic hits not already among the database rows (same name)."""
+    seen = {row.get(name_field) for row in results_data}
+    return results_data + [hit for hit in hits if hit.get(name_field) not in seen]
 
-        return [SearchResult(**data) for data in results_data]
 
+def _in_district(hits: List[Dict[str, Any]], geography: Optional[str]) -> List[Dict[str, Any]]:
+    """Semantic hits passing the same district filter as the database rows (ILIKE '%geography%')."""
+    if not geography:
+        return hits
+    needle = geography.lower()
+    return [hit for hit in hits if needle in (hit.get("district") or "").lower()]
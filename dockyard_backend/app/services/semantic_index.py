@@ -0,0 +1,512 @@
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.cache import query_tokens
+from app.core.config import settings
+from app.db import pool
+
+# -------------------------------
+# Semantic search over directory text
+# -------------------------------
+# Mentor expertise, investor bios, startup descriptions and marketplace services are embedded
+# with a hashing vectorizer: each word, its character trigrams and its domain concept
+# ("healthcare", "MedTech" and "hospital" all carry "health") hash into a DIM-wide signed
+# vector, so no model or vocabulary has to be trained or shipped. Vectors live in one float32
+# matrix; `python -m app.services.semantic_index --path DIR` builds it offline and every worker
+# maps DIR copy-on-write (SEMANTIC_INDEX_PATH), so the pages are shared and a restart does not
+# re-embed. Large indexes are searched through an inverted file: rows are grouped into k-means
+# lists and a query scores only the rows of its PROBE_LISTS nearest lists. Upserted rows are
+# scanned exactly until MERGE_ROWS of them have accumulated, then filed into their lists.
+
+DIM = 256
+# Share of a word's weight given to its character trigrams (catches "health" in "healthcare")
+TRIGRAM_WEIGHT = 0.5
+CONCEPT_WEIGHT = 1.0
+# Below this many rows a full scan is as fast as the inverted file, and exact
+EXACT_MAX_ROWS = 20000
+# Rows per k-means list; queries score the rows of PROBE_LISTS lists
+LIST_ROWS = 256
+PROBE_LISTS = 24
+KMEANS_SAMPLE = 16384
+KMEANS_ITERATIONS = 6
+# Upserted rows scanned exactly before they are filed into lists; lists are retrained when
+# the index has doubled or halved since they were trained
+MERGE_ROWS = 4096
+SEED = 7
+
+# Domain words that mean the same thing without being spelled alike
+CONCEPTS = {
+    "health": ("health", "healthcare", "healthtech", "medtech", "medical", "medicine", "hospital", "hospitals",
+               "clinic", "clinical", "pharma", "pharmaceutical", "diagnostics", "biotech", "wellness", "patient"),
+    "finance": ("fintech", "finance", "financial", "banking", "bank", "payments", "payment", "lending", "loan",
+                "loans", "credit", "insurance", "insurtech", "wealth", "upi"),
+    "agriculture": ("agritech", "agriculture", "agri", "farming", "farm", "farmer", "farmers", "crop", "crops",
+                    "dairy", "fisheries", "food", "foodtech"),
+    "education": ("edtech", "education", "learning", "school", "schools", "students", "teaching", "skilling",
+                  "training", "university"),
+    "climate": ("cleantech", "climate", "renewable", "solar", "energy", "ev", "electric", "sustainability",
+                "sustainable", "recycling", "waste", "water"),
+    "ai": ("ai", "ml", "artificial", "intelligence", "machine", "deeptech", "computer", "vision", "nlp", "analytics"),
+    "software": ("saas", "software", "cloud", "platform", "app", "apps", "api", "devops", "cybersecurity"),
+    "commerce": ("ecommerce", "commerce", "retail", "d2c", "marketplace", "shopping", "consumer", "fmcg"),
+    "logistics": ("logistics", "supply", "chain", "shipping", "delivery", "freight", "warehousing", "mobility"),
+    "manufacturing": ("manufacturing", "industrial", "factory", "hardware", "iot", "robotics", "electronics",
+                      "textile", "textiles", "automotive"),
+    "legal": ("legal", "law", "lawyer", "compliance", "regulatory", "incorporation", "contracts", "contract"),
+    "tax": ("tax", "taxation", "gst", "accounting", "accountant", "audit", "bookkeeping", "ca"),
+    "ip": ("ip", "patent", "patents", "trademark", "trademarks", "copyright", "intellectual"),
+    "funding": ("funding", "investment", "investing", "investor", "investors", "vc", "venture", "angel",
+                "grant", "grants", "fundraising", "capital"),
+    "marketing": ("marketing", "branding", "brand", "sales", "growth", "advertising", "seo", "gtm"),
+    "hiring": ("hiring", "recruitment", "talent", "hr", "payroll", "staffing"),
+}
+_CONCEPT_OF = {word: concept for concept, words in CONCEPTS.items() for word in words}
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+
+class Source(NamedTuple):
+    """A table whose text columns are embedded; payload columns are what a hit returns."""
+    table: str
+    entity_type: str
+    key: str
+    text_columns: Tuple[str, ...]
+    payload_columns: Tuple[str, ...]
+    where: str = ""
+
+    def sql(self) -> str:
+        columns = dict.fromkeys((self.key, *self.text_columns, *self.payload_columns))
+        where = f" WHERE {self.where}" if self.where else ""
+        return f"SELECT {', '.join(columns)} FROM {self.table}{where}"
+
+
+SOURCES = (
+    # Same columns as search_services_ranked returns, so hits and RPC rows merge
+    Source("services_marketplace", "service", "service_id", ("service_name", "category", "service_provider", "description"),
+           ("service_name", "description", "access_link", "category", "updated_at")),
+    Source("startups", "startup", "startup_id", ("startup_name", "sector", "short_description"),
+           ("startup_name", "website_url", "short_description", "sector", "stage", "district")),
+    Source("investors", "investor", "investor_id", ("investor_name", "investment_focus_sectors", "bio"),
+           ("investor_name", "investor_type", "email", "website_url", "investment_focus_sectors")),
+    Source("mentors", "mentor", "mentor_id", ("mentor_name", "current_position", "areas_of_expertise", "industry_specialization", "bio"),
+           ("mentor_name", "areas_of_expertise", "email", "linkedin_profile_url"), "deleted_at IS NULL"),
+)
+ENTITY_TYPES = {source.table: source.entity_type for source in SOURCES}
+
+
+# -------------------------------
+# Hashing vectorizer
+# -------------------------------
+def _hashed(feature: str) -> Tuple[int, float]:
+    h = zlib.crc32(feature.encode())
+    return h % DIM, (1.0 if h >> 31 else -1.0)
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_features(word: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and signed weights contributed by one word."""
+    features = [(word, 1.0)]
+    concept = _CONCEPT_OF.get(word)
+    if concept:
+        features.append((f"~{concept}", CONCEPT_WEIGHT))
+    padded = f"<{word}>"
+    trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    if len(trigrams) > 1:
+        features += [(f"#{gram}", TRIGRAM_WEIGHT / len(trigrams) ** 0.5) for gram in trigrams]
+    columns, values = [], []
+    for feature, weight in features:
+        column, sign = _hashed(feature)
+        columns.append(column)
+        values.append(sign * weight)
+    return np.asarray(columns, np.int64), np.asarray(values, np.float32)
+
+
+def _words(text: str) -> List[str]:
+    words = query_tokens(text)
+    # "MedTech" also counts as "med" and "tech"
+    split = query_tokens(_CAMEL_RE.sub(" ", text))
+    if len(split) != len(words):
+        seen = set(words)
+        words += [word for word in split if word not in seen]
+    return words
+
+
+def embed(texts: Sequence[str]) -> np.ndarray:
+    """Unit-length DIM-wide float32 rows; a text with no usable words embeds as zeros."""
+    word_rows, lengths, columns, values = [], [], [], []
+    for row, text in enumerate(texts):
+        for word in _words(text or ""):
+            word_columns, word_values = _word_features(word)
+            word_rows.append(row)
+            lengths.append(len(word_columns))
+            columns.append(word_columns)
+            values.append(word_values)
+    if not columns:
+        return np.zeros((len(texts), DIM), np.float32)
+    flat = np.repeat(np.asarray(word_rows, np.int64), lengths) * DIM + np.concatenate(columns)
+    matrix = np.bincount(flat, weights=np.concatenate(values), minlength=len(texts) * DIM)
+    matrix = matrix.reshape(len(texts), DIM).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(map(str, value))
+    return str(value)
+
+
+def _payload_value(value: Any) -> Any:
+    # asyncpg returns jsonb as text; hits carry the parsed list like the PostgREST rows do
+    if isinstance(value, str) and value.lstrip()[:1] == "[":
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+# -------------------------------
+# Index
+# -------------------------------
+class SemanticIndex:
+    """
+    Row-per-entity vector matrix with an inverted file on top. Writes come from one refresh at
+    a time (in a worker thread) and take the lock per batch; searches take it for the few
+    milliseconds they run, so they never see a half-written row.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tables: List[str] = []
+        self.keys: List[Tuple[str, str]] = []
+        self.row_of: Dict[Tuple[str, str], int] = {}
+        self.digests: List[Optional[str]] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.vectors = np.zeros((0, DIM), np.float32)
+        self.table_ids = np.zeros(0, np.uint8)
+        self.alive = np.zeros(0, bool)
+        self.count = 0
+        self.mapped = False
+        # Inverted file: rows of list c are order[starts[c]:starts[c + 1]]
+        self.centroids = np.zeros((0, DIM), np.float32)
+        self.list_of = np.zeros(0, np.int32)
+        self.order = np.zeros(0, np.int64)
+        self.starts = np.zeros(1, np.int64)
+        self.trained_rows = 0
+        # Rows written since the lists were last rebuilt; always scored
+        self.pending: Dict[int, None] = {}
+
+    @property
+    def mode(self) -> str:
+        return "ivf" if len(self.centroids) else "exact"
+
+    def live_rows(self) -> int:
+        return int(self.alive[:self.count].sum())
+
+    # -------------------------------
+    # Updates
+    # -------------------------------
+    def sync_table(self, source: Source, rows: List[Dict[str, Any]]) -> int:
+        """Make one table's rows match this snapshot; returns how many rows were written or removed."""
+        changed, seen = [], set()
+        for row in rows:
+            key = (source.table, str(row[source.key]))
+            seen.add(key)
+            digest = hashlib.blake2b(repr(tuple(row.values())).encode(), digest_size=8).hexdigest()
+            current = self.row_of.get(key)
+            if current is None or self.digests[current] != digest:
+                changed.append((key, row, digest))
+        gone = [key for key in self.row_of if key[0] == source.table and key not in seen]
+        self.upsert(
+            source.table,
+            [key[1] for key, _, _ in changed],
+            [" ".join(_text(row.get(column)) for column in source.text_columns) for _, row, _ in changed],
+            [{column: _payload_value(row.get(column)) for column in source.payload_columns} for _, row, _ in changed],
+            [digest for _, _, digest in changed],
+        )
+        self.remove(gone)
+        return len(changed) + len(gone)
+
+    def upsert(self, table: str, ids: List[str], texts: List[str], payloads: List[Dict[str, Any]],
+               digests: Optional[List[Optional[str]]] = None) -> None:
+        if not ids:
+            return
+        vectors = embed(texts)
+        digests = digests or [None] * len(ids)
+        with self._lock:
+            if table not in self.tables:
+                self.tables.append(table)
+            table_id = self.tables.index(table)
+            rows = []
+            for key, payload, digest in zip(((table, i) for i in ids), payloads, digests):
+                row = self.row_of.get(key)
+                if row is None:
+                    row = self.row_of[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.digests.append(None)
+                    self.payloads.append(None)
+                self.digests[row], self.payloads[row] = digest, payload
+                rows.append(row)
+                self.pending[row] = None
+            self._reserve(len(self.keys))
+            self.vectors[rows] = vectors
+            self.table_ids[rows] = table_id
+            self.alive[rows] = True
+            self.count = len(self.keys)
+        if len(self.pending) >= MERGE_ROWS:
+            self.merge()
+
+    def remove(self, keys: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            for key in keys:
+                row = self.row_of.pop(key, None)
+                if row is not None:
+                    # The row stays allocated (and in its list) as a tombstone
+                    self.alive[row] = False
+                    self.payloads[row] = None
+                    self.pending.pop(row, None)
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self.vectors)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 1024)
+        # Growing a mapped index copies it into memory; the files stay as built
+        vectors = np.zeros((capacity, DIM), np.float32)
+        vectors[:self.count] = self.vectors[:self.count]
+        self.vectors, self.mapped = vectors, False
+        for name, dtype in (("table_ids", np.uint8), ("alive", bool), ("list_of", np.int32)):
+            grown = np.zeros(capacity, dtype) if name != "list_of" else np.full(capacity, -1, np.int32)
+            old = getattr(self, name)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def merge(self) -> None:
+        """File pending rows into their lists, retraining the lists when the index size has moved a lot."""
+        live = self.live_rows()
+        if live <= EXACT_MAX_ROWS:
+            with self._lock:
+                self.centroids = np.zeros((0, DIM), np.float32)
+                self.pending.clear()
+            return
+        if not len(self.centroids) or not self.trained_rows / 2 <= live <= self.trained_rows * 2:
+            centroids = self._train()
+            list_of = np.full(len(self.list_of), -1, np.int32)
+            list_of[:self.count] = self._assign(self.vectors[:self.count], centroids)
+            trained_rows = live
+        else:
+            centroids, trained_rows = self.centroids, self.trained_rows
+            list_of = self.list_of.copy()
+            pending = np.fromiter(self.pending, np.int64, len(self.pending))
+            list_of[pending] = self._assign(self.vectors[pending], centroids)
+        filed = np.flatnonzero(self.alive[:self.count])
+        order = filed[np.argsort(list_of[filed], kind="stable")]
+        starts = np.searchsorted(list_of[order], np.arange(len(centroids) + 1))
+        with self._lock:
+            self.centroids, self.trained_rows, self.list_of = centroids, trained_rows, list_of
+            self.order, self.starts = order, starts
+            self.pending.clear()
+
+    def _train(self) -> np.ndarray:
+        """Spherical k-means over a sample of the live rows."""
+        rng = np.random.default_rng(SEED)
+        live = np.flatnonzero(self.alive[:self.count])
+        sample = self.vectors[np.sort(rng.choice(live, min(len(live), KMEANS_SAMPLE), replace=False))]
+        lists = max(1, len(live) // LIST_ROWS)
+        centroids = sample[rng.choice(len(sample), min(lists, len(sample)), replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assigned = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assigned, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # An emptied list keeps its old centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids).astype(np.float32)
+        return centroids
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assigned = np.empty(len(vectors), np.int32)
+        for start in range(0, len(vectors), 8192):
+            assigned[start:start + 8192] = np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1)
+        return assigned
+
+    # -------------------------------
+    # Search
+    # -------------------------------
+    def search(self, text: str, k: int, tables: Optional[Sequence[str]] = None, min_score: float = 0.0,
+               exact: bool = False) -> List[Dict[str, Any]]:
+        """The k rows most similar to text (payload plus "type" and "semantic_score"), best first."""
+        query = embed([text])[0]
+        if k <= 0 or not query.any():
+            return []
+        with self._lock:
+            if exact or not len(self.centroids):
+                # Full scan straight off the (possibly mapped) matrix, no gather
+                candidates = np.arange(self.count)
+                scores = self.vectors[:self.count] @ query
+            else:
+                candidates = self._candidates(query)
+                scores = self.vectors[candidates] @ query
+            keep = self.alive[candidates] & (scores >= min_score)
+            if tables is not None:
+                wanted = [self.tables.index(t) for t in tables if t in self.tables]
+                keep &= np.isin(self.table_ids[candidates], wanted)
+            candidates, scores = candidates[keep], scores[keep]
+            if len(candidates) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                candidates, scores = candidates[top], scores[top]
+            best = np.argsort(-scores, kind="stable")
+            return [
+                {**self.payloads[row], "type": ENTITY_TYPES.get(self.tables[self.table_ids[row]], self.tables[self.table_ids[row]]),
+                 "semantic_score": round(float(score), 3)}
+                for row, score in zip(candidates[best], scores[best])
+            ]
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        probes = min(PROBE_LISTS, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), probes - 1)[:probes]
+        parts = [self.order[self.starts[c]:self.starts[c + 1]] for c in nearest]
+        parts.append(np.fromiter(self.pending, np.int64, len(self.pending)))
+        # A row re-filed by an update can sit in a list and be pending at once
+        return np.unique(np.concatenate(parts))
+
+    def size(self) -> Dict[str, Any]:
+        return {
+            "rows": self.live_rows(),
+            "tables": {table: int(((self.table_ids[:self.count] == i) & self.alive[:self.count]).sum())
+                       for i, table in enumerate(self.tables)},
+            "mode": self.mode,
+            "lists": len(self.centroids),
+            "pending": len(self.pending),
+            "mapped": self.mapped,
+        }
+
+    # -------------------------------
+    # Files
+    # -------------------------------
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.vectors[:self.count].tofile(os.path.join(path, "vectors.f32"))
+        np.savez(
+            os.path.join(path, "index.npz"),
+            table_ids=self.table_ids[:self.count], alive=self.alive[:self.count], list_of=self.list_of[:self.count],
+            centroids=self.centroids, order=self.order, starts=self.starts,
+            pending=np.fromiter(self.pending, np.int64, len(self.pending)),
+        )
+        with open(os.path.join(path, "rows.json"), "w") as f:
+            json.dump({
+                "dim": DIM, "tables": self.tables, "keys": self.keys, "digests": self.digests,
+                "payloads": self.payloads, "trained_rows": self.trained_rows,
+            }, f, default=str)
+
+    @classmethod
+    def load(cls, path: str) -> "SemanticIndex":
+        """Open a saved index; the vector file is mapped copy-on-write, so updates stay in this process."""
+        with open(os.path.join(path, "rows.json")) as f:
+            meta = json.load(f)
+        if meta["dim"] != DIM:
+            raise ValueError(f"{path} was built with DIM={meta['dim']}, this build uses {DIM}")
+        index = cls()
+        index.tables = meta["tables"]
+        index.keys = [tuple(key) for key in meta["keys"]]
+        index.digests, index.payloads = meta["digests"], meta["payloads"]
+        index.trained_rows = meta["trained_rows"]
+        arrays = np.load(os.path.join(path, "index.npz"))
+        index.table_ids, index.alive, index.list_of = arrays["table_ids"], arrays["alive"], arrays["list_of"]
+        index.centroids, index.order, index.starts = arrays["centroids"], arrays["order"], arrays["starts"]
+        index.pending = dict.fromkeys(arrays["pending"].tolist())
+        index.count = len(index.keys)
+        if index.count:
+            index.vectors = np.memmap(os.path.join(path, "vectors.f32"), np.float32, "c", shape=(index.count, DIM))
+            index.mapped = True
+        index.row_of = {key: row for row, key in enumerate(index.keys) if index.alive[row]}
+        return index
+
+
+class SemanticSearch:
+    """The process-wide SemanticIndex: opened from SEMANTIC_INDEX_PATH if set, kept in sync with Postgres."""
+
+    def __init__(self):
+        self.index = SemanticIndex()
+        self.loaded = False
+        self._refresh_lock = asyncio.Lock()
+        self.stats = {"refreshes": 0, "failures": 0, "rows_changed": 0}
+        self.last_refresh_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded and self.index.live_rows() > 0
+
+    def search(self, text: str, k: int, tables: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not self.ready or not text:
+            return []
+        return self.index.search(text, k, tables, settings.SEMANTIC_MIN_SCORE)
+
+    async def open(self) -> None:
+        if settings.SEMANTIC_INDEX_PATH and os.path.exists(os.path.join(settings.SEMANTIC_INDEX_PATH, "rows.json")):
+            try:
+                self.index = await asyncio.to_thread(SemanticIndex.load, settings.SEMANTIC_INDEX_PATH)
+                # Searchable right away; the first refresh then re-embeds only what changed since the build
+                self.loaded = True
+            except Exception as e:
+                logging.warning(f"Could not open the semantic index at {settings.SEMANTIC_INDEX_PATH}, rebuilding: {e!r}")
+
+    async def refresh(self) -> None:
+        """Re-read every source table; only rows whose columns changed are re-embedded."""
+        async with self._refresh_lock:
+            started = time.perf_counter()
+            for source in SOURCES:
+                try:
+                    rows = [dict(row) for row in await pool.fetch(source.sql())]
+                except Exception as e:
+                    # That table keeps its previous rows
+                    self.stats["failures"] += 1
+                    logging.warning(f"Semantic index refresh of {source.table} failed: {e!r}")
+                    continue
+                self.stats["rows_changed"] += await asyncio.to_thread(self.index.sync_table, source, rows)
+            if self.index.pending:
+                await asyncio.to_thread(self.index.merge)
+            self.loaded = True
+            self.stats["refreshes"] += 1
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def watch(self, interval: float) -> None:
+        await self.open()
+        while True:
+            await self.refresh()
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "ready": self.ready, "last_refresh_ms": self.last_refresh_ms, **self.index.size()}
+
+
+semantic_search = SemanticSearch()
+
+
+async def _build(path: str) -> None:
+    await semantic_search.refresh()
+    semantic_search.index.save(path)
+    print(json.dumps({"path": path, **semantic_search.metrics()}, indent=2))
+    await pool.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the semantic index from SUPABASE_DB_URL into a directory")
+    parser.add_argument("--path", default=settings.SEMANTIC_INDEX_PATH or "semantic_index")
+    asyncio.run(_build(parser.parse_args().path))
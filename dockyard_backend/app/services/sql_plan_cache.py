@@ -0,0 +1,186 @@
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.content_store import content_store
+from app.db.sql_sandbox import UnsafeQueryError, tokenize
+from app.services.query_router import query_router
+
+# -------------------------------
+# Generated-SQL plan cache
+# -------------------------------
+# "FinTech startups in Chennai" and "AgriTech startups in Madurai" are the same question
+# shape with different slot values. The first one goes to Gemini; the SQL it returns is
+# turned into a template by replacing the string literals that carry the slot values with
+# $n parameters. Later questions of the same shape reuse the template with their own
+# values: no LLM call, and the fixed SQL text lets asyncpg reuse its prepared statement.
+
+
+@dataclass
+class Param:
+    # Literal text around the slot value, e.g. ("%", "sector", "%") for '%FinTech%'
+    prefix: str
+    slot: str
+    suffix: str
+    case: str  # "lower", "upper" or "as_is": how the model wrote the value
+
+    def render(self, value: str) -> str:
+        if self.case == "lower":
+            value = value.lower()
+        elif self.case == "upper":
+            value = value.upper()
+        return f"{self.prefix}{value}{self.suffix}"
+
+
+@dataclass
+class SQLTemplate:
+    shape: str
+    sql: str
+    params: List[Param]
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+    last_hit: Optional[float] = None
+
+    def bind(self, slots: Dict[str, str]) -> List[str]:
+        return [param.render(slots[param.slot]) for param in self.params]
+
+
+def question_shape(question: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """Question with slot values replaced by {slot} markers, plus the values; (None, {}) without slots."""
+    words, slots, consumed = query_router.extract_slots(question)
+    if not slots:
+        return None, {}
+    shape: List[str] = []
+    for word, slot in zip(words, consumed):
+        if slot is None:
+            shape.append(word)
+        elif not shape or shape[-1] != f"{{{slot}}}":
+            # A multi-word value ("early traction") is one marker
+            shape.append(f"{{{slot}}}")
+    return " ".join(shape), slots
+
+
+def _unquote(literal: str) -> Optional[str]:
+    if not literal.startswith("'"):
+        # E'' and dollar-quoted strings may hold escapes; leave them inline
+        return None
+    return literal[1:-1].replace("''", "'")
+
+
+def _case_of(text: str) -> str:
+    if text.islower():
+        return "lower"
+    if text.isupper():
+        return "upper"
+    return "as_is"
+
+
+def parameterize(sql: str, slots: Dict[str, str]) -> Optional[Tuple[str, List[Param]]]:
+    """Template text and its parameters, or None when the SQL does not use every slot value as a literal."""
+    try:
+        tokens = tokenize(sql)
+    except UnsafeQueryError:
+        return None
+    if any(token.kind == "param" for token in tokens):
+        return None
+    patterns = {
+        slot: re.compile(rf"(?<![a-z0-9]){re.escape(value)}(?![a-z0-9])", re.IGNORECASE)
+        for slot, value in slots.items()
+    }
+    pieces, params, used, pos = [], [], set(), 0
+    for token in tokens:
+        if token.kind != "string":
+            continue
+        text = _unquote(token.value)
+        if text is None:
+            continue
+        for slot, pattern in patterns.items():
+            match = pattern.search(text)
+            if not match:
+                continue
+            start = token.end - len(token.value)
+            params.append(Param(text[:match.start()], slot, text[match.end():], _case_of(match.group(0))))
+            pieces.append(sql[pos:start])
+            pieces.append(f"${len(params)}")
+            pos = token.end
+            used.add(slot)
+            break
+    if used != set(slots):
+        return None
+    pieces.append(sql[pos:])
+    return "".join(pieces), params
+
+
+class SQLPlanCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.templates: "OrderedDict[str, SQLTemplate]" = OrderedDict()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "learned": 0, "unusable": 0, "evictions": 0, "invalidations": 0}
+
+    def lookup(self, question: str) -> Optional[Tuple[SQLTemplate, List[str]]]:
+        """Template and bound parameters for a question whose shape has been seen, else None."""
+        if not settings.SQL_PLAN_CACHE_ENABLED:
+            return None
+        self.stats["lookups"] += 1
+        shape, slots = question_shape(question)
+        template = self.templates.get(shape) if shape else None
+        if template is None:
+            self.stats["misses"] += 1
+            return None
+        self.templates.move_to_end(shape)
+        template.hits += 1
+        template.last_hit = time.time()
+        self.stats["hits"] += 1
+        return template, template.bind(slots)
+
+    def learn(self, question: str, sql: str) -> Optional[SQLTemplate]:
+        """Store the SQL Gemini wrote for question as a template for its shape, if it generalizes."""
+        if not settings.SQL_PLAN_CACHE_ENABLED or not sql:
+            return None
+        shape, slots = question_shape(question)
+        if not shape or shape in self.templates:
+            return None
+        parameterized = parameterize(sql, slots)
+        if parameterized is None:
+            self.stats["unusable"] += 1
+            return None
+        template = SQLTemplate(shape=shape, sql=parameterized[0], params=parameterized[1])
+        self.templates[shape] = template
+        self.stats["learned"] += 1
+        while len(self.templates) > self.max_entries:
+            self.templates.popitem(last=False)
+            self.stats["evictions"] += 1
+        return template
+
+    def forget(self, template: SQLTemplate) -> None:
+        # A template whose run failed is not trusted again
+        if self.templates.get(template.shape) is template:
+            del self.templates[template.shape]
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        self.templates.clear()
+        self.stats["invalidations"] += 1
+        logging.info("SQL plan cache cleared")
+
+    def metrics(self, top: int = 20) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        busiest = sorted(self.templates.values(), key=lambda t: t.hits, reverse=True)[:top]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "size": len(self.templates),
+            "templates": [
+                {"shape": t.shape, "sql": t.sql, "params": len(t.params), "hits": t.hits, "last_hit": t.last_hit}
+                for t in busiest
+            ],
+        }
+
+
+sql_plan_cache = SQLPlanCache(settings.SQL_PLAN_CACHE_MAX_ENTRIES)
+# Templates name tables and columns; a schema change can make any of them wrong
+content_store.subscribe(("schema",), sql_plan_cache.clear)
@@ -1,108 +1,112 @@
-import google.generativeai as genai
 import json
 import traceback
 import logging
-import asyncpg
-import os
-from typing import Union, Dict, Any, List
-from dotenv import load_dotenv
+import time
+from typing import AsyncIterator, Union, Dict, Any, List, Optional, Tuple
 
-load_dotenv()
+from app.core.clients import clients
+from app.core.concurrency import LLMOverloadedError, gemini_limiter
+from app.core.config import settings
+from app.core.metrics import record_llm
+from app.core.prompts import KNOWLEDGE_TEMPLATE, SQL_TEMPLATE, PromptTemplate, compact_json, context_cache, static_context
+from app.db import sql_sandbox
+from app.db.sql_sandbox import UnsafeQueryError
+from app.utils.parsers import parse_sql, response_text
 
 # -------------------------------
-# Gemini 2.5 Flash Configuration
+# Gemini Configuration (GEMINI_MODEL, built by app/core/clients.py on first use)
 # -------------------------------
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.5-flash")
+async def prepare_prompt(template: PromptTemplate, context: Union[dict, str], question: str, supplement: str = "") -> Tuple[Any, List[dict]]:
+    """Model and contents for one call; the full KB/schema prefix comes from Gemini's context cache when enabled."""
+    context_text, static_name = static_context.serialize(context)
+    if static_name:
+        cached_model = await context_cache.model_for(f"{template.name}:{static_name}", settings.GEMINI_MODEL, template.prefix_texts(context_text))
+        if cached_model is not None:
+            return cached_model, [template.question_message(question, supplement)]
+    return clients.gemini_model(settings.GEMINI_MODEL), [template.message(context_text, question, supplement)]
 
-# -------------------------------
-# Supabase PostgreSQL Connection
-# -------------------------------
-DATABASE_URL = os.getenv("SUPABASE_DB_URL")
-if not DATABASE_URL:
-    raise ValueError("❌ Missing SUPABASE_DB_URL in .env file")
+
+def _directory_text(directory_matches: Optional[List[dict]]) -> str:
+    return compact_json(directory_matches) if directory_matches else ""
 
 # -------------------------------
-# Run SQL on Supabase PostgreSQL
+# Run generated SQL on Supabase PostgreSQL (sandboxed, see app/db/sql_sandbox.py)
 # -------------------------------
-async def run_sql(query: str) -> List[Dict[str, Any]]:
+async def run_sql(query: str, *args: Any) -> List[Dict[str, Any]]:
+    """Rows as dicts, or a single {"error": ...} row. args bind $n parameters of a learned template."""
     try:
-        conn = await asyncpg.connect(DATABASE_URL)
-        try:
-            rows = await conn.fetch(query)
-            return [dict(row) for row in rows]
-        finally:
-            await conn.close()
+        rows = await sql_sandbox.run_readonly(query, *args)
+        return [dict(row) for row in rows]
+    except UnsafeQueryError as e:
+        logging.warning(f"Refused generated SQL ({e}): {query}")
+        return [{"error": str(e)}]
     except Exception as e:
         logging.error(f"SQL Execution Error: {e}\n{traceback.format_exc()}")
         return [{"error": str(e)}]
 
+# -------------------------------
+# SQL Generation (stage 1 of database mode)
+# -------------------------------
+async def generate_sql(user_question: str, schema_json: Union[dict, str]) -> str:
+    """
+    Ask Gemini for a single SQL query answering user_question against schema_json.
+    schema_json may be the schema dict or its pre-serialized text (see app/core/schema_slicer.py).
+    Returns the bare SQL text, or "" when Gemini gave nothing usable. Does not touch the database;
+    execute the result with run_sql.
+    """
+    sql_model, contents = await prepare_prompt(SQL_TEMPLATE, schema_json, user_question)
+    async with gemini_limiter:
+        started = time.perf_counter()
+        response = await sql_model.generate_content_async(contents)
+    record_llm("sql", started, response)
+    return parse_sql(response_text(response))
+
+# -------------------------------
+# Knowledge mode, streamed
+# -------------------------------
+async def gemini_stream(user_question: str, unified_json: dict, directory_matches: Optional[List[dict]] = None) -> AsyncIterator[str]:
+    """Yield the knowledge-mode answer as Gemini produces it, chunk by chunk."""
+    knowledge_model, contents = await prepare_prompt(
+        KNOWLEDGE_TEMPLATE, unified_json, user_question, _directory_text(directory_matches)
+    )
+    async with gemini_limiter:
+        started = time.perf_counter()
+        response = await knowledge_model.generate_content_async(contents, stream=True)
+        chunk = None
+        async for chunk in response:
+            if chunk.candidates and chunk.candidates[0].content.parts:
+                text = chunk.candidates[0].content.parts[0].text
+                if text:
+                    yield text
+    # The last chunk carries the usage metadata for the whole answer
+    record_llm("knowledge_stream", started, chunk)
+
 # -------------------------------
 # Gemini Call (Dual Mode: database / knowledge)
 # -------------------------------
-async def gemini_call(user_question: str, unified_json: dict, mode: str = "knowledge") -> dict:
+async def gemini_call(user_question: str, unified_json: dict, mode: str = "knowledge",
+                      directory_matches: Optional[List[dict]] = None) -> dict:
     """
     Gemini SQL/Knowledge assistant. In database mode, always generate a valid SQL query using ONLY the tables and columns provided in the SCHEMA_JSON. Return ONLY the SQL query, nothing else. In knowledge mode, answer using the knowledge base JSON.
+    directory_matches (knowledge mode) are sent next to the question, outside the cacheable KB prefix.
     """
     try:
         if mode == "database":
-            instructions = (
-                "You are a SQL query generator for a PostgreSQL database. "
-                "Always generate a valid SQL query using ONLY the tables and columns provided in the SCHEMA_JSON. "
-                "Use ILIKE for text/varchar search and ::text ILIKE for JSONB search. "
-                "Return ONLY the SQL query, nothing else. "
-                "If you cannot answer, return a SQL SELECT statement that would be valid for the schema."
-            )
-            message = {
-                "role": "user",
-                "parts": [
-                    {"text": instructions},
-                    {"text": f"SCHEMA_JSON:\n{json.dumps(unified_json, indent=2)}"},
-                    {"text": f"USER_QUESTION:\n{user_question}"}
-                ]
-            }
-            response = await model.generate_content_async([message])
-            if not response.candidates or not response.candidates[0].content.parts:
-                return {"results": [], "explanation": "", "sql": ""}
-            sql = response.candidates[0].content.parts[0].text.strip()
-            # Remove code block if present
-            if sql.startswith("```sql"):
-                sql = sql[6:].strip()
-            if sql.endswith("```"):
-                sql = sql[:-3].strip()
-            if not sql.lower().startswith(("select", "with", "insert", "update", "delete")):
-                return {"results": [], "explanation": "", "sql": sql}
-            rows = await run_sql(sql)
+            sql = await generate_sql(user_question, unified_json)
+            rows = await run_sql(sql) if sql else []
             return {"results": rows, "explanation": sql, "sql": sql}
         else:
-            # Knowledge mode instructions
-            instructions = (
-                "You are StartupTN Assistant specialized in knowledge retrieval.\n"
-                "Rules:\n"
-                "1. Always use the provided KNOWLEDGE_BASE JSON.\n"
-                "2. For registration/application queries, check 'programs -> TANFUND -> wizard'.\n"
-                "3. List required fields step by step with relevant URLs from 'urls_hint'.\n"
-                "4. For ecosystem queries, use 'ecosystem' section.\n"
-                "5. Always answer clearly with actionable steps.\n"
-                "6. Include all relevant URLs from JSON.\n"
-                "7. Never refuse to answer.\n"
+            knowledge_model, contents = await prepare_prompt(
+                KNOWLEDGE_TEMPLATE, unified_json, user_question, _directory_text(directory_matches)
             )
-
-            message = {
-                "role": "user",
-                "parts": [
-                    {"text": instructions},
-                    {"text": "CONTEXT_VERSION: 2.5"},
-                    {"text": f"KNOWLEDGE_BASE:\n{json.dumps(unified_json, indent=2)}"},
-                    {"text": "USER_QUESTION:\n" + user_question}
-                ]
-            }
-
-            response = await model.generate_content_async([message])
-            if not response.candidates or not response.candidates[0].content.parts:
-                return {"results": []}
-            clean_response = response.candidates[0].content.parts[0].text.strip()
-            return {"results": [clean_response]}
+            async with gemini_limiter:
+                started = time.perf_counter()
+                response = await knowledge_model.generate_content_async(contents)
+            record_llm("knowledge", started, response)
+            clean_response = response_text(response).strip()
+            return {"results": [clean_response] if clean_response else []}
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         logging.error(f"Gemini Error: {str(e)}\n{traceback.format_exc()}")
         return {"results": [], "error": f"Error: {str(e)}"}
@@ -0,0 +1,12 @@
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+
+# Headers that stop proxies (nginx, Vercel, Next.js rewrites) from buffering an event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event; data is JSON-encoded so multi-line text stays on one data line."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
@@ -0,0 +1,189 @@
+# Parsing of Gemini responses into SQL text and validated pydantic models.
+# JSON calls ask Gemini for schema-constrained output (response_schema), so the fast path is a
+# single model_validate_json. Anything else (fences, chatter around the JSON, a truncated
+# answer) goes through a tolerant extractor instead of another round trip to the model.
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+# A statement has to start a line, so prose such as "I cannot update..." is not taken for SQL.
+# Only reads are accepted; app/db/sql_sandbox.py enforces the rest before anything runs.
+SQL_STATEMENT_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE | re.MULTILINE)
+_FENCED_RE = re.compile(r"```[a-zA-Z]*\s*(.*?)(?:```|$)", re.DOTALL)
+_SCHEMA_KEYS = ("type", "format", "description", "enum", "properties", "required", "items", "nullable")
+
+
+class ParseError(ValueError):
+    pass
+
+
+# -------------------------------
+# response_schema from pydantic models
+# -------------------------------
+def _to_gemini_schema(node: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    if "$ref" in node:
+        return _to_gemini_schema(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in node:
+        # Optional[X] comes out of pydantic as anyOf [X, null]; Gemini wants X with nullable
+        options = [option for option in node["anyOf"] if option.get("type") != "null"]
+        schema = _to_gemini_schema(options[0], defs)
+        if len(options) < len(node["anyOf"]):
+            schema["nullable"] = True
+        return schema
+    schema = {key: node[key] for key in _SCHEMA_KEYS if key in node}
+    if "properties" in schema:
+        schema["properties"] = {name: _to_gemini_schema(prop, defs) for name, prop in schema["properties"].items()}
+    if "items" in schema:
+        schema["items"] = _to_gemini_schema(schema["items"], defs)
+    return schema
+
+
+@lru_cache(maxsize=None)
+def response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """The OpenAPI-subset schema Gemini accepts, built once per pydantic model."""
+    json_schema = model.model_json_schema()
+    return _to_gemini_schema(json_schema, json_schema.get("$defs", {}))
+
+
+def json_generation_config(model: Type[BaseModel]) -> Dict[str, Any]:
+    return {"response_mime_type": "application/json", "response_schema": response_schema(model)}
+
+
+# -------------------------------
+# Tolerant JSON extraction
+# -------------------------------
+class JSONExtractor:
+    """
+    Incrementally finds the first top-level JSON object/array in text fed chunk by chunk
+    (fences and prose around it are skipped). Each character is scanned once, so feeding a
+    stream costs O(total length).
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.start: Optional[int] = None
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escaped = False
+        self.length = 0
+        self.value: Any = None
+        self.done = False
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """Returns the parsed value as soon as it is complete, else None."""
+        if self.done:
+            return self.value
+        offset = self.length
+        self.buffer.append(chunk)
+        self.length += len(chunk)
+        for i, char in enumerate(chunk, offset):
+            if self.start is None:
+                if char in "{[":
+                    self.start = i
+                    self.stack.append("}" if char == "{" else "]")
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.stack.append("}" if char == "{" else "]")
+            elif char in "}]":
+                if self.stack:
+                    self.stack.pop()
+                if not self.stack:
+                    return self._finish("".join(self.buffer)[self.start:i + 1])
+        return None
+
+    def close(self) -> Any:
+        """End of input: parse what was found, closing a truncated value if need be."""
+        if self.done:
+            return self.value
+        if self.start is None:
+            raise ParseError("No JSON object in response")
+        text = "".join(self.buffer)[self.start:]
+        if self.in_string:
+            text += '"'
+        # Drop a cut-off key (it has no value) and any dangling comma so the closed value parses
+        if self.stack[-1] == "}":
+            text = re.sub(r'([{,])\s*"[^"]*"\s*:?\s*$', r"\1", text)
+        text = re.sub(r",\s*$", "", text)
+        return self._finish(text + "".join(reversed(self.stack)))
+
+    def _finish(self, text: str) -> Any:
+        # Trailing commas are the most common model slip; JSON itself forbids them
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                value = json.loads(re.sub(r",\s*([}\]])", r"\1", text))
+            except json.JSONDecodeError as e:
+                raise ParseError(f"Malformed JSON in response: {e}")
+        self.value, self.done = value, True
+        return value
+
+
+def extract_json(text: str) -> Any:
+    extractor = JSONExtractor()
+    value = extractor.feed(text)
+    return value if extractor.done else extractor.close()
+
+
+# -------------------------------
+# Public parsers
+# -------------------------------
+def parse_model(text: str, model: Type[M]) -> M:
+    """Validate a response straight into model; raises ParseError when nothing usable is there."""
+    try:
+        # Schema-constrained responses are plain JSON: one pass, no intermediate dict
+        return model.model_validate_json(text)
+    except ValidationError:
+        pass
+    try:
+        return model.model_validate(extract_json(text))
+    except ValidationError as e:
+        raise ParseError(f"Response does not match {model.__name__}: {e.error_count()} errors")
+
+
+def salvage_items(text: str, field: str, item_model: Type[M]) -> List[M]:
+    """The valid entries of a list field from a response that failed validation as a whole."""
+    try:
+        value = extract_json(text)
+    except ParseError:
+        return []
+    items = value.get(field) if isinstance(value, dict) else value
+    salvaged = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            salvaged.append(item_model.model_validate(item))
+        except ValidationError:
+            continue
+    return salvaged
+
+
+def parse_sql(text: str) -> str:
+    """The SQL statement in a response (fences and leading prose removed), or "" if there is none."""
+    fenced = _FENCED_RE.search(text or "")
+    # Inside a code block, only the block counts; explanations around it are dropped
+    text = fenced.group(1) if fenced else (text or "")
+    match = SQL_STATEMENT_RE.search(text)
+    if not match:
+        return ""
+    return text[match.start(1):].strip()
+
+
+def response_text(response: Any) -> str:
+    """Text of the first candidate, "" when Gemini returned no content (e.g. blocked)."""
+    if not response.candidates or not response.candidates[0].content.parts:
+        return ""
+    return response.candidates[0].content.parts[0].text or ""
@@ -0,0 +1,121 @@
+"""
+Cold start of the app: process spawn to a 200 from /health/ready.
+
+Each run is a fresh interpreter (python -m benchmarks.cold_start --child) that imports
+app.main, enters the lifespan and asks /health/ready through httpx ASGITransport. It
+reports the import time, the lifespan startup time and the total from spawn to ready;
+the median total is checked against --budget-ms and the script exits 1 when it is over.
+Background warm-up is disabled in the child, so nothing goes over the network.
+--importtime also lists the third-party packages that dominate `import app.main`.
+
+    python -m benchmarks.cold_start --runs 5 --budget-ms 1000
+    python -m benchmarks.cold_start --importtime 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks import _env  # noqa: F401
+
+CHILD_ENV = {
+    "WARMUP_ENABLED": "false",
+    "DB_POOL_MIN_SIZE": "0",
+    "CONTENT_RELOAD_INTERVAL": "0",
+}
+
+
+def child() -> None:
+    started = time.perf_counter()
+    from app import main
+
+    imported = time.perf_counter()
+
+    async def ready() -> Dict[str, Any]:
+        import httpx
+
+        async with main.app.router.lifespan_context(main.app):
+            lifespan_ms = (time.perf_counter() - imported) * 1000
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.get("/health/ready")
+            ready_at = time.time()
+            return {
+                "status": response.status_code,
+                "lifespan_ms": round(lifespan_ms, 2),
+                "ready_at": ready_at,
+                "clients": response.json().get("clients"),
+            }
+
+    result = asyncio.run(ready())
+    result["import_ms"] = round((imported - started) * 1000, 2)
+    print(json.dumps(result), flush=True)
+
+
+def run_once() -> Dict[str, Any]:
+    env = {**os.environ, **CHILD_ENV}
+    spawned = time.time()
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["spawn_to_ready_ms"] = round((result.pop("ready_at") - spawned) * 1000, 2)
+    return result
+
+
+def import_offenders(top: int) -> List[Dict[str, Any]]:
+    """Third-party packages by cumulative import time under `import app.main` (-X importtime)."""
+    env = {**os.environ, **CHILD_ENV}
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    packages: Dict[str, int] = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if not cumulative.isdigit():
+            continue
+        root = name.split(".")[0]
+        if root == "app":
+            continue
+        packages[root] = max(packages.get(root, 0), int(cumulative))
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": name, "cumulative_ms": round(us / 1000, 1)} for name, us in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000, help="median spawn-to-ready budget")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imported packages")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    runs = [run_once() for _ in range(args.runs)]
+    for result in runs:
+        print(json.dumps(result))
+    summary = {
+        key: round(statistics.median(r[key] for r in runs), 2)
+        for key in ("import_ms", "lifespan_ms", "spawn_to_ready_ms")
+    }
+    ok = all(r["status"] == 200 for r in runs) and summary["spawn_to_ready_ms"] <= args.budget_ms
+    print(json.dumps({"median": summary, "budget_ms": args.budget_ms, "within_budget": ok}))
+    if args.importtime:
+        for row in import_offenders(args.importtime):
+            print(json.dumps(row))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Deterministic offline stand-ins for the app's upstreams, shared by the load test.
+
+FakeGeminiModel replaces the genai models the app builds: it recognises which prompt it was given
+(intent, batched intent, action plan, SQL, knowledge) and answers with canned output in
+the shape the app expects, after a configurable latency. FakeSupabase replaces the
+supabase client with an in-memory table/rpc query builder over synthetic rows.
+seed_postgres fills a scratch schema of a local Postgres for the asyncpg paths.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.prompts import ACTION_PLAN_HEAD, INTENT_BATCH_PROMPT, INTENT_PROMPT, KNOWLEDGE_INSTRUCTIONS, SQL_INSTRUCTIONS
+from app.services.query_router import DEFAULT_DISTRICTS, DEFAULT_SECTORS, DEFAULT_STAGES
+
+QUERY_TYPES = {"fund": "funding", "invest": "funding", "mentor": "mentorship", "export": "export", "partner": "corporate partnership"}
+ANSWER = (
+    "To apply, register on the StartupTN portal, complete the application wizard section by section, "
+    "upload the incorporation certificate and pitch deck, and submit before the call closes. "
+    "The incubator assigned to your district will review the application within four weeks."
+)
+
+
+def _find(text: str, values: Iterable[str]) -> Optional[str]:
+    lowered = text.lower()
+    return next((value for value in values if re.search(rf"\b{re.escape(value.lower())}\b", lowered)), None)
+
+
+def _prompt_text(contents: Any) -> str:
+    if isinstance(contents, str):
+        return contents
+    return "\n".join(part["text"] for message in contents for part in message["parts"])
+
+
+# -------------------------------
+# Gemini
+# -------------------------------
+class _Part:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Content:
+    def __init__(self, text: str):
+        self.parts = [_Part(text)]
+
+
+class _Candidate:
+    def __init__(self, text: str):
+        self.content = _Content(text)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = [_Candidate(text)]
+
+
+class FakeStream:
+    def __init__(self, chunks: List[str], delay: float):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield FakeResponse(chunk)
+
+
+class FakeGeminiModel:
+    """
+    Answers after latency seconds (+/- jitter, fixed per prompt so runs are repeatable).
+    Streams split the answer into stream_chunks pieces spread over the same latency.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.2, stream_chunks: int = 8):
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_chunks = stream_chunks
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _delay(self, prompt: str) -> float:
+        rng = random.Random(zlib.crc32(prompt.encode()))
+        return max(0.0, self.latency * (1 + self.jitter * (2 * rng.random() - 1)))
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False, **kwargs):
+        prompt = _prompt_text(contents)
+        self.calls += 1
+        if stream:
+            words = ANSWER.split(" ")
+            size = -(-len(words) // self.stream_chunks)
+            chunks = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+            return FakeStream(chunks, self._delay(prompt) / len(chunks))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delay(prompt))
+            return FakeResponse(self.answer(prompt))
+        finally:
+            self.in_flight -= 1
+
+    async def count_tokens_async(self, contents, **kwargs):
+        return {"total_tokens": len(_prompt_text(contents)) // 4}
+
+    def answer(self, prompt: str) -> str:
+        if prompt.startswith(INTENT_BATCH_PROMPT):
+            queries = [json.loads(line.split(". ", 1)[1]) for line in prompt[len(INTENT_BATCH_PROMPT):].splitlines()]
+            return json.dumps({"results": [{"index": i, **self.intent(q)} for i, q in enumerate(queries, 1)]})
+        if prompt.startswith(INTENT_PROMPT):
+            return json.dumps(self.intent(prompt[len(INTENT_PROMPT):]))
+        if prompt.startswith(ACTION_PLAN_HEAD):
+            return json.dumps(self.action_plan(prompt))
+        if SQL_INSTRUCTIONS in prompt:
+            return "```sql\n" + self.sql(prompt.rsplit("USER_QUESTION:", 1)[-1]) + "\n```"
+        if KNOWLEDGE_INSTRUCTIONS in prompt:
+            return ANSWER
+        return "{}"
+
+    @staticmethod
+    def intent(query: str) -> Dict[str, Any]:
+        lowered = query.lower()
+        query_type = next((qt for word, qt in QUERY_TYPES.items() if word in lowered), "compliance")
+        keywords = [w for w in re.findall(r"[a-z]{4,}", lowered) if w not in ("with", "from", "startups")][:4]
+        return {
+            "query_type": query_type,
+            "sector": _find(query, DEFAULT_SECTORS),
+            "stage": _find(query, DEFAULT_STAGES),
+            "geography": _find(query, DEFAULT_DISTRICTS),
+            "keywords": keywords,
+        }
+
+    @staticmethod
+    def action_plan(prompt: str) -> Dict[str, Any]:
+        names = re.findall(r'"(?:service_name|investor_name|startup_name)":"([^"]+)"', prompt)[:3]
+        return {
+            "action_plan": [
+                {"entity_name": name, "entity_type": "service", "reason_relevant": "Matches the sector and location asked about.",
+                 "next_steps": ["Review the offering", "Contact the provider", "Prepare the documents they ask for"]}
+                for name in names
+            ],
+            "message": None if names else "No relevant results found for your query.",
+        }
+
+    @staticmethod
+    def sql(question: str) -> str:
+        clauses = []
+        sector, district = _find(question, DEFAULT_SECTORS), _find(question, DEFAULT_DISTRICTS)
+        if sector:
+            clauses.append(f"sector ILIKE '%{sector}%'")
+        if district:
+            clauses.append(f"district = '{district}'")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return f"SELECT startup_name, sector, stage, district FROM startups{where} ORDER BY startup_name LIMIT 20;"
+
+
+def install_fake_gemini(model: FakeGeminiModel) -> None:
+    """Route every Gemini model the client factory hands out to model."""
+    from app.core.clients import clients
+
+    clients.gemini_model = lambda name: model
+
+
+# -------------------------------
+# Supabase
+# -------------------------------
+class _Result:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, rows: List[Dict[str, Any]], latency: float, score: Optional[Dict[str, Any]] = None):
+        self.rows = rows
+        self.latency = latency
+        self.score = score
+        self.columns: Optional[List[str]] = None
+        self.filters: List[Any] = []
+        self.max_rows: Optional[int] = None
+
+    def select(self, columns: str):
+        # Embedded resources such as financials!inner(...) come back whole
+        self.columns = [c.strip().split("!")[0] for c in re.sub(r"\([^)]*\)", "", columns).split(",") if c.strip()]
+        return self
+
+    def ilike(self, column: str, pattern: str):
+        needle = pattern.strip("%").lower()
+        self.filters.append(lambda row: needle in str(row.get(column, "")).lower())
+        return self
+
+    def gte(self, column: str, value: Any):
+        table, _, field = column.rpartition(".")
+        self.filters.append(lambda row: ((row.get(table) or {}) if table else row).get(field, 0) >= value)
+        return self
+
+    def limit(self, n: int):
+        self.max_rows = n
+        return self
+
+    def execute(self) -> _Result:
+        # The real client is synchronous and the app calls it in a worker thread
+        time.sleep(self.latency)
+        rows = [row for row in self.rows if all(f(row) for f in self.filters)]
+        if self.score:
+            keywords = self.score["keywords"]
+            scored = [(sum(k in row["_text"] for k in keywords), row) for row in rows]
+            rows = [row for score, row in sorted(scored, key=lambda item: -item[0]) if score][:self.score["max_results"]]
+        rows = rows[:self.max_rows] if self.max_rows else rows
+        return _Result([{k: v for k, v in row.items() if self.columns is None or k in self.columns} for row in rows])
+
+
+class _Session:
+    def close(self):
+        pass
+
+
+class _Postgrest:
+    session = _Session()
+
+
+class FakeSupabase:
+    def __init__(self, rows: int = 2000, latency: float = 0.01, seed: int = 42):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.postgrest = _Postgrest()
+        categories = ["Compliance", "Legal", "Marketing", "Cloud", "Accounting", "Funding", "Export"]
+        words = ["gst", "filing", "trademark", "patent", "seo", "branding", "payroll", "audit", "hosting", "pitch", "export"]
+        self.tables: Dict[str, List[Dict[str, Any]]] = {
+            "services_marketplace": [],
+            "investors": [],
+            "startups": [],
+        }
+        for i in range(rows):
+            category = rng.choice(categories)
+            description = f"{category} help for startups in {rng.choice(DEFAULT_DISTRICTS)}: {' '.join(rng.sample(words, 4))}."
+            self.tables["services_marketplace"].append({
+                "service_id": i, "service_name": f"{category} Service {i}", "description": description,
+                "access_link": f"https://example.org/services/{i}", "category": category, "updated_at": "2025-01-01",
+                "_text": f"{category} {description}".lower(),
+            })
+            self.tables["startups"].append({
+                "startup_name": f"Startup {i}", "website_url": f"https://startup{i}.example.org",
+                "short_description": description, "sector": rng.choice(DEFAULT_SECTORS), "stage": rng.choice(DEFAULT_STAGES),
+                "district": rng.choice(DEFAULT_DISTRICTS), "financials": {"revenue_last_fy": rng.randrange(0, 50_000_000)},
+            })
+            if i % 10 == 0:
+                self.tables["investors"].append({
+                    "investor_name": f"Investor {i}", "email": f"fund{i}@example.org", "linkedin_profile_url": None,
+                    "investment_focus_sectors": rng.sample(DEFAULT_SECTORS, 3), "investment_focus_stages": rng.sample(DEFAULT_STAGES, 2),
+                    "geographical_focus": rng.choice(DEFAULT_DISTRICTS), "average_ticket_size": rng.randrange(10, 500) * 100_000,
+                })
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.tables[name], self.latency)
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> FakeQuery:
+        if name != "search_services_ranked":
+            raise ValueError(f"FakeSupabase has no rpc {name}")
+        return FakeQuery(self.tables["services_marketplace"], self.latency, score=params)
+
+
+# -------------------------------
+# Postgres
+# -------------------------------
+async def seed_postgres(dsn: str, schema: str, rows: int, seed: int = 42) -> str:
+    """
+    (Re)create schema with synthetic startups/financials/investors, empty mentors/services_marketplace
+    and empty search/action log tables; returns a DSN whose search_path points at it.
+    """
+    import asyncpg
+
+    rng = random.Random(seed)
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+        await conn.execute(f"""
+            CREATE TABLE {schema}.startups (
+                startup_id int PRIMARY KEY, startup_name text, sector text, stage text, district text,
+                website_url text, short_description text);
+            CREATE TABLE {schema}.investors (
+                investor_id int PRIMARY KEY, investor_name text, investor_type text, email text, website_url text,
+                investment_focus_sectors jsonb, investment_focus_stages jsonb, geographical_focus text,
+                linkedin_profile_url text, average_ticket_size numeric, is_actively_investing boolean, bio text);
+            CREATE TABLE {schema}.financials (
+                financial_id serial PRIMARY KEY, startup_id int, total_funding_raised numeric, revenue_last_fy numeric,
+                updated_at timestamptz DEFAULT now(), deleted_at timestamptz);
+            CREATE TABLE {schema}.mentors (
+                mentor_id int PRIMARY KEY, mentor_name text, areas_of_expertise jsonb,
+                industry_specialization jsonb, email text, linkedin_profile_url text, bio text, current_position text,
+                deleted_at timestamptz);
+            CREATE TABLE {schema}.services_marketplace (
+                service_id int PRIMARY KEY, service_name text, service_provider text, category text, description text,
+                access_link text, created_at timestamptz DEFAULT now(), updated_at timestamptz DEFAULT now());
+            CREATE TABLE {schema}.search_logs (
+                log_id bigserial PRIMARY KEY, user_id uuid, query text, intent text, parsed_filters jsonb,
+                results_count int, created_at timestamptz DEFAULT now());
+            CREATE TABLE {schema}.action_logs (
+                action_id bigserial PRIMARY KEY, user_id uuid, action_type text, entity_table text, entity_id uuid,
+                metadata jsonb, created_at timestamptz DEFAULT now());
+        """)
+        await conn.copy_records_to_table("startups", schema_name=schema, records=[
+            (i, f"Startup {i}", rng.choice(DEFAULT_SECTORS), rng.choice(DEFAULT_STAGES), rng.choice(DEFAULT_DISTRICTS),
+             f"https://startup{i}.example.org", f"Synthetic startup {i}")
+            for i in range(rows)
+        ])
+        await conn.copy_records_to_table("investors", schema_name=schema, records=[
+            (i, f"Investor {i}", "Angel", f"fund{i}@example.org", None, json.dumps(rng.sample(DEFAULT_SECTORS, 3)),
+             json.dumps(rng.sample(DEFAULT_STAGES, 2)), rng.choice(DEFAULT_DISTRICTS), None,
+             round(10 ** rng.uniform(5, 8)), rng.random() > 0.1, f"Angel investor {i}, backs early teams")
+            for i in range(rows // 10)
+        ])
+        await conn.copy_records_to_table(
+            "financials", schema_name=schema, columns=("startup_id", "total_funding_raised", "revenue_last_fy"),
+            records=[(i, round(10 ** rng.uniform(4, 8)), round(10 ** rng.uniform(4, 7))) for i in range(0, rows, 2)],
+        )
+        await conn.execute(f"ANALYZE {schema}.startups; ANALYZE {schema}.investors; ANALYZE {schema}.financials")
+    finally:
+        await conn.close()
+    separator = "&" if "?" in dsn else "?"
+    return f"{dsn}{separator}search_path={schema}"
+
+
+async def drop_schema(dsn: str, schema: str) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    finally:
+        await conn.close()
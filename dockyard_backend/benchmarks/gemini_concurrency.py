@@ -0,0 +1,58 @@
+"""
+Load benchmark for GeminiService against a fake model.
+
+Fires N concurrent extract_intent calls at a model that sleeps for a fixed latency
+and reports wall time, throughput and peak in-flight calls. With the async service
+N prompts finish in roughly one model latency instead of N of them.
+
+    python -m benchmarks.gemini_concurrency --requests 500 --latency 1.0
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks import _env  # noqa: F401
+from benchmarks.fakes import FakeGeminiModel
+from app.core.concurrency import gemini_limiter
+from app.services.gemini_service import GeminiService
+
+async def run(requests: int, latency: float) -> dict:
+    service = GeminiService()
+    # Fixed latency (no jitter) and real response objects (candidates/content/parts)
+    service.model = FakeGeminiModel(latency, jitter=0)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(service.extract_intent(f"AgriTech funding in Coimbatore #{i}") for i in range(requests)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    errors = [o for o in outcomes if isinstance(o, Exception)]
+    failed = len(errors)
+    return {
+        "requests": requests,
+        "model_latency_s": latency,
+        "wall_time_s": round(elapsed, 3),
+        "throughput_rps": round((requests - failed) / elapsed, 1),
+        "peak_in_flight": service.model.peak_in_flight,
+        "failed": failed,
+        "limiter": gemini_limiter.stats(),
+        "first_error": repr(errors[0]) if errors else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.requests, args.latency))
+    print(json.dumps(result, indent=2))
+    if result["failed"]:
+        # A run with failed calls measures nothing; don't let it pass for a latency result
+        sys.exit(f"{result['failed']} of {result['requests']} calls failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+/startuptn lookups: indexed KB snapshot versus the linear list scan it replaced.
+
+Scales the ecosystem section with synthetic incubators, events and resources (reusing
+benchmarks.kb_retrieval.scaled_kb) and times single-filter, multi-filter and date-range
+lookups, plus the one-off snapshot build.
+
+    python -m benchmarks.kb_lookup --entities 100000
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks import _env  # noqa: F401
+from benchmarks.kb_retrieval import scaled_kb
+from app.core.startup_tn_kb_utils import StartupTNKnowledgeBase
+
+
+def linear_filter(kb, entity_type, filter_key, filter_value):
+    # What get_ecosystem used to do on every request
+    return [e for e in kb["ecosystem"].get(entity_type, []) if filter_value in e.get(filter_key, []) or filter_value == e.get(filter_key)]
+
+
+def linear_multi(kb, entity_type, filters, date_from, date_to):
+    out = []
+    for e in kb["ecosystem"].get(entity_type, []):
+        if all(v in e.get(k, []) or v == e.get(k) for k, v in filters.items()) and date_from <= e.get("date", "") <= date_to:
+            out.append(e)
+    return out
+
+
+def timed(fn, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 4), len(result)
+
+
+def run(entities: int, repeat: int) -> dict:
+    kb = scaled_kb(entities)
+    start = time.perf_counter()
+    engine = StartupTNKnowledgeBase(kb)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    cases = {
+        "sector": (
+            lambda: linear_filter(kb, "incubators", "focus_sector", "AgriTech"),
+            lambda: engine.get_ecosystem("incubators", "focus_sector", "agritech"),
+        ),
+        "venue": (
+            lambda: linear_filter(kb, "events", "venue", "Madurai"),
+            lambda: engine.get_ecosystem("events", "venue", "madurai"),
+        ),
+        "venue+organizer+date_range": (
+            lambda: linear_multi(kb, "events", {"venue": "Chennai", "organizer": "StartupTN"}, "2025-03-01", "2025-05-31"),
+            lambda: engine.find("events", {"venue": "chennai", "organizer": "startuptn"}, "2025-03-01", "2025-05-31"),
+        ),
+        "miss": (
+            lambda: linear_filter(kb, "incubators", "focus_sector", "NoSuchSector"),
+            lambda: engine.get_ecosystem("incubators", "focus_sector", "NoSuchSector"),
+        ),
+    }
+    results = {}
+    for name, (linear, indexed) in cases.items():
+        linear_ms, linear_rows = timed(linear, repeat)
+        indexed_ms, indexed_rows = timed(indexed, repeat)
+        results[name] = {
+            "linear_ms": linear_ms, "indexed_ms": indexed_ms,
+            "linear_rows": linear_rows, "indexed_rows": indexed_rows,
+        }
+    return {"entities": entities, "snapshot_build_ms": round(build_ms, 1), "lookups": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for entities in args.entities:
+        print(json.dumps(run(entities, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
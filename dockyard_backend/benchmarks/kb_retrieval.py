@@ -0,0 +1,85 @@
+"""
+Knowledge-mode prompt size and retrieval latency versus knowledge base size.
+
+Scales the ecosystem section of the bundled KB with synthetic incubators, events and
+resources, then compares the full KB dump the prompt used to carry with the pruned
+top-k context from KnowledgeRetriever. Tokens are estimated at 4 characters each.
+
+    python -m benchmarks.kb_retrieval --sizes 10 100 1000 10000
+"""
+import argparse
+import copy
+import json
+import statistics
+import time
+
+from benchmarks import _env  # noqa: F401
+from app.core.kb_retriever import KnowledgeRetriever
+from app.core.startup_tn_knowledge_base import startup_tn_knowledge_base
+
+SECTORS = ["AgriTech", "FinTech", "MedTech", "EdTech", "CleanTech", "DeepTech", "AI", "IoT", "SpaceTech", "Logistics"]
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Trichy", "Salem", "Tirunelveli", "Erode", "Vellore"]
+QUESTIONS = [
+    "How do I register for TNSSGF?",
+    "Which incubators support AgriTech in Coimbatore?",
+    "Upcoming startup events in Madurai",
+    "What documents do I upload for funding utilisation?",
+    "Seed fund schemes for early-stage MedTech startups",
+]
+
+
+def scaled_kb(entities: int) -> dict:
+    kb = copy.deepcopy(startup_tn_knowledge_base)
+    eco = kb["ecosystem"]
+    for i in range(entities):
+        sector, city = SECTORS[i % len(SECTORS)], CITIES[i % len(CITIES)]
+        kind = i % 3
+        if kind == 0:
+            eco["incubators"].append({
+                "name": f"{city} Incubator {i}",
+                "focus_sector": [sector, SECTORS[(i + 3) % len(SECTORS)]],
+                "facilities": ["Co-working", "Mentorship"],
+                "contact": {"phone": f"044-{i:07d}", "email": f"hello{i}@incubator.in"},
+            })
+        elif kind == 1:
+            eco["events"].append({"name": f"{sector} Meetup {i}", "venue": city, "date": f"2025-{i % 12 + 1:02d}-15", "organizer": "StartupTN"})
+        else:
+            eco["resources"].append({"scheme": f"SCHEME{i}", "description": f"Support scheme {i} for {sector} startups in {city}."})
+    return kb
+
+
+def run(sizes) -> list:
+    rows = []
+    for size in sizes:
+        kb = scaled_kb(size)
+        full_chars = len(json.dumps(kb, indent=2))
+        start = time.perf_counter()
+        retriever = KnowledgeRetriever(kb)
+        build_ms = (time.perf_counter() - start) * 1000
+        pruned_chars, latencies = [], []
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            context = retriever.prune(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+            pruned_chars.append(len(json.dumps(context, indent=2)))
+        rows.append({
+            "kb_entities": size,
+            "full_prompt_tokens": full_chars // 4,
+            "pruned_prompt_tokens_avg": int(statistics.mean(pruned_chars)) // 4,
+            "index_build_ms": round(build_ms, 1),
+            "retrieve_ms_p50": round(statistics.median(latencies), 3),
+            "retrieve_ms_max": round(max(latencies), 3),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    args = parser.parse_args()
+    for row in run(args.sizes):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Offline load test of the FastAPI app: /ask, /ask/stream, /api/prompt and /startuptn/*.
+
+Runs the real app in-process (httpx ASGITransport, lifespan included) against the
+stand-ins in benchmarks/fakes.py: a fake Gemini with configurable latency and a fake
+Supabase client. /ask database and fast-path scenarios also need a local Postgres
+(--dsn); the script fills a scratch schema there and drops it afterwards, and skips
+those scenarios without one. Nothing goes over the network.
+
+For each scenario it reports p50/p95/p99 latency, throughput, errors, RSS growth and
+event-loop lag, and writes the run to .benchmarks/<timestamp>.json. --compare prints
+the change against an earlier run ("latest" for the previous one).
+
+    python -m benchmarks.load_test --requests 300 --concurrency 32 --latency 0.2
+    python -m benchmarks.load_test --dsn postgresql://postgres@localhost/bench --compare latest
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+import os
+import pathlib
+import platform
+import resource
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks import _env  # noqa: F401
+from benchmarks.fakes import FakeGeminiModel, FakeSupabase, drop_schema, install_fake_gemini, seed_postgres
+
+RESULTS_DIR = pathlib.Path(__file__).resolve().parent.parent / ".benchmarks"
+SCRATCH_SCHEMA = "bench_load_test"
+
+SECTORS = ["FinTech", "AgriTech", "HealthTech", "EdTech", "CleanTech", "SaaS", "AI", "IoT"]
+DISTRICTS = ["Chennai", "Coimbatore", "Madurai", "Salem", "Erode", "Vellore", "Hosur", "Trichy"]
+# Sectors some incubator in the bundled knowledge base focuses on
+INCUBATOR_SECTORS = ["DeepTech", "CleanTech", "MedTech", "AgriTech", "AI", "IoT"]
+
+
+def _pick(values: List[str], i: int) -> str:
+    return values[i % len(values)]
+
+
+# name -> (method, path builder, json body builder, needs Postgres). Question i is built from
+# i % --distinct, so later passes over the same questions exercise the response cache.
+Scenario = Tuple[str, Callable[[int], str], Optional[Callable[[int], Dict[str, Any]]], bool]
+SCENARIOS: Dict[str, Scenario] = {
+    "ask_knowledge": ("POST", lambda i: "/ask", lambda i: {
+        "query": f"How do I apply for the seed grant as a {_pick(SECTORS, i)} founder from {_pick(DISTRICTS, i // 8)}?"}, False),
+    "ask_stream_knowledge": ("POST", lambda i: "/ask/stream", lambda i: {
+        "query": f"What documents do I upload for the TNSSGF application, {_pick(SECTORS, i)} team #{i}?"}, False),
+    "ask_database": ("POST", lambda i: "/ask", lambda i: {
+        "query": f"Show {_pick(SECTORS, i)} startups in {_pick(DISTRICTS, i // 8)} ordered by name"}, True),
+    "ask_fast_path": ("POST", lambda i: "/ask", lambda i: {
+        "query": f"list {_pick(SECTORS, i)} startups in {_pick(DISTRICTS, i // 8)}"}, True),
+    "api_prompt": ("POST", lambda i: "/api/prompt", lambda i: {
+        "prompt": f"GST filing and trademark help for a {_pick(SECTORS, i)} startup in {_pick(DISTRICTS, i // 8)}"}, False),
+    "api_prompt_funding": ("POST", lambda i: "/api/prompt", lambda i: {
+        "prompt": f"Funding for {_pick(SECTORS, i)} startups in {_pick(DISTRICTS, i // 8)}"}, False),
+    "api_prompt_stream": ("POST", lambda i: "/api/prompt/stream", lambda i: {
+        "prompt": f"Export and patent support for {_pick(SECTORS, i)} in {_pick(DISTRICTS, i // 8)}"}, False),
+    "startuptn_sections": ("GET", lambda i: "/startuptn/program/TNSSGF/sections", None, False),
+    "startuptn_ecosystem": ("GET", lambda i: f"/startuptn/ecosystem/incubators?filter_key=focus_sector&filter_value={_pick(INCUBATOR_SECTORS, i)}", None, False),
+}
+
+
+# -------------------------------
+# Measurements
+# -------------------------------
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class LoopLagMonitor:
+    """Samples how late a sleep(interval) wakes up: time the event loop spent unable to run callbacks."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval) * 1000)
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "loop_lag_p50_ms": round(percentile(self.samples, 50), 2),
+            "loop_lag_p99_ms": round(percentile(self.samples, 99), 2),
+            "loop_lag_max_ms": round(max(self.samples, default=0.0), 2),
+        }
+
+
+def _failed(response) -> bool:
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        return "event: error" in response.text
+    body = response.json()
+    return isinstance(body, dict) and bool(body.get("error"))
+
+
+async def run_scenario(client, name: str, requests: int, concurrency: int, distinct: int) -> Dict[str, Any]:
+    method, path, body, _ = SCENARIOS[name]
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            n = i % distinct
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path(n), json=body(n) if body else None)
+                failed = _failed(response)
+            except Exception as e:
+                logging.warning(f"{name}: request failed: {e!r}")
+                failed = True
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += failed
+
+    rss_before = rss_mb()
+    with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "rss_mb": round(rss_mb(), 1),
+        "rss_growth_mb": round(rss_mb() - rss_before, 1),
+        **lag.summary(),
+    }
+
+
+# -------------------------------
+# App under test
+# -------------------------------
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    from app.core.cache import response_cache
+    from app.core.config import settings
+
+    gemini = FakeGeminiModel(args.latency, args.jitter)
+    install_fake_gemini(gemini)
+    supabase = FakeSupabase(rows=args.rows, latency=args.supabase_latency)
+
+    from app import main
+    from app.core.clients import clients
+
+    clients.supabase = lambda: supabase
+    settings.CACHE_ENABLED = not args.no_cache
+    settings.CONTENT_RELOAD_INTERVAL = 0
+
+    scenarios = [s for s in args.scenarios.split(",") if s] if args.scenarios else list(SCENARIOS)
+    dsn = None
+    if args.dsn:
+        dsn = await seed_postgres(args.dsn, SCRATCH_SCHEMA, args.rows)
+        settings.SUPABASE_DB_URL = dsn
+    else:
+        # No connection attempts at startup: nothing in the remaining scenarios uses Postgres
+        settings.WARMUP_ENABLED = False
+        settings.DB_POOL_MIN_SIZE = 0
+        settings.EVENT_LOG_ENABLED = False
+        settings.MATCHMAKING_ENABLED = False
+        settings.SEMANTIC_INDEX_ENABLED = False
+        skipped = [s for s in scenarios if SCENARIOS[s][3]]
+        if skipped:
+            print(f"No --dsn given, skipping {', '.join(skipped)}")
+        scenarios = [s for s in scenarios if not SCENARIOS[s][3]]
+
+    rows = []
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            # Measure a warm app: wait for the background pool creation and warm-up
+            await main.app.state.container.warmup_task
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                for name in scenarios:
+                    calls_before = gemini.calls
+                    await response_cache.invalidate()
+                    row = await run_scenario(client, name, args.requests, args.concurrency, args.distinct)
+                    row["gemini_calls"] = gemini.calls - calls_before
+                    rows.append(row)
+                    print(json.dumps(row))
+    finally:
+        if args.dsn:
+            with contextlib.suppress(Exception):
+                await drop_schema(args.dsn, SCRATCH_SCHEMA)
+    return {
+        "label": args.label,
+        "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "distinct": args.distinct,
+            "gemini_latency_s": args.latency, "jitter": args.jitter, "supabase_latency_s": args.supabase_latency,
+            "rows": args.rows, "cache": not args.no_cache, "postgres": bool(dsn),
+        },
+        "scenarios": rows,
+    }
+
+
+# -------------------------------
+# Results
+# -------------------------------
+def save(result: Dict[str, Any]) -> pathlib.Path:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = RESULTS_DIR / (f"{stamp}-{result['label']}.json" if result["label"] else f"{stamp}.json")
+    path.write_text(json.dumps(result, indent=2))
+    return path
+
+
+def load_previous(compare: str, exclude: pathlib.Path) -> Optional[Dict[str, Any]]:
+    if compare != "latest":
+        return json.loads(pathlib.Path(compare).read_text())
+    runs = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return json.loads(runs[-1].read_text()) if runs else None
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    before = {row["scenario"]: row for row in previous["scenarios"]}
+    print(f"\nChange against run of {previous['started_at']} {previous.get('label') or ''}")
+    print(f"{'scenario':<24}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}")
+    for row in current["scenarios"]:
+        old = before.get(row["scenario"])
+        if old is None:
+            continue
+        cells = [
+            f"{(row[key] - old[key]) / old[key] * 100:+.1f}%" if old[key] else "n/a"
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        ]
+        print(f"{row['scenario']:<24}" + "".join(f"{cell:>10}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--distinct", type=int, default=50, help="distinct questions per scenario")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake Gemini latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="fake Gemini latency spread, as a fraction")
+    parser.add_argument("--supabase-latency", type=float, default=0.01)
+    parser.add_argument("--rows", type=int, default=2000, help="synthetic rows per table")
+    parser.add_argument("--dsn", help="local Postgres for /ask database and fast-path scenarios")
+    parser.add_argument("--scenarios", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--no-cache", action="store_true", help="run with the response cache off")
+    parser.add_argument("--label", default="", help="suffix for the results file name")
+    parser.add_argument("--compare", help='results file to compare with, or "latest"')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(run(args))
+    path = save(result)
+    print(f"Saved {path}")
+    if args.compare:
+        previous = load_previous(args.compare, path)
+        if previous:
+            compare(previous, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Matchmaking index build, lookup and incremental re-sync times on synthetic data.
+
+Generates investor and startup rows in the shape app/services/matchmaking.py reads
+from Postgres (default 100k startups x 10k investors over the seed sectors, stages and
+a 38-district list), then reports: the full build (parse, features, top-k investors of
+every startup profile), lookups in both directions and by described startup, and a
+re-sync after a small share of rows changed. No database is needed.
+
+    python -m benchmarks.matchmaking
+    python -m benchmarks.matchmaking --startups 20000 --investors 2000 --top-k 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks import _env  # noqa: F401
+from app.services.matchmaking import MatchIndex
+from app.services.query_router import DEFAULT_DISTRICTS, DEFAULT_SECTORS, DEFAULT_STAGES
+
+DISTRICTS = DEFAULT_DISTRICTS + [
+    "Ariyalur", "Chengalpattu", "Cuddalore", "Dharmapuri", "Dindigul", "Kallakurichi", "Kanyakumari",
+    "Karur", "Krishnagiri", "Mayiladuthurai", "Nagapattinam", "Namakkal", "Nilgiris", "Perambalur",
+    "Pudukkottai", "Ramanathapuram", "Ranipet", "Sivaganga", "Tenkasi", "Theni", "Tirupathur",
+    "Tiruvallur", "Tiruvannamalai", "Tiruvarur",
+]
+
+
+def investor_rows(n: int, rng: random.Random):
+    for i in range(n):
+        yield {
+            "investor_id": i,
+            "investor_name": f"Investor {i}",
+            "email": f"fund{i}@example.org",
+            "linkedin_profile_url": None,
+            "investment_focus_sectors": json.dumps(rng.sample(DEFAULT_SECTORS, rng.randint(1, 4))),
+            "investment_focus_stages": json.dumps(rng.sample(DEFAULT_STAGES, rng.randint(1, 3))),
+            "geographical_focus": rng.choice(["Tamil Nadu", "India"] + DISTRICTS),
+            "average_ticket_size": round(10 ** rng.uniform(5, 8.5)),
+            "is_actively_investing": rng.random() > 0.1,
+        }
+
+
+def startup_rows(n: int, rng: random.Random):
+    for i in range(n):
+        yield {
+            "startup_id": i,
+            "startup_name": f"Startup {i}",
+            "sector": rng.choice(DEFAULT_SECTORS),
+            "stage": rng.choice(DEFAULT_STAGES),
+            "district": rng.choice(DISTRICTS),
+            "total_funding_raised": round(10 ** rng.uniform(4, 8.5)) if rng.random() > 0.3 else None,
+            "revenue_last_fy": round(10 ** rng.uniform(4, 8)) if rng.random() > 0.5 else None,
+        }
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--startups", type=int, default=100_000)
+    parser.add_argument("--investors", type=int, default=10_000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--changed", type=float, default=0.01, help="share of rows changed before the re-sync")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    investors = list(investor_rows(args.investors, rng))
+    startups = list(startup_rows(args.startups, rng))
+
+    index = MatchIndex(args.top_k)
+    start = time.perf_counter()
+    index.sync(investors, startups)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index._score_profiles(np.arange(len(index.profile_index)))
+    score_ms = (time.perf_counter() - start) * 1000
+
+    startup_ids = rng.sample(list(index.startup_slot), 200)
+    investor_ids = rng.sample(list(index.investor_slot), 200)
+    it = iter(range(10**9))
+    by_startup = timed(lambda: index.investors_for_startup(startup_ids[next(it) % 200], 10), 200)
+    by_investor = timed(lambda: index.startups_for_investor(investor_ids[next(it) % 200], 10), 200)
+    described = timed(lambda: index.investors_for("FinTech", "Seed", "Coimbatore", 25), 200)
+
+    # A re-sync where a small share of rows changed: new focus sectors, new districts, new rows
+    changed_investors = [dict(row) for row in investors]
+    for row in rng.sample(changed_investors, int(len(investors) * args.changed)):
+        row["investment_focus_sectors"] = json.dumps(rng.sample(DEFAULT_SECTORS, 2))
+    changed_startups = [dict(row) for row in startups]
+    for row in rng.sample(changed_startups, int(len(startups) * args.changed)):
+        row["district"] = rng.choice(DISTRICTS)
+    changed_startups += list(startup_rows(int(len(startups) * args.changed), random.Random(8)))
+    for offset, row in enumerate(changed_startups[len(startups):]):
+        row["startup_id"] = len(startups) + offset
+    start = time.perf_counter()
+    resynced = index.copy()
+    counts = resynced.sync(changed_investors, changed_startups)
+    resync_ms = (time.perf_counter() - start) * 1000
+
+    # The incremental result must equal a from-scratch build on the same rows
+    fresh = MatchIndex(args.top_k)
+    fresh.sync(changed_investors, changed_startups)
+    mismatches = sum(
+        [r["investor_id"] for r in resynced.investors_for_startup(key, 10)]
+        != [r["investor_id"] for r in fresh.investors_for_startup(key, 10)]
+        for key in rng.sample(list(fresh.startup_slot), 500)
+    )
+    # Different investors can tie on score, so compare score lists too
+    score_mismatches = sum(
+        [r["match_score"] for r in resynced.investors_for_startup(key, 10)]
+        != [r["match_score"] for r in fresh.investors_for_startup(key, 10)]
+        for key in rng.sample(list(fresh.startup_slot), 500)
+    )
+
+    print(json.dumps({
+        **index.size(),
+        "pairs": args.startups * args.investors,
+        "build_ms": round(build_ms, 1),
+        "score_all_profiles_ms": round(score_ms, 1),
+        "investors_for_startup_ms_p50": by_startup,
+        "startups_for_investor_ms_p50": by_investor,
+        "investors_for_description_ms_p50": described,
+        "resync_changed": {"investors": counts[0], "startups": counts[1]},
+        "resync_ms": round(resync_ms, 1),
+        "resync_order_differences_of_500": mismatches,
+        "resync_score_differences_of_500": score_mismatches,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
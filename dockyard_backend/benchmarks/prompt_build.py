@@ -0,0 +1,156 @@
+"""
+Prompt assembly CPU time and input size: inline f-string prompts versus app/core/prompts.
+
+The "before" builders reproduce the prompts as they were written inline in ai_db_utils
+and GeminiService (json.dumps(..., indent=2) on every call). Tokens are estimated at 4
+characters each. The context-cache column is what a request sends when the full KB or
+schema prefix is served from Gemini's context cache (GEMINI_CONTEXT_CACHE_ENABLED).
+
+    python -m benchmarks.prompt_build --iterations 2000
+"""
+import argparse
+import json
+import time
+
+from benchmarks import _env  # noqa: F401
+from app.core.content_store import content_store
+from app.core.kb_retriever import knowledge_retriever
+from app.core.prompts import (
+    KNOWLEDGE_INSTRUCTIONS, KNOWLEDGE_TEMPLATE, SQL_INSTRUCTIONS, SQL_TEMPLATE, action_plan_prompt, static_context,
+)
+from app.core.schema_slicer import schema_slicer
+
+QUESTION = "Which incubators in Chennai support AgriTech startups and how do I apply for TANSEED?"
+SQL_QUESTION = "List FinTech startups in Coimbatore with revenue above 1 crore"
+STRUCTURED = {"query_type": "funding", "sector": "FinTech", "stage": "seed", "geography": "Chennai", "keywords": ["seed fund", "grant"]}
+
+
+def search_results(n: int) -> list:
+    return [
+        {
+            "name": f"Service {i}", "type": "service", "description": f"Seed funding support and compliance help for FinTech startups, offer {i}.",
+            "link": f"https://example.org/services/{i}", "sector": "FinTech", "district": "Chennai",
+        }
+        for i in range(n)
+    ]
+
+
+# -------------------------------
+# Before: the inline builders
+# -------------------------------
+def old_knowledge(question, kb):
+    return {"role": "user", "parts": [
+        {"text": KNOWLEDGE_INSTRUCTIONS}, {"text": "CONTEXT_VERSION: 2.5"},
+        {"text": f"KNOWLEDGE_BASE:\n{json.dumps(kb, indent=2)}"}, {"text": "USER_QUESTION:\n" + question},
+    ]}
+
+
+def old_sql(question, schema):
+    schema_text = schema if isinstance(schema, str) else json.dumps(schema, indent=2)
+    return {"role": "user", "parts": [
+        {"text": SQL_INSTRUCTIONS}, {"text": f"SCHEMA_JSON:\n{schema_text}"}, {"text": f"USER_QUESTION:\n{question}"},
+    ]}
+
+
+def old_action_plan(query, structured, results):
+    return f"""You are an AI that generates structured JSON action plans.
+
+### Rules:
+- Respond ONLY with valid JSON.
+- Do not include explanations, Markdown, or text outside the JSON.
+- If no relevant results are found, return:
+  {{
+    "action_plan": [],
+    "message": "No relevant results found for your query."
+  }}
+
+### Input:
+- User Query: {query}
+- Structured Query:
+```json
+{json.dumps(structured, indent=2)}
+```
+- Search Results:
+```json
+{json.dumps(results, indent=2)}
+```
+
+### Output JSON Format:
+{{
+  "action_plan": [
+    {{
+      "entity_name": "string",
+      "entity_type": "string",
+      "reason_relevant": "string",
+      "next_steps": [ "string", "string", "..." ]
+    }}
+  ],
+  "message": "string"  # Optional message, if needed
+}}
+"""
+
+
+# -------------------------------
+# After: templates and pre-serialized context
+# -------------------------------
+def new_message(template, question, context):
+    text, _ = static_context.serialize(context)
+    return template.message(text, question)
+
+
+def size(prompt) -> int:
+    if isinstance(prompt, str):
+        return len(prompt)
+    return sum(len(part["text"]) for part in prompt["parts"])
+
+
+def cpu_us(build, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        build()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def run(iterations: int) -> list:
+    kb, schema = content_store.kb, content_store.schema
+    pruned = knowledge_retriever.prune(QUESTION)
+    sliced = schema_slicer.slice_text(SQL_QUESTION)
+    cases = [
+        ("knowledge_full_kb", lambda: old_knowledge(QUESTION, kb), lambda: new_message(KNOWLEDGE_TEMPLATE, QUESTION, kb),
+         KNOWLEDGE_TEMPLATE.question_message(QUESTION)),
+        ("knowledge_pruned", lambda: old_knowledge(QUESTION, pruned), lambda: new_message(KNOWLEDGE_TEMPLATE, QUESTION, pruned), None),
+        ("database_full_schema", lambda: old_sql(SQL_QUESTION, schema), lambda: new_message(SQL_TEMPLATE, SQL_QUESTION, schema),
+         SQL_TEMPLATE.question_message(SQL_QUESTION)),
+        ("database_sliced", lambda: old_sql(SQL_QUESTION, sliced), lambda: new_message(SQL_TEMPLATE, SQL_QUESTION, sliced), None),
+    ]
+    for n in (5, 25):
+        results = search_results(n)
+        cases.append((
+            f"action_plan_{n}_results",
+            lambda r=results: old_action_plan(QUESTION, STRUCTURED, r),
+            lambda r=results: action_plan_prompt(QUESTION, STRUCTURED, r),
+            None,
+        ))
+    rows = []
+    for name, before, after, cached in cases:
+        rows.append({
+            "case": name,
+            "before_cpu_us": round(cpu_us(before, iterations), 2),
+            "after_cpu_us": round(cpu_us(after, iterations), 2),
+            "before_tokens": size(before()) // 4,
+            "after_tokens": size(after()) // 4,
+            "context_cached_tokens": size(cached) // 4 if cached else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    for row in run(args.iterations):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
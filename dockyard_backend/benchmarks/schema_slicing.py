@@ -0,0 +1,71 @@
+"""
+Schema-slice size and table-selection accuracy on a fixed question set.
+
+For each question the slice must contain every table a correct SQL answer needs.
+Reports recall (questions whose slice covers all needed tables), mean tables per
+slice and prompt tokens (estimated at 4 characters each) against the full
+pretty-printed schema the prompt used to carry.
+
+    python -m benchmarks.schema_slicing
+"""
+import json
+import statistics
+import time
+
+from benchmarks import _env  # noqa: F401
+from app.core.db_schema import db_schema
+from app.core.schema_slicer import schema_slicer
+
+# question -> tables the answer needs
+QUESTIONS = {
+    "List AgriTech startups in Coimbatore": {"startups"},
+    "Startups with revenue above 1 crore": {"startups", "financials"},
+    "Investors focusing on AI": {"investors"},
+    "Mentors with blockchain expertise": {"mentors"},
+    "Show funding raised by healthcare startups": {"startups", "financials"},
+    "Seed fund schemes for women entrepreneurs": {"schemes"},
+    "Team size of startup Zoho": {"startups", "team_info"},
+    "Marketing services available in the marketplace": {"services_marketplace"},
+    "Innovation challenges in the AI sector": {"innovation_challenges"},
+    "Mentor session outcomes for startup 5": {"mentor_sessions", "startup_mentor_matchmaking"},
+    "Growth score of EdTech startups": {"growth_card", "startups"},
+    "Who founded startup Freshworks": {"founders", "startups"},
+    "Deals committed by investors to FinTech startups": {"tanfund_deals", "investors", "startups"},
+    "Incubators offering acceleration programs": {"incubators"},
+    "Corporates interested in energy partnerships": {"corporates"},
+    "Open partnership requests from corporates": {"partnership_requests", "corporates"},
+    "Startups with DPIIT recognition in Chennai": {"startups"},
+    "Which startups are incubated at IIT Madras": {"incubation_details", "startups"},
+    "Submissions for the smart city challenge": {"challenge_submissions", "innovation_challenges"},
+    "Cloud computing service providers": {"service_providers"},
+}
+
+
+def main():
+    full_tokens = len(json.dumps(db_schema, indent=2)) // 4
+    covered, sizes, tokens, latencies, misses = 0, [], [], [], []
+    for question, needed in QUESTIONS.items():
+        start = time.perf_counter()
+        tables = schema_slicer.select(question)
+        text = schema_slicer.slice_text(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(tables))
+        tokens.append(len(text) // 4)
+        if needed <= set(tables):
+            covered += 1
+        else:
+            misses.append({"question": question, "missing": sorted(needed - set(tables)), "slice": tables})
+    print(json.dumps({
+        "questions": len(QUESTIONS),
+        "recall": round(covered / len(QUESTIONS), 3),
+        "schema_tables": len(db_schema["tables"]),
+        "slice_tables_mean": round(statistics.mean(sizes), 2),
+        "full_schema_tokens": full_tokens,
+        "slice_tokens_mean": int(statistics.mean(tokens)),
+        "select_ms_p50": round(statistics.median(latencies), 3),
+        "misses": misses,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Semantic index build, search latency and recall on a synthetic directory.
+
+Generates mentor/investor/startup/service rows whose text is drawn from one domain each
+(health, finance, ...) plus generic filler, then reports:
+- the build rate (embedding plus k-means lists);
+- save and memory-mapped open times;
+- search latency through the inverted file and by a full scan;
+- ANN recall@10 against the full scan;
+- top-10 domain precision of queries holding one domain word among generic ones, next to
+  the share of same-domain rows an ILIKE '%word%' would find;
+- the cost of an incremental upsert of a share of rows.
+No database is needed.
+
+    python -m benchmarks.semantic_index
+    python -m benchmarks.semantic_index --rows 20000 --queries 100
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks import _env  # noqa: F401
+from app.services.semantic_index import CONCEPTS, SemanticIndex
+
+TABLES = ("services_marketplace", "startups", "investors", "mentors")
+FILLER = (
+    "team", "experience", "years", "building", "products", "customers", "india", "tamil", "nadu", "chennai",
+    "helping", "early", "stage", "companies", "scale", "strategy", "operations", "network", "support",
+    "solutions", "leading", "founder", "partner", "advisor", "program", "services", "quality", "trusted",
+)
+
+
+def rows(n: int, rng: random.Random):
+    domains = list(CONCEPTS)
+    for i in range(n):
+        domain = rng.choice(domains)
+        words = rng.sample(CONCEPTS[domain], min(len(CONCEPTS[domain]), rng.randint(2, 4)))
+        words += rng.sample(FILLER, rng.randint(6, 12))
+        rng.shuffle(words)
+        yield TABLES[i % len(TABLES)], str(i), domain, " ".join(words)
+
+
+def timed(fn, samples):
+    times = []
+    for sample in samples:
+        start = time.perf_counter()
+        fn(sample)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return round(statistics.median(times), 3), round(times[int(len(times) * 0.95) - 1], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--changed", type=float, default=0.01, help="share of rows re-upserted")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    corpus = list(rows(args.rows, rng))
+    domain_of = {(table, key): domain for table, key, domain, _ in corpus}
+    texts = {(table, key): text for table, key, _, text in corpus}
+
+    index = SemanticIndex()
+    start = time.perf_counter()
+    for table in TABLES:
+        part = [row for row in corpus if row[0] == table]
+        index.upsert(table, [key for _, key, _, _ in part], [text for *_, text in part],
+                     [{"table": table, "key": key} for _, key, _, _ in part])
+    index.merge()
+    build_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        index.save(path)
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        index = SemanticIndex.load(path)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        # One domain word among generic ones, like "mentor with healthcare experience in chennai"
+        domains = list(CONCEPTS)
+        queries = []
+        for _ in range(args.queries):
+            domain = rng.choice(domains)
+            words = [rng.choice(CONCEPTS[domain])] + rng.sample(FILLER, 2)
+            queries.append((domain, words[0], " ".join(words)))
+
+        ivf_ms = timed(lambda q: index.search(q[2], 10), queries)
+        exact_ms = timed(lambda q: index.search(q[2], 10, exact=True), queries)
+
+        texts_of = {domain: [text for key, text in texts.items() if domain_of[key] == domain] for domain in domains}
+        recall, precision, ilike = [], [], []
+        for domain, word, query in queries:
+            approximate = {(hit["table"], hit["key"]) for hit in index.search(query, 10)}
+            hits = index.search(query, 10, exact=True)
+            recall.append(len(approximate & {(hit["table"], hit["key"]) for hit in hits}) / max(len(hits), 1))
+            precision.append(sum(domain_of[(hit["table"], hit["key"])] == domain for hit in hits) / max(len(hits), 1))
+            ilike.append(sum(word in text for text in texts_of[domain]) / len(texts_of[domain]))
+
+        # Incremental: re-upsert a share of rows with new text
+        changed = rng.sample(corpus, int(len(corpus) * args.changed))
+        start = time.perf_counter()
+        for table in TABLES:
+            part = [row for row in changed if row[0] == table]
+            index.upsert(table, [key for _, key, _, _ in part],
+                         [" ".join(rng.sample(CONCEPTS[rng.choice(domains)], 2)) for _ in part],
+                         [{"table": table, "key": key} for _, key, _, _ in part])
+        upsert_ms = (time.perf_counter() - start) * 1000
+        after_upsert_ms = timed(lambda q: index.search(q[2], 10), queries)
+        start = time.perf_counter()
+        index.merge()
+        merge_ms = (time.perf_counter() - start) * 1000
+
+        print(json.dumps({
+            **index.size(),
+            "build_s": round(build_s, 2),
+            "build_rows_per_s": round(args.rows / build_s),
+            "save_ms": round(save_ms, 1),
+            "open_ms": round(open_ms, 1),
+            "search_ivf_ms_p50_p95": ivf_ms,
+            "search_exact_ms_p50_p95": exact_ms,
+            "ivf_recall_at_10": round(statistics.mean(recall), 3),
+            "domain_precision_at_10": round(statistics.mean(precision), 3),
+            "ilike_domain_recall": round(statistics.mean(ilike), 3),
+            "upsert_changed_rows": len(changed),
+            "upsert_ms": round(upsert_ms, 1),
+            "search_with_pending_ms_p50_p95": after_upsert_ms,
+            "merge_ms": round(merge_ms, 1),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
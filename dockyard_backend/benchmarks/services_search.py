@@ -0,0 +1,117 @@
+"""
+services_marketplace keyword search: chained ILIKE filters versus the ranked RPC.
+
+Builds a synthetic marketplace in a scratch schema of a local Postgres, applies
+migrations/001_services_marketplace_search.sql there, and times both query shapes
+for a set of keyword lists. Needs a throwaway database; nothing outside the scratch
+schema is touched and it is dropped afterwards.
+
+    python -m benchmarks.services_search --dsn postgresql://postgres@localhost/bench --rows 100000
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import statistics
+import time
+
+import asyncpg
+
+SCHEMA = "bench_services_search"
+MIGRATION = pathlib.Path(__file__).resolve().parent.parent / "migrations" / "001_services_marketplace_search.sql"
+
+CATEGORIES = ["Compliance", "Legal", "Marketing", "Cloud", "Accounting", "HR", "Design", "Funding", "Export", "IP"]
+WORDS = [
+    "gst", "filing", "trademark", "patent", "seo", "branding", "payroll", "audit", "hosting", "credits",
+    "incorporation", "pitch", "deck", "valuation", "export", "licensing", "recruitment", "ux", "analytics", "crm",
+]
+KEYWORD_SETS = [
+    ["compliance support", "legal", "GST filing"],
+    ["marketing", "seo"],
+    ["cloud", "hosting", "credits", "Chennai"],
+    ["patent", "trademark", "IP"],
+    ["funding", "pitch deck", "valuation", "Coimbatore", "funding"],
+]
+
+
+def synthetic_rows(n: int):
+    rng = random.Random(42)
+    for i in range(n):
+        category = rng.choice(CATEGORIES)
+        words = " ".join(rng.sample(WORDS, 6))
+        yield (i + 1, f"{category} {rng.choice(WORDS).title()} Service {i}", f"Provider {i % 500}", category,
+               f"{category} help for startups: {words}.", f"https://example.org/services/{i}")
+
+
+def ilike_query(keywords):
+    # What app/db/queries.search_services used to send: one OR-chain per keyword, AND-ed together
+    clauses, params = [], []
+    for kw in keywords:
+        params.append(f"%{kw}%")
+        n = len(params)
+        clauses.append(f"(category ILIKE ${n} OR description ILIKE ${n} OR service_name ILIKE ${n})")
+    return f"SELECT service_name, description, access_link FROM services_marketplace WHERE {' AND '.join(clauses)}", params
+
+
+async def timed(conn, sql, *args, repeat: int):
+    timings, rows = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = await conn.fetch(sql, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+async def run(dsn: str, rows: int, repeat: int) -> dict:
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}, public")
+        await conn.execute("""
+            CREATE TABLE services_marketplace (
+                service_id bigint PRIMARY KEY, service_name text, service_provider text, category text,
+                description text, access_link text, created_at timestamptz DEFAULT now(), updated_at timestamptz DEFAULT now()
+            )""")
+        start = time.perf_counter()
+        await conn.copy_records_to_table(
+            "services_marketplace", schema_name=SCHEMA, records=synthetic_rows(rows),
+            columns=["service_id", "service_name", "service_provider", "category", "description", "access_link"],
+        )
+        load_s = time.perf_counter() - start
+        # Drop the grant line: the bench role layout differs from Supabase's
+        migration = MIGRATION.read_text().split("grant execute")[0]
+        start = time.perf_counter()
+        await conn.execute(migration)
+        await conn.execute("ANALYZE services_marketplace")
+        index_s = time.perf_counter() - start
+
+        results = []
+        for keywords in KEYWORD_SETS:
+            sql, params = ilike_query(keywords)
+            ilike_ms, ilike_rows = await timed(conn, sql, *params, repeat=repeat)
+            unique = list(dict.fromkeys(k.lower() for k in keywords))
+            rpc_ms, rpc_rows = await timed(
+                conn, "SELECT service_name, description, access_link FROM search_services_ranked($1, 20)", unique, repeat=repeat
+            )
+            results.append({
+                "keywords": keywords, "ilike_ms": round(ilike_ms, 2), "ilike_rows": ilike_rows,
+                "ranked_ms": round(rpc_ms, 2), "ranked_rows": rpc_rows,
+            })
+        return {"rows": rows, "load_s": round(load_s, 2), "migration_s": round(index_s, 2), "queries": results}
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", required=True, help="throwaway local Postgres")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.dsn, args.rows, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+-- Ranked full-text + trigram search over services_marketplace.
+-- Replaces the chained `ilike '%kw%'` OR filters in app/db/queries.search_services,
+-- which forced a sequential scan per keyword.
+--
+-- Apply with: psql "$SUPABASE_DB_URL" -f migrations/001_services_marketplace_search.sql
+-- (or paste into the Supabase SQL editor). Safe to re-run.
+
+create extension if not exists pg_trgm;
+
+alter table services_marketplace
+    add column if not exists search_document tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(service_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) stored;
+
+create index if not exists services_marketplace_search_document_idx
+    on services_marketplace using gin (search_document);
+
+-- Trigram indexes catch partial words and typos the stemmer misses ("fintec", "compliace")
+create index if not exists services_marketplace_service_name_trgm_idx
+    on services_marketplace using gin (service_name gin_trgm_ops);
+create index if not exists services_marketplace_category_trgm_idx
+    on services_marketplace using gin (category gin_trgm_ops);
+
+-- Keywords are OR-ed: a row matching more of them (or matching in service_name) ranks higher.
+create or replace function search_services_ranked(keywords text[], max_results integer default 20)
+returns setof services_marketplace
+language sql
+stable
+as $$
+    with query as (
+        select websearch_to_tsquery('english', array_to_string(keywords, ' OR ')) as tsq
+    ),
+    fuzzy as (
+        -- Only the trigram operator can use the gin_trgm indexes; similarity() then ranks
+        select s.service_id, max(greatest(similarity(s.service_name, kw), similarity(s.category, kw))) as score
+        from services_marketplace s, unnest(keywords) as kw
+        where s.service_name % kw or s.category % kw
+        group by s.service_id
+    ),
+    -- Separate index-backed candidate sets; a single OR across both would force a seq scan
+    candidates as (
+        select s.service_id from services_marketplace s, query q where s.search_document @@ q.tsq
+        union
+        select service_id from fuzzy
+    )
+    select s.*
+    from candidates c
+    join services_marketplace s on s.service_id = c.service_id
+    cross join query q
+    left join fuzzy f on f.service_id = s.service_id
+    order by ts_rank_cd(s.search_document, q.tsq) + coalesce(f.score, 0) desc
+    limit least(greatest(max_results, 1), 100);
+$$;
+
+grant execute on function search_services_ranked(text[], integer) to anon, authenticated, service_role;
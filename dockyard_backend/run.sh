@@ -1,8 +1,6 @@
 #!/bin/bash
 
-# Install dependencies
-pip install -r requirements.txt
+# Dependencies are installed at build time (pip install -r requirements.txt), not on every start
 
 # Run the FastAPI application
-uvicorn app.main:app --host 0.0.0.0 --port 8000
-
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000
@@ -0,0 +1,49 @@
+import pytest
+
+from app.db.sql_sandbox import UnsafeQueryError, validate
+
+TABLES = ["startups", "investors"]
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT startup_name FROM startups WHERE EXTRACT(YEAR FROM date_of_incorporation) = 2022",
+    "SELECT TRIM(BOTH FROM startup_name) FROM startups",
+    "SELECT TRIM(LEADING ' ' FROM startup_name) AS name FROM startups",
+    "SELECT SUBSTRING(startup_name FROM 1 FOR 3) FROM startups",
+    "SELECT s.startup_name FROM startups s JOIN investors i ON EXTRACT(MONTH FROM s.created_at) = 1",
+])
+def test_from_inside_function_arguments_is_not_a_table(sql):
+    assert validate(sql, TABLES) == sql
+
+
+def test_subquery_tables_are_still_checked():
+    with pytest.raises(UnsafeQueryError, match="users"):
+        validate("SELECT COALESCE((SELECT MAX(id) FROM users), 0) FROM startups", TABLES)
+    with pytest.raises(UnsafeQueryError, match="users"):
+        validate("SELECT * FROM startups WHERE EXISTS (SELECT 1 FROM users)", TABLES)
+
+
+def test_unknown_table_after_function_from_is_refused():
+    with pytest.raises(UnsafeQueryError, match="users"):
+        validate("SELECT EXTRACT(YEAR FROM created_at) FROM users", TABLES)
+
+
+@pytest.mark.parametrize("sql, table", [
+    ("SELECT rolpassword FROM (pg_authid NATURAL JOIN startups)", "pg_authid"),
+    ("SELECT * FROM (pg_authid CROSS JOIN startups)", "pg_authid"),
+    ("SELECT * FROM (users u JOIN startups s ON true)", "users"),
+    ("SELECT * FROM ((users u JOIN startups s ON true) JOIN investors i ON true)", "users"),
+    ("SELECT * FROM (startups s JOIN users u ON true)", "users"),
+])
+def test_parenthesised_join_relations_are_checked(sql, table):
+    with pytest.raises(UnsafeQueryError, match=table):
+        validate(sql, TABLES)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM (startups s JOIN investors i ON true)",
+    "SELECT * FROM (SELECT startup_name FROM startups) AS s",
+    "SELECT * FROM (VALUES (1), (2)) AS v(n)",
+])
+def test_allowed_parenthesised_from_items(sql):
+    assert validate(sql, TABLES) == sql
@@ -2,9 +2,9 @@ import { NextResponse } from 'next/server';
 
 export async function POST(request: Request) {
   try {
-    const { query } = await request.json();
-    
-    const response = await fetch('http://localhost:8000/ask', {
+    const { query, stream } = await request.json();
+
+    const response = await fetch(`http://localhost:8000/${stream ? 'ask/stream' : 'ask'}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -16,6 +16,17 @@ export async function POST(request: Request) {
       throw new Error('Failed to get response from AI backend');
     }
 
+    if (stream && response.body) {
+      // Pipe the Server-Sent Events straight through so tokens reach the browser as they arrive
+      return new Response(response.body, {
+        headers: {
+          'Content-Type': 'text/event-stream',
+          'Cache-Control': 'no-cache',
+          'X-Accel-Buffering': 'no',
+        },
+      });
+    }
+
     const data = await response.json();
     return NextResponse.json(data);
   } catch (error) {